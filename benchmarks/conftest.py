@@ -0,0 +1,77 @@
+import gc
+import os
+import tracemalloc
+from typing import Any, Callable, Dict, List
+import pytest
+from mock_server import MockServer, synthetic_tasks
+
+try:
+    import pytest_benchmark  # noqa
+except ImportError:  # pragma: no cover - optional dependency
+    # The suite needs the benchmark fixture, skip it rather than fail
+    collect_ignore_glob = ["test_*.py"]
+
+DEFAULT_BENCHMARK_TASKS = 1000
+
+
+def pytest_addoption(parser) -> None:
+    parser.addoption(
+        "--bench-tasks",
+        type=int,
+        default=int(os.environ.get(
+            "LINLOG_BENCHMARK_TASKS", DEFAULT_BENCHMARK_TASKS
+        )),
+        help="number of tasks in the synthetic benchmark dataset"
+    )
+
+
+@pytest.fixture(scope="session")
+def task_count(request) -> int:
+    return request.config.getoption("--bench-tasks")
+
+
+@pytest.fixture(scope="session")
+def payloads(task_count) -> List[Dict]:
+    return synthetic_tasks(task_count)
+
+
+@pytest.fixture(scope="session")
+def tasks(payloads) -> List:
+    from linlog.schemas.task import Task
+    return [Task.from_json(payload) for payload in payloads]
+
+
+@pytest.fixture(scope="session")
+def mock_server(payloads):
+    with MockServer(payloads) as server:
+        yield server
+
+
+@pytest.fixture
+def client(mock_server):
+    from linlog import LinLogClient
+    client = LinLogClient.init_from_token(
+        "benchmark-token", base_url=mock_server.url, cache_ttl=None
+    )
+    yield client
+    client.controller.close()
+
+
+@pytest.fixture
+def peak_memory(benchmark) -> Callable[..., Any]:
+    """Runs a function once more outside of the timed rounds under
+    tracemalloc and reports its peak allocation in the benchmark's
+    ``extra_info``."""
+    def measure(fn: Callable[..., Any], *args, **kwargs) -> Any:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            result = fn(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        benchmark.extra_info["peak_memory_bytes"] = peak
+        return result
+
+    return measure
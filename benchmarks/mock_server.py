@@ -0,0 +1,212 @@
+import json
+import math
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+LABELS = ["car", "truck", "person", "bicycle", "traffic-light"]
+
+
+def synthetic_task(
+    idx: int,
+    boxes: int = 8,
+    polygons: int = 2,
+    vertices: int = 24,
+    width: int = 1920,
+    height: int = 1080
+) -> Dict:
+    """Task payload as returned by the API, with deterministic geometry
+    so that runs are comparable."""
+    annotations = []
+    for box in range(boxes):
+        annotations.append({
+            "id": f"box-{idx}-{box}",
+            "annotation_type": "bounding-box",
+            "label": LABELS[(idx + box) % len(LABELS)],
+            "source": None,
+            "is_model_run": False,
+            "top": (idx * 7 + box * 31) % (height - 100),
+            "left": (idx * 13 + box * 17) % (width - 100),
+            "width": 20 + box * 5,
+            "height": 30 + box * 3,
+            "rotation": 0,
+            "iou": None,
+            "attributes": {}
+        })
+
+    for polygon in range(polygons):
+        cx = (idx * 11 + polygon * 97) % (width - 200) + 100
+        cy = (idx * 5 + polygon * 53) % (height - 200) + 100
+        radius = 40 + polygon * 10
+        path = [
+            {"x": round(cx + radius * math.cos(2 * math.pi * v / vertices), 2),
+             "y": round(cy + radius * math.sin(2 * math.pi * v / vertices), 2)}
+            for v in range(vertices)
+        ]
+        annotations.append({
+            "id": f"polygon-{idx}-{polygon}",
+            "annotation_type": "polygon",
+            "label": LABELS[(idx + polygon) % len(LABELS)],
+            "source": None,
+            "is_model_run": False,
+            "iou": None,
+            "segments": [{"path": path, "subtraction": []}],
+            "attributes": {}
+        })
+
+    return {
+        "id": f"task-{idx}",
+        "task_type": "image",
+        "filename": f"image-{idx}.jpg",
+        "params": {
+            "attachment": f"https://images.example.com/image-{idx}.jpg",
+            "attachment_type": "image"
+        },
+        "media_specs": {"width": width, "height": height},
+        "complete": idx % 3 != 0,
+        "rejected": False,
+        "workflow_stage": "review",
+        "tags": ["synthetic"],
+        "metadata": {"index": idx},
+        "dataset_id": "dataset-1",
+        "project_id": "project-1",
+        "annotations": annotations
+    }
+
+
+def synthetic_tasks(count: int, **options) -> List[Dict]:
+    return [synthetic_task(idx, **options) for idx in range(count)]
+
+
+class MockServer:
+    """Local stand-in for the API, serving a synthetic dataset.
+
+    Implements the endpoints the benchmarks exercise:
+
+    - ``GET projects/<id>/tasks`` and ``POST search/tasks`` return pages
+      of ``tasks`` (``limit``/``offset`` as query parameters)
+    - ``POST tasks/image`` and ``POST tasks/geospatial`` create tasks
+    - ``PATCH tasks/<id>`` and ``DELETE tasks`` accept any body
+
+    Pages are encoded once and served from memory, so the benchmarks
+    measure the client rather than the server.
+    """
+
+    def __init__(self, tasks: List[Dict]) -> None:
+        self.tasks = tasks
+        self.requests = 0
+        self._pages: Dict[Tuple[int, int], bytes] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), self._handler()
+        )
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page(self, offset: int, limit: int) -> bytes:
+        key = (offset, limit)
+        with self._lock:
+            if key not in self._pages:
+                self._pages[key] = json.dumps({
+                    "count": len(self.tasks),
+                    "next": None,
+                    "previous": None,
+                    "results": self.tasks[offset:offset + limit]
+                }).encode("utf-8")
+            return self._pages[key]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _send(self, status: int, body: bytes = b"") -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_body(self) -> bytes:
+                length = int(self.headers.get("Content-Length", 0))
+                return self.rfile.read(length) if length else b""
+
+            def _page(self, query: Dict) -> None:
+                offset = int(query.get("offset", ["0"])[0])
+                limit = int(query.get("limit", ["100"])[0])
+                self._send(200, server.page(offset, limit))
+
+            def _route(self, method: str) -> None:
+                with server._lock:
+                    server.requests += 1
+
+                url = urlparse(self.path)
+                path = url.path.strip("/")
+                query = parse_qs(url.query)
+                body = self._read_body()
+
+                if method == "GET" and path.startswith("projects/") \
+                        and path.endswith("/tasks"):
+                    return self._page(query)
+
+                if method == "POST" and path == "search/tasks":
+                    return self._page(query)
+
+                if method == "POST" and path in (
+                    "tasks/image", "tasks/geospatial"
+                ):
+                    payload = json.loads(body or b"{}")
+                    payload["id"] = str(uuid.uuid4())
+                    return self._send(201, json.dumps(payload).encode())
+
+                if method == "PATCH" and path.startswith("tasks/"):
+                    return self._send(200, body or b"{}")
+
+                if method == "DELETE" and path.startswith("tasks"):
+                    return self._send(204)
+
+                self._send(404, b'{"detail": "Not found."}')
+
+            def do_GET(self) -> None:
+                self._route("GET")
+
+            def do_POST(self) -> None:
+                self._route("POST")
+
+            def do_PATCH(self) -> None:
+                self._route("PATCH")
+
+            def do_DELETE(self) -> None:
+                self._route("DELETE")
+
+        return Handler
+
+    def start(self) -> 'MockServer':
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="linlog-mock-server",
+            daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'MockServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,33 @@
+import pytest
+from linlog.exporter import get_exporter, get_writer
+from linlog.exporter.exporter import MultiWriter
+
+FORMATS = ["linearlogic", "coco", "cvat", "yolo", "shards"]
+
+
+def write(writer, tasks):
+    for task in tasks:
+        writer.write(task)
+    return writer.close()
+
+
+@pytest.mark.parametrize("format", FORMATS)
+def test_writer(benchmark, tasks, tmp_path, peak_memory, format):
+    writer_class = get_writer(format)
+    benchmark(lambda: write(writer_class(tmp_path), tasks))
+    peak_memory(lambda: write(writer_class(tmp_path), tasks))
+
+
+@pytest.mark.parametrize("format", ["linearlogic", "coco", "cvat"])
+def test_export(benchmark, tasks, tmp_path, peak_memory, format):
+    exporter = get_exporter(format)
+    benchmark(exporter, tasks=tasks, output_path=tmp_path)
+    peak_memory(exporter, tasks=tasks, output_path=tmp_path)
+
+
+def test_multi_writer(benchmark, tasks, tmp_path, peak_memory):
+    def export():
+        return write(MultiWriter(tmp_path, FORMATS), tasks)
+
+    benchmark(export)
+    peak_memory(export)
@@ -0,0 +1,32 @@
+DATASET_ID = "dataset-1"
+
+
+def test_get_all_dataset_tasks(benchmark, client, task_count, peak_memory):
+    tasks = benchmark(client.get_all_dataset_tasks, DATASET_ID)
+    assert len(tasks) == task_count
+    peak_memory(client.get_all_dataset_tasks, DATASET_ID)
+    benchmark.extra_info["tasks"] = task_count
+
+
+def test_iter_dataset_tasks(benchmark, client, task_count, peak_memory):
+    def consume():
+        return sum(1 for _ in client.iter_dataset_tasks(DATASET_ID))
+
+    assert benchmark(consume) == task_count
+    peak_memory(consume)
+    benchmark.extra_info["tasks"] = task_count
+
+
+def test_get_project_tasks_page(benchmark, client):
+    page = benchmark(client.get_project_tasks, "project-1", limit=100)
+    assert len(page) == min(100, page.count)
+
+
+def test_create_image_task(benchmark, client, payloads):
+    payload = payloads[0]
+    benchmark(
+        client.create_image_task,
+        payload["project_id"],
+        payload["params"]["attachment"],
+        annotations=payload["annotations"]
+    )
@@ -0,0 +1,23 @@
+import pytest
+from linlog.exporter import get_writer
+from linlog.importer import get_importer
+
+
+@pytest.fixture(scope="module")
+def exported(tasks, tmp_path_factory):
+    """Path of the dataset written in each importable format."""
+    paths = {}
+    for format in ["linearlogic", "coco", "cvat"]:
+        writer = get_writer(format)(tmp_path_factory.mktemp(format))
+        for task in tasks:
+            writer.write(task)
+        paths[format] = writer.close()
+    return paths
+
+
+@pytest.mark.parametrize("format", ["linearlogic", "coco", "cvat"])
+def test_importer(benchmark, exported, peak_memory, format):
+    importer = get_importer(format)
+    imported = benchmark(importer, file_paths=[exported[format]])
+    assert len(imported) > 0
+    peak_memory(importer, file_paths=[exported[format]])
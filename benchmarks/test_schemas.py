@@ -0,0 +1,24 @@
+import json
+import pickle
+from linlog.schemas.task import Task
+
+
+def test_task_from_json(benchmark, payloads, peak_memory):
+    def decode():
+        return [Task.from_json(payload) for payload in payloads]
+
+    assert len(benchmark(decode)) == len(payloads)
+    peak_memory(decode)
+
+
+def test_task_to_dict(benchmark, tasks):
+    benchmark(lambda: [task.to_dict() for task in tasks])
+
+
+def test_task_to_json(benchmark, tasks):
+    benchmark(lambda: json.dumps([task.to_dict() for task in tasks]))
+
+
+def test_task_pickle_round_trip(benchmark, tasks):
+    restored = benchmark(lambda: pickle.loads(pickle.dumps(tasks)))
+    assert len(restored) == len(tasks)
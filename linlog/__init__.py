@@ -1,7 +1,21 @@
 import os
-from linlog.client import LinLogClient  # noqa
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from linlog.client import LinLogClient  # noqa
 
 if not os.path.exists(
     os.path.expanduser("~") + os.sep + ".linear-logic"
 ):
     os.mkdir(os.path.expanduser("~") + os.sep + ".linear-logic")
+
+
+def __getattr__(name: str):
+    # LinLogClient pulls in requests, it is only imported when used (PEP 562)
+    if name == 'LinLogClient':
+        value = import_module('linlog.client').LinLogClient
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
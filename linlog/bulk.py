@@ -0,0 +1,93 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+BulkBatch = List[Tuple[str, Any]]
+
+
+@dataclass
+class BulkItemResult:
+    id: str
+    success: bool
+    response: Any = None
+    error: Optional[BaseException] = None
+
+
+@dataclass
+class BulkReport:
+    """Outcome of a bulk operation, one result per item in input order."""
+
+    results: List[BulkItemResult] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> List[str]:
+        return [result.id for result in self.results if result.success]
+
+    @property
+    def failed(self) -> List[BulkItemResult]:
+        return [result for result in self.results if not result.success]
+
+    def raise_for_errors(self) -> None:
+        failed = self.failed
+        if failed:
+            raise Exception(
+                f"{len(failed)} of {len(self.results)} items failed, "
+                f"first error ({failed[0].id}): {failed[0].error}"
+            )
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_bulk(
+    fn: Callable[[BulkBatch], Any],
+    batches: Iterable[BulkBatch],
+    max_workers: int = 4
+) -> BulkReport:
+    """Calls ``fn`` on every batch of ``(id, item)`` pairs from
+    ``max_workers`` threads. Every item of a batch shares its outcome: the
+    response when ``fn`` returned, the exception when it raised.
+
+    At most ``2 * max_workers`` batches are queued at a time, so batches
+    can be produced lazily from very large inputs.
+    """
+    report = BulkReport()
+
+    def call(batch: BulkBatch) -> List[BulkItemResult]:
+        try:
+            response = fn(batch)
+        except Exception as e:
+            return [
+                BulkItemResult(id=item_id, success=False, error=e)
+                for item_id, _ in batch
+            ]
+        return [
+            BulkItemResult(id=item_id, success=True, response=response)
+            for item_id, _ in batch
+        ]
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="linlog-bulk"
+    ) as executor:
+        pending = deque()
+        for batch in batches:
+            pending.append(executor.submit(call, batch))
+            if len(pending) >= 2 * max_workers:
+                report.results.extend(pending.popleft().result())
+
+        while pending:
+            report.results.extend(pending.popleft().result())
+
+    return report
@@ -0,0 +1,88 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+from linlog.constants import DEFAULT_CACHE_MAX_ENTRIES, DEFAULT_CACHE_TTL
+
+
+@dataclass
+class CacheEntry:
+
+    value: Any
+    etag: Optional[str]
+    expires_at: float
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+
+class MetadataCache:
+    """TTL cache for slowly changing metadata (projects, datasets, label
+    taxonomies, workflow templates), keyed by API endpoint.
+
+    Expired entries are kept around together with their ETag so that they
+    can be revalidated with a conditional GET instead of being downloaded
+    again. Values are deep-copied on the way in and out, callers are free
+    to mutate what they get back. Once ``max_entries`` endpoints are
+    cached the least recently used entry is dropped.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_CACHE_TTL,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def value(self, entry: CacheEntry) -> Any:
+        return copy.deepcopy(entry.value)
+
+    def set(self, key: str, value: Any, etag: Optional[str] = None) -> Any:
+        with self._lock:
+            self._entries[key] = CacheEntry(
+                value=copy.deepcopy(value),
+                etag=etag,
+                expires_at=time.monotonic() + self.ttl
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def touch(self, key: str) -> None:
+        """Marks an entry as fresh again, used after a 304 response."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                entry.expires_at = time.monotonic() + self.ttl
+
+    def invalidate(self, prefix: Optional[str] = None) -> None:
+        """Drops the entry for ``prefix`` and every entry nested below it
+        (``projects/1`` also drops ``projects/1/workflows``), or the whole
+        cache when no prefix is given."""
+        with self._lock:
+            if prefix is None:
+                self._entries.clear()
+                return
+
+            for key in [
+                k for k in self._entries
+                if k == prefix or k.startswith(prefix + "/")
+            ]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,13 +1,6 @@
 import sys
 from argparse import ArgumentParser, Namespace
-from linlog import LinLogClient
-from linlog.commands import (
-    help,
-    authenticate,
-    dataset_info,
-    datasets,
-    pull_dataset,
-)
+from importlib import import_module
 from typing import Tuple
 
 
@@ -73,6 +66,39 @@ class Options:
             help="Specify format {linearlogic,cvat,coco,pascal}",
         )
 
+        pull_datasets_parser.add_argument(
+            "-o", "--output",
+            default=None,
+            help="Output directory, defaults to the dataset ID",
+        )
+
+        pull_datasets_parser.add_argument(
+            "-w", "--workers",
+            default=4,
+            type=int,
+            help="Number of pages fetched concurrently",
+        )
+
+        pull_datasets_parser.add_argument(
+            "--page-size",
+            default=200,
+            type=int,
+            help="Tasks per page, at most 200",
+        )
+
+        pull_datasets_parser.add_argument(
+            "-r", "--resume",
+            default=False,
+            action="store_true",
+            help="Resume an interrupted pull into the same output directory",
+        )
+
+        pull_datasets_parser.add_argument(
+            "--since",
+            default=None,
+            help="Only pull tasks created at or after this ISO date",
+        )
+
     def parse_args(self) -> Tuple[Namespace, ArgumentParser]:
         """
         Parses and validates the CLI options.
@@ -92,27 +118,45 @@ class Options:
 
 
 def load_client():
+    from linlog.client import LinLogClient
     client = LinLogClient.local()
     return client
 
 
+def load_command(name: str):
+    """Commands are imported when they run, so that a command only pays for
+    the dependencies it uses."""
+    return import_module(f"linlog.commands.{name}")
+
+
 def main() -> None:
 
     args, parser = Options().parse_args()
 
     if args.command in ['help', '-h', '--help']:
-        help.run(parser)
+        load_command("help").run(parser)
         return
 
     if args.command == "authenticate":
-        authenticate.run()
+        load_command("authenticate").run()
     elif args.command == "datasets":
-        datasets.run(output_json=args.json, client=load_client())
+        load_command("datasets").run(
+            output_json=args.json, client=load_client()
+        )
     elif args.command == "dataset-info":
-        dataset_info.run(args.id, output_json=args.json, client=load_client())
+        load_command("dataset_info").run(
+            args.id, output_json=args.json, client=load_client()
+        )
     elif args.command == "pull-dataset":
-        pull_dataset.run(
-            dataset_id=args.id, format=args.format, client=load_client()
+        load_command("pull_dataset").run(
+            dataset_id=args.id,
+            format=args.format,
+            client=load_client(),
+            output=args.output,
+            workers=args.workers,
+            page_size=args.page_size,
+            resume=args.resume,
+            since=args.since
         )
     else:
         print("Command not found!")
@@ -1,33 +1,85 @@
 import os
 import json
-from typing import Dict, List
-from linlog.constants import BASE_URL, MODULE_ROOT
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from linlog.bulk import BulkReport, chunked, run_bulk
+from linlog.cache import MetadataCache
+from linlog.constants import (
+    BASE_URL,
+    DATASET_LABELS_KEY,
+    MODULE_ROOT,
+    PROJECT_OBJECTS_TO_ANNOTATE_KEY
+)
 from linlog.controller import Controller
+from linlog.query import QUERY_FIELDS_KEY, TaskQuery, parse_fields, project
+from linlog.schemas.annotation import Annotation
 from linlog.utils import Paginator
 
 
+DATASET_TASKS_KWARGS = [
+    'limit',
+    'offset',
+    'created_date',
+    'created_date__gte',
+    'created_date__lte',
+    'created_date__gt',
+    'created_date__lt',
+    'exclude_annotations'
+]
+
+
 class LinLogClient:
 
     auth_credentials = None
     controller = None
     auth_type = None
+    cache = None
 
     def __init__(self,
                  email: str,
                  password: str,
                  base_url: str = None,
-                 auth_type: str = "token"):
+                 auth_type: str = "token",
+                 cache_ttl: Optional[float] = None,
+                 **controller_options):
+        """
+        :param cache_ttl: seconds project, dataset and workflow metadata
+                          is served from the local cache before being
+                          revalidated, e.g. 60. The cache is disabled
+                          by default (None)
+        :param controller_options: forwarded to Controller, e.g.
+                                   rate_limit or adaptive_concurrency
+        """
 
         self.auth_credentials = (email, password) \
             if auth_type == "credentials" else (email, "")
         self.auth_type = auth_type
+        self._config = (
+            (email, password, base_url, auth_type, cache_ttl),
+            controller_options
+        )
         self.controller = Controller(
             self.auth_credentials,
-            base_url=base_url if base_url else BASE_URL
+            base_url=base_url if base_url else BASE_URL,
+            **controller_options
         )
+        self.cache = MetadataCache(cache_ttl) \
+            if cache_ttl is not None else None
+
+    def __reduce__(self):
+        """Clients are pickled as their configuration, e.g. to be sent to
+        a process pool. The unpickled client starts with its own
+        connections, metadata cache and metrics, ``controller_options``
+        must be picklable."""
+        args, controller_options = self._config
+        return _restore_client, (args, controller_options)
 
     @staticmethod
-    def local(base_url: str = None):
+    def local(base_url: str = None,
+              cache_ttl: Optional[float] = None,
+              **controller_options):
         try:
             with open(MODULE_ROOT + os.sep + "auth.json", "r") as f:
                 auth = json.load(f)
@@ -35,10 +87,14 @@ class LinLogClient:
                     return LinLogClient(
                         auth['email'],
                         auth['password'],
-                        base_url, "credentials"
+                        base_url, "credentials", cache_ttl,
+                        **controller_options
                     )
                 else:
-                    return LinLogClient(auth['token'], "", base_url)
+                    return LinLogClient(
+                        auth['token'], "", base_url, cache_ttl=cache_ttl,
+                        **controller_options
+                    )
         except FileNotFoundError:
             raise Exception(
                 "Authentication credentials not provided, use "
@@ -46,12 +102,52 @@ class LinLogClient:
             )
 
     @staticmethod
-    def init_from_credentials(email: str, password: str, base_url: str = None):
-        return LinLogClient(email, password, base_url, "credentials")
+    def init_from_credentials(email: str,
+                              password: str,
+                              base_url: str = None,
+                              cache_ttl: Optional[float] = None,
+                              **controller_options):
+        return LinLogClient(
+            email, password, base_url, "credentials", cache_ttl,
+            **controller_options
+        )
 
     @staticmethod
-    def init_from_token(token, base_url: str = None):
-        return LinLogClient(token, "", base_url)
+    def init_from_token(token,
+                        base_url: str = None,
+                        cache_ttl: Optional[float] = None,
+                        **controller_options):
+        return LinLogClient(
+            token, "", base_url, cache_ttl=cache_ttl, **controller_options
+        )
+
+    def _cached_get_request(self, endpoint: str):
+        if self.cache is None:
+            return self.controller.get_request(endpoint)
+
+        entry = self.cache.get(endpoint)
+        if entry is not None and entry.is_fresh:
+            return self.cache.value(entry)
+
+        payload, etag, modified = self.controller.conditional_get_request(
+            endpoint,
+            etag=entry.etag if entry is not None else None
+        )
+
+        if not modified:
+            self.cache.touch(endpoint)
+            return self.cache.value(entry)
+
+        return self.cache.set(endpoint, payload, etag)
+
+    def invalidate_cache(self, endpoint: str = None):
+        """
+        :param endpoint: drop the cached metadata for this endpoint and
+                         everything below it, e.g. "projects/<id>". Drops
+                         the whole cache when omitted.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(endpoint)
 
     def get_organisation(self):
         endpoint = "organisations"
@@ -74,25 +170,33 @@ class LinLogClient:
         """
 
         endpoint = f"projects/{origin_project_id}/import-taxonomy"
-        return self.controller.post_request(endpoint, {
+        response = self.controller.post_request(endpoint, {
             "project_id": target_project_id
         })
+        self.invalidate_cache(f"projects/{origin_project_id}")
+        return response
 
     def get_project_workflows(self, id: str):
         endpoint = f"projects/{id}/workflows"
-        return self.controller.get_request(endpoint)
+        return self._cached_get_request(endpoint)
 
     def get_workflow_templates(self):
         endpoint = "workflows/templates"
-        return self.controller.get_request(endpoint)
+        return self._cached_get_request(endpoint)
 
     def set_project_workflow_template(self, project_id: str, template: str):
         endpoint = f"workflows/{project_id}/template"
-        return self.controller.post_request(endpoint, {'template': template})
+        response = self.controller.post_request(
+            endpoint, {'template': template}
+        )
+        self.invalidate_cache(f"projects/{project_id}")
+        return response
 
     def delete_project(self, id: str):
         endpoint = f"projects/{id}"
-        return self.controller.delete_request(endpoint)
+        response = self.controller.delete_request(endpoint)
+        self.invalidate_cache(endpoint)
+        return response
 
     def get_projects(self) -> List[Dict]:
         endpoint = "projects"
@@ -103,7 +207,13 @@ class LinLogClient:
         :param id: project ID
         """
         endpoint = f"projects/{id}"
-        return self.controller.get_request(endpoint)
+        return self._cached_get_request(endpoint)
+
+    def get_project_labels(self, id: str) -> List[Dict]:
+        """
+        :param id: project ID
+        """
+        return self.get_project(id).get(PROJECT_OBJECTS_TO_ANNOTATE_KEY, [])
 
     def update_project(self, project_id: str, payload: Dict) -> Dict:
         """
@@ -114,12 +224,24 @@ class LinLogClient:
             endpoint,
             payload
         )
+        self.invalidate_cache(endpoint)
 
     def get_project_batches(self, id: str):
         endpoint = f"projects/{id}/batches"
         return self.controller.get_request(endpoint)
 
-    def get_project_tasks(self, id: str, **kwargs) -> Paginator[Dict]:
+    def get_project_tasks(
+        self,
+        id: str,
+        fields: Optional[List[str]] = None,
+        **kwargs
+    ) -> Paginator[Dict]:
+        """One page of the project's tasks.
+
+        :param fields: only request and decode these task fields, nested
+                       fields are selected with dotted paths, e.g.
+                       ``["id", "complete", "annotations.label"]``
+        """
 
         for key in kwargs:
             if key not in [
@@ -136,14 +258,18 @@ class LinLogClient:
             ]:
                 raise Exception(f"Invalid kwarg key: {key}")
 
+        params = dict(kwargs)
+        if fields:
+            params[QUERY_FIELDS_KEY] = ",".join(fields)
+
         endpoint = f"projects/{id}/tasks"
-        response = self.controller.get_request(endpoint, params=kwargs)
+        response = self.controller.get_request(endpoint, params=params)
 
         limit = kwargs.get('limit', 100)
         offset = kwargs.get('offset', 0)
 
         return Paginator[Dict](
-            response["results"],
+            self._project_fields(response["results"], fields),
             response["count"],
             limit,
             offset,
@@ -269,21 +395,28 @@ class LinLogClient:
         :param id: project ID
         """
         endpoint = f"projects/{project_id}/create-label"
-        return self.controller.post_request(
+        response = self.controller.post_request(
             endpoint,
             payload
         )
+        self.invalidate_cache(f"projects/{project_id}")
+        return response
 
     def update_project_label(self, label_object_id: str, payload: Dict):
         endpoint = f"project-labels/{label_object_id}"
-        return self.controller.put_request(
+        response = self.controller.put_request(
             endpoint,
             payload
         )
+        # Labels don't carry their project ID, drop all project metadata
+        self.invalidate_cache("projects")
+        return response
 
     def delete_project_label(self, label_object_id: str):
         endpoint = f"project-labels/{label_object_id}"
-        return self.controller.delete_request(endpoint)
+        response = self.controller.delete_request(endpoint)
+        self.invalidate_cache("projects")
+        return response
 
     def update_task(self, task_id: str, payload: Dict):
         endpoint = f"tasks/{task_id}"
@@ -292,40 +425,101 @@ class LinLogClient:
             {"task": payload}
         )
 
+    def bulk_update_tasks(
+        self,
+        updates: Union[Dict[str, Dict], Iterable[Tuple[str, Dict]]],
+        max_workers: int = 8
+    ) -> BulkReport:
+        """Updates many tasks concurrently, the requests go through the
+        controller's rate and concurrency limits.
+
+        There is no batch update endpoint, so every task is sent in its
+        own request; failed updates are reported, not raised.
+
+        :param updates: ``{task_id: payload}`` or ``(task_id, payload)``
+                        pairs, pairs can be generated lazily
+        :return: one result per task, in input order
+        """
+        if isinstance(updates, dict):
+            updates = updates.items()
+
+        return run_bulk(
+            lambda batch: self.update_task(*batch[0]),
+            ([update] for update in updates),
+            max_workers=max_workers
+        )
+
     def get_datasets(self):
         endpoint = "datasets"
         return self.controller.get_request(endpoint)['results']
 
     def get_dataset(self, id: str):
         endpoint = f"datasets/{id}"
-        return self.controller.get_request(endpoint)
+        return self._cached_get_request(endpoint)
+
+    def get_dataset_labels(self, id: str) -> List[Dict]:
+        return self.get_dataset(id).get(DATASET_LABELS_KEY, [])
 
-    def get_dataset_tasks(self, id: str, **kwargs):
+    @staticmethod
+    def _project_fields(
+        tasks: List[Dict],
+        fields: Optional[List[str]]
+    ) -> List[Dict]:
+        """Drops the fields the server sent beyond the requested ones."""
+        if not fields:
+            return tasks
+        return project(tasks, parse_fields(fields))
+
+    def _dataset_search_body(
+        self,
+        query: Optional[TaskQuery],
+        fields: Optional[List[str]],
+        kwargs: Dict
+    ) -> Dict:
         for key in kwargs:
-            if key not in [
-                'limit',
-                'offset',
-                'created_date',
-                'created_date__gte',
-                'created_date__lte',
-                'created_date__gt',
-                'created_date__lt',
-                'exclude_annotations'
-            ]:
+            if key not in DATASET_TASKS_KWARGS:
                 raise Exception(f"Invalid kwarg key: {key}")
 
+        query = query or TaskQuery()
+        for key, value in kwargs.items():
+            if key.startswith('created_date'):
+                query = query.created(value, key.partition('__')[2])
+
+        data = query.to_dict()
+        exclude_annotations = True
+        if fields:
+            data[QUERY_FIELDS_KEY] = list(fields)
+            exclude_annotations = 'annotations' not in parse_fields(fields)
+
+        data['exclude_annotations'] = kwargs.get(
+            'exclude_annotations', exclude_annotations
+        )
+        return data
+
+    def get_dataset_tasks(
+        self,
+        id: str,
+        query: Optional[TaskQuery] = None,
+        fields: Optional[List[str]] = None,
+        **kwargs
+    ):
+        """One page of the dataset's tasks matching ``query``, the filters
+        are evaluated by the server.
+
+        :param fields: only request and decode these task fields, see
+                       :meth:`get_project_tasks`. Annotations are included
+                       when selected unless ``exclude_annotations`` is set
+        """
+        data = self._dataset_search_body(query, fields, kwargs)
+
         limit = min(kwargs.get('limit', 50), 200)
         offset = kwargs.get('offset', 0)
 
         endpoint = f"search/tasks?dataset={id}&offset={offset}&limit={limit}"
-        response = self.controller.post_request(
-            endpoint,
-            data={
-                'exclude_annotations': kwargs.get('exclude_annotations', True)
-            })
+        response = self.controller.post_request(endpoint, data=data)
 
         return Paginator[str](
-            response["results"],
+            self._project_fields(response["results"], fields),
             response["count"],
             limit,
             offset,
@@ -333,26 +527,200 @@ class LinLogClient:
             response["next"]
         )
 
+    def iter_dataset_pages(
+        self,
+        id: str,
+        query: Optional[TaskQuery] = None,
+        fields: Optional[List[str]] = None,
+        max_workers: int = 4,
+        **kwargs
+    ) -> Iterator[Paginator]:
+        """Pages of the dataset's tasks matching ``query``, in order. The
+        first page gives the total count, the following pages are fetched
+        by ``max_workers`` threads, at most ``2 * max_workers`` pages
+        ahead of the consumer.
+
+        :param limit: page size, defaults to (and is capped at) 200
+        """
+        limit = min(kwargs.pop('limit', 200), 200)
+        offset = kwargs.pop('offset', 0)
+
+        first = self.get_dataset_tasks(
+            id, query, fields, limit=limit, offset=offset, **kwargs
+        )
+        yield first
+
+        offsets = iter(range(offset + limit, first.count, limit))
+
+        def fetch(page_offset: int) -> Paginator:
+            return self.get_dataset_tasks(
+                id, query, fields, limit=limit, offset=page_offset, **kwargs
+            )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque(
+                executor.submit(fetch, page_offset)
+                for page_offset in islice(offsets, 2 * max_workers)
+            )
+            try:
+                while pending:
+                    page = pending.popleft().result()
+                    for page_offset in islice(offsets, 1):
+                        pending.append(executor.submit(fetch, page_offset))
+                    yield page
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def get_all_dataset_tasks(
+        self,
+        id: str,
+        query: Optional[TaskQuery] = None,
+        fields: Optional[List[str]] = None,
+        max_workers: int = 4,
+        **kwargs
+    ) -> List[Dict]:
+        """Every task of the dataset matching ``query``, see
+        :meth:`iter_dataset_pages`.
+
+        :param limit: page size, defaults to (and is capped at) 200
+        """
+        tasks = []
+        for page in self.iter_dataset_pages(
+            id, query, fields, max_workers, **kwargs
+        ):
+            tasks.extend(page)
+        return tasks
+
+    def iter_dataset_tasks(
+        self,
+        id: str,
+        query: Optional[TaskQuery] = None,
+        fields: Optional[List[str]] = None,
+        **kwargs
+    ) -> Iterator[Dict]:
+        """Streams the tasks of a dataset matching ``query`` page by page,
+        yielding each task as soon as it has been decoded from the
+        response.
+
+        :param limit: page size, defaults to (and is capped at) 200
+        """
+        data = self._dataset_search_body(query, fields, kwargs)
+        tree = parse_fields(fields) if fields else None
+
+        limit = min(kwargs.get('limit', 200), 200)
+        offset = kwargs.get('offset', 0)
+
+        while True:
+            endpoint = \
+                f"search/tasks?dataset={id}&offset={offset}&limit={limit}"
+            meta: Dict = {}
+            received = 0
+            for task in self.controller.stream_request(
+                "POST", endpoint, data=data, meta=meta
+            ):
+                received += 1
+                yield project(task, tree) if tree else task
+
+            # The server may cap the page size below the requested limit,
+            # the next offset follows what was actually received
+            offset += received
+            if received == 0:
+                return
+            if meta.get("count") is not None:
+                if offset >= meta["count"]:
+                    return
+            elif "next" in meta:
+                if meta["next"] is None:
+                    return
+            elif received < limit:
+                return
+
     def delete_tasks(self, task_ids: List[str]):
         endpoint = "tasks"
-        return self.controller.post_request(endpoint, {"task_ids": task_ids})
+        response = self.controller.post_request(
+            endpoint, {"task_ids": task_ids}
+        )
+        # Tasks don't carry their dataset ID, drop all dataset metadata
+        self.invalidate_cache("datasets")
+        return response
+
+    def bulk_delete_tasks(
+        self,
+        task_ids: Iterable[str],
+        chunk_size: int = 500,
+        max_workers: int = 4
+    ) -> BulkReport:
+        """Deletes tasks in chunks of ``chunk_size`` ids, sent
+        concurrently. A failed chunk marks all of its tasks as failed.
+
+        :return: one result per task, in input order
+        """
+        return run_bulk(
+            lambda batch: self.delete_tasks(
+                [task_id for task_id, _ in batch]
+            ),
+            chunked(((task_id, None) for task_id in task_ids), chunk_size),
+            max_workers=max_workers
+        )
 
     def create_model_run(self,
                          dataset_id: str,
                          model_version_id: str,
                          task_id: str,
-                         annotation,
+                         annotation: Union[Annotation, Dict],
                          confidence_score: float = None):
 
         if bool(confidence_score):
             assert 0 <= confidence_score <= 1, \
                 "Confidence score must be a value between 0 and 1"
 
+        if isinstance(annotation, Annotation):
+            annotation = annotation.to_dict()
+
         endpoint = "datasets/model-run"
-        return self.controller.post_request(endpoint, {
+        response = self.controller.post_request(endpoint, {
             "dataset": dataset_id,
             "model_version": model_version_id,
             "task": task_id,
             "annotation": annotation,
             "confidence_score": confidence_score
         })
+        self.invalidate_cache(f"datasets/{dataset_id}")
+        return response
+
+    def create_model_runs(
+        self,
+        dataset_id: str,
+        model_version_id: str,
+        model_runs: Iterable[Dict],
+        max_workers: int = 8
+    ) -> BulkReport:
+        """Creates many model runs concurrently, the requests go through
+        the controller's rate and concurrency limits.
+
+        There is no batch model run endpoint, so every model run is sent
+        in its own request; failed model runs are reported, not raised.
+
+        :param model_runs: dicts with "task", "annotation" (an
+                           Annotation or its dict) and an optional
+                           "confidence_score" key, can be generated
+                           lazily
+        :return: one result per model run keyed by task ID, in input
+                 order
+        """
+        return run_bulk(
+            lambda batch: self.create_model_run(
+                dataset_id,
+                model_version_id,
+                batch[0][0],
+                batch[0][1]["annotation"],
+                batch[0][1].get("confidence_score")
+            ),
+            ([(model_run["task"], model_run)] for model_run in model_runs),
+            max_workers=max_workers
+        )
+
+
+def _restore_client(args: Tuple, controller_options: Dict) -> LinLogClient:
+    return LinLogClient(*args, **controller_options)
@@ -1,14 +1,51 @@
+import os
+from pathlib import Path
+from rich.progress import Progress
 from linlog import LinLogClient
 from linlog.console import log_error
-from linlog.dataset.remote_dataset import RemoteDataset
+from linlog.dataset.pull import MAX_PAGE_SIZE, pull_dataset_tasks
 from linlog.exceptions import NotFound, NoAccess
+from linlog.exporter import get_exporter
+from linlog.exporter.exporter import export_tasks
 
 
-def run(dataset_id: str, client: LinLogClient, format: str = None):
+def run(
+    dataset_id: str,
+    client: LinLogClient,
+    format: str = None,
+    output: str = None,
+    workers: int = 4,
+    page_size: int = MAX_PAGE_SIZE,
+    resume: bool = False,
+    since: str = None
+):
+    output_directory = Path(output or dataset_id)
+    os.makedirs(output_directory, exist_ok=True)
+
     try:
-        rds = RemoteDataset(client, dataset_id)
-        rds.export(format, pull=True)
+        with Progress() as progress:
+            bar = progress.add_task("Pulling tasks", total=None)
+            tasks = pull_dataset_tasks(
+                client,
+                dataset_id,
+                output_directory,
+                workers=workers,
+                page_size=page_size,
+                resume=resume,
+                since=since,
+                on_page=lambda done, total: progress.update(
+                    bar, completed=done, total=total
+                )
+            )
     except NotFound:
         log_error(f"Unable to find dataset with id {dataset_id}")
+        return
     except NoAccess:
         log_error("You do not have permission to access this dataset")
+        return
+
+    export_tasks(
+        get_exporter(format or 'linearlogic'),
+        tasks,
+        output_directory
+    )
@@ -0,0 +1,42 @@
+import gzip
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+GZIP = "gzip"
+ZSTD = "zstd"
+
+DEFAULT_COMPRESSION_THRESHOLD = 64 * 1024
+# Bodies of at least this size are compressed on an executor rather than
+# on the thread sending the request
+DEFAULT_OFFLOAD_THRESHOLD = 1024 * 1024
+
+
+def check_encoding(encoding: str) -> str:
+    if encoding == GZIP:
+        return encoding
+
+    if encoding == ZSTD:
+        if zstandard is None:
+            raise ImportError(
+                "zstd request compression requires the 'zstandard' package"
+            )
+        return encoding
+
+    raise ValueError(
+        f"Unsupported request compression '{encoding}', "
+        f"expected one of: {GZIP}, {ZSTD}"
+    )
+
+
+def compress(body: bytes, encoding: str, level: int = None) -> bytes:
+    """Compresses a request body."""
+    if encoding == GZIP:
+        return gzip.compress(body, compresslevel=level or 6)
+
+    if encoding == ZSTD:
+        return zstandard.ZstdCompressor(level=level or 3).compress(body)
+
+    raise ValueError(f"Unsupported request compression '{encoding}'")
@@ -5,6 +5,9 @@ BASE_URL = 'https://linearlogic.ai/api/v1'
 
 MODULE_ROOT = os.path.expanduser("~") + os.sep + ".linear-logic"
 
+DEFAULT_CACHE_TTL = 60
+DEFAULT_CACHE_MAX_ENTRIES = 1024
+
 
 class ProjectType:
     Image = "image"
@@ -105,6 +108,11 @@ TASK_TAGS_KEY = 'tags'
 TASK_METADATA_KEY = 'metadata'
 TASK_EXTERNAL_DATA_KEY = 'external_data'
 TASK_UNIQUE_ID_KEY = 'unique_id'
+TASK_ANNOTATION_CHANGES_KEY = 'annotation_changes'
+
+ANNOTATION_CHANGES_ADDED_KEY = 'added'
+ANNOTATION_CHANGES_UPDATED_KEY = 'updated'
+ANNOTATION_CHANGES_REMOVED_KEY = 'removed'
 
 IMAGE_TASK_MEDIA_SPECS = 'media_specs'
 IMAGE_TASK_WIDTH = 'width'
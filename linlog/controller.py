@@ -1,46 +1,215 @@
+import json
+import threading
+import time
+import weakref
 import requests
-import copy
-from typing import Tuple
+from concurrent.futures import Executor, ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
+from types import MappingProxyType
+from typing import (
+    Any, Callable, Dict, Hashable, Iterator, List, Mapping, Optional, Tuple,
+    Union
+)
 from linlog.constants import BASE_URL
 from requests.adapters import Response
 
+from linlog.compression import (
+    DEFAULT_COMPRESSION_THRESHOLD,
+    DEFAULT_OFFLOAD_THRESHOLD,
+    check_encoding,
+    compress
+)
 from linlog.exceptions import NotFound
+from linlog.metrics import (
+    AFTER_RESPONSE,
+    BEFORE_REQUEST,
+    HOOK_EVENTS,
+    ON_ERROR,
+    Hook,
+    MetricsCollector,
+    RequestEvent,
+    normalise_endpoint
+)
+from linlog.ratelimit import AdaptiveConcurrencyLimiter, RateLimiter
+from linlog.singleflight import SingleFlight
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - optional dependency
+    _json_loads = json.loads
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+try:
+    # urllib3 only advertises the encodings it can decode (br and zstd
+    # depend on optional packages)
+    from urllib3.util.request import ACCEPT_ENCODING
+except ImportError:  # pragma: no cover - urllib3 < 2
+    ACCEPT_ENCODING = "gzip,deflate"
 
 HTTP_TOTAL_RETRIES = 3
 HTTP_RETRY_BACKOFF_FACTOR = 2
 HTTP_STATUS_FORCE_LIST = [408, 429] + list(range(500, 531))
 HTTP_RETRY_ALLOWED_METHODS = frozenset({"GET", "POST", "DELETE"})
 
+COMPRESSIBLE_METHODS = frozenset({"POST", "PATCH"})
+
+CoalesceKey = Callable[[str, Optional[Dict]], Optional[Hashable]]
+
+
+def _top_level_fields(
+    events: Iterator[Tuple[str, str, Any]],
+    items_key: str,
+    meta: Dict[str, Any]
+) -> Iterator[Tuple[str, str, Any]]:
+    """Passes ijson parse events through, recording the scalar top level
+    fields other than ``items_key`` in ``meta``."""
+    for prefix, event, value in events:
+        if prefix and "." not in prefix and prefix != items_key \
+                and event not in ("start_map", "start_array", "map_key",
+                                  "end_map", "end_array"):
+            meta[prefix] = value
+        yield prefix, event, value
+
+
+def _bytes_read(res: Response) -> int:
+    """Size of the (compressed) body read from a streamed response."""
+    try:
+        return res.raw.tell()
+    except Exception:
+        return int(res.headers.get("Content-Length", 0))
+
+
+def default_coalesce_key(endpoint: str, params: Optional[Dict]) -> Hashable:
+    if not params:
+        return endpoint
+    return endpoint, tuple(sorted(
+        (key, repr(value)) for key, value in params.items()
+    ))
+
 
 class Controller:
+    """HTTP layer of the client, safe to share between threads.
+
+    Each thread sends its requests through its own ``requests.Session``,
+    so connections are reused without sessions being shared across
+    threads. The default headers are an immutable mapping merged with the
+    headers of a request only when it has extra headers,
+    ``set_default_headers`` swaps in a new mapping.
+    """
 
     api_key = None
     base_url = None
     auth = None
-    headers = {}
-    headers_multipart_form_data = {}
 
     def __init__(self,
                  api_key: Tuple[str, str],
                  user_agent_extension=None,
-                 base_url=BASE_URL):
+                 base_url=BASE_URL,
+                 coalesce_gets: bool = True,
+                 coalesce_key: Optional[CoalesceKey] = None,
+                 rate_limit: Optional[float] = None,
+                 endpoint_rate_limits: Optional[Dict[str, float]] = None,
+                 adaptive_concurrency: Union[
+                     bool, AdaptiveConcurrencyLimiter
+                 ] = False,
+                 collect_metrics: bool = True,
+                 request_compression: Optional[str] = None,
+                 compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+                 compressed_endpoints: Optional[List[str]] = None,
+                 compression_offload_threshold: int =
+                 DEFAULT_OFFLOAD_THRESHOLD,
+                 compression_executor: Optional[Executor] = None):
+        """
+        :param coalesce_gets: share a single in-flight request between
+                              concurrent identical GET requests, a GET
+                              sent after a write through this controller
+                              never joins one started before it
+        :param coalesce_key: callable building the coalescing key from
+                             ``(endpoint, params)``, returning None skips
+                             coalescing for that request
+        :param rate_limit: maximum requests per second over all endpoints
+        :param endpoint_rate_limits: maximum requests per second keyed by
+                                     endpoint prefix, e.g.
+                                     ``{"search/tasks": 5}``
+        :param adaptive_concurrency: limit requests in flight with an AIMD
+                                     controller, pass an
+                                     AdaptiveConcurrencyLimiter to tune it
+        :param collect_metrics: record request metrics in ``self.metrics``
+        :param request_compression: compress POST/PATCH bodies with
+                                    ``gzip`` or ``zstd`` (requires
+                                    zstandard)
+        :param compression_threshold: only compress bodies of at least
+                                      this many bytes
+        :param compressed_endpoints: endpoint prefixes to compress bodies
+                                     for, all endpoints when omitted
+        :param compression_offload_threshold: bodies of at least this many
+                                              bytes are compressed on
+                                              ``compression_executor``
+                                              instead of the requesting
+                                              thread
+        :param compression_executor: executor compressing large bodies,
+                                     e.g. a ProcessPoolExecutor, by
+                                     default a thread pool owned by the
+                                     controller
+        """
 
         if api_key == "" or not bool(api_key):
             raise Exception("Please provide a valid API Key.")
 
         self.api_key = api_key
         self.base_url = base_url
-        self.headers = {
+        headers = {
             "Content-Type": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING,
         }
 
         if api_key[1] == "":
             self.auth = None
-            self.headers["Authorization"] = f"Token {api_key[0]}"
+            headers["Authorization"] = f"Token {api_key[0]}"
         else:
             self.auth = self.api_key
 
-        self.headers_multipart_form_data = {}
+        self.headers: Mapping[str, str] = MappingProxyType(headers)
+        self._headers_lock = threading.Lock()
+        self._local = threading.local()
+        self._sessions: "weakref.WeakSet[requests.Session]" = \
+            weakref.WeakSet()
+
+        self.coalesce_gets = coalesce_gets
+        self.coalesce_key = coalesce_key or default_coalesce_key
+        self._single_flight = SingleFlight()
+
+        self.rate_limiter = RateLimiter(rate_limit, endpoint_rate_limits) \
+            if rate_limit or endpoint_rate_limits else None
+
+        if adaptive_concurrency is True:
+            adaptive_concurrency = AdaptiveConcurrencyLimiter()
+        self.concurrency_limiter = adaptive_concurrency or None
+
+        # Hooks are replaced rather than mutated, requests running on other
+        # threads keep iterating over the tuple they started with
+        self.hooks: Dict[str, Tuple[Hook, ...]] = {
+            event: () for event in HOOK_EVENTS
+        }
+        self._hooks_lock = threading.Lock()
+        self.metrics = MetricsCollector().attach(self) \
+            if collect_metrics else None
+
+        self.request_compression = check_encoding(request_compression) \
+            if request_compression else None
+        self.compression_threshold = compression_threshold
+        self.compressed_endpoints = compressed_endpoints
+        # Endpoints which rejected a compressed body with a 415
+        self._uncompressed_endpoints = set()
+        self.compression_offload_threshold = compression_offload_threshold
+        self._compression_executor = compression_executor
+        self._owns_compression_executor = compression_executor is None
+        self._compression_lock = threading.Lock()
 
     def _perform_api_request(
             self,
@@ -56,20 +225,249 @@ class Controller:
         """Generic HTTP request method with error handling."""
         url = f"{self.base_url}/{endpoint}"
 
-        res = self._http_request(
-            method, url, headers, auth, params, body, files, data
+        try:
+            if method in COMPRESSIBLE_METHODS and not files \
+                    and self._should_compress(endpoint):
+                res = self._send_compressed(
+                    endpoint, method, url, headers, auth, params, body, data
+                )
+            else:
+                res = self._send_request(
+                    endpoint, method, url, headers, auth, params, body,
+                    files, data
+                )
+        finally:
+            if method != "GET":
+                # GETs sent from now on must see the write, not join a
+                # request that may have been answered before it
+                self._single_flight.forget()
+
+        return self._handle_response(res)
+
+    def _should_compress(self, endpoint: str) -> bool:
+        if self.request_compression is None:
+            return False
+
+        if normalise_endpoint(endpoint) in self._uncompressed_endpoints:
+            return False
+
+        return self.compressed_endpoints is None or any(
+            endpoint.startswith(prefix)
+            for prefix in self.compressed_endpoints
+        )
+
+    def _send_compressed(
+            self, endpoint, method, url, headers, auth, params, body, data
+    ) -> Response:
+        """Sends ``data`` compressed when it is over the size threshold,
+        falling back to an uncompressed body (and remembering to do so)
+        for endpoints answering 415 Unsupported Media Type."""
+        if not isinstance(data, (bytes, bytearray)):
+            data = json.dumps(data).encode("utf-8")
+
+        if len(data) < self.compression_threshold:
+            return self._send_request(
+                endpoint, method, url, headers, auth, params, body, None,
+                data
+            )
+
+        res = self._send_request(
+            endpoint,
+            method,
+            url,
+            {**(headers or {}), "Content-Encoding": self.request_compression},
+            auth,
+            params,
+            body,
+            None,
+            self._compress(data)
         )
 
+        if res.status_code != 415:
+            return res
+
+        self._uncompressed_endpoints.add(normalise_endpoint(endpoint))
+        return self._send_request(
+            endpoint, method, url, headers, auth, params, body, None, data
+        )
+
+    def _send_request(
+        self,
+        endpoint,
+        method,
+        url,
+        *args
+    ) -> Response:
+        """Runs ``_http_request`` under the rate and concurrency limits and
+        reports it to the registered hooks."""
+        res, event = self._start_request(endpoint, method, url, *args)
+        self._complete_request(res, event, len(res.content or b""))
+        return res
+
+    def _start_request(
+        self,
+        endpoint,
+        method,
+        url,
+        *args,
+        stream: bool = False
+    ) -> Tuple[Response, RequestEvent]:
+        """Sends a request and returns its response once the headers
+        arrived, together with the event to pass to
+        :meth:`_complete_request` once the body has been read."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(endpoint)
+
+        limiter = self.concurrency_limiter
+        if limiter is not None:
+            limiter.acquire()
+
+        event = RequestEvent(method=method, endpoint=endpoint, url=url)
+        res = None
+        try:
+            # A failing hook fails the request, the slot is still released
+            # and on_error balances the before_request hooks
+            self._emit(BEFORE_REQUEST, event)
+            res = self._http_request(method, url, *args, stream=stream)
+        except Exception as e:
+            self._fail_request(event, e)
+            raise
+        finally:
+            if limiter is not None:
+                limiter.release(
+                    latency=time.monotonic() - event.started_at,
+                    status_code=res.status_code if res is not None else None,
+                    endpoint=f"{method} {normalise_endpoint(endpoint)}"
+                )
+
+        return res, event
+
+    def _complete_request(
+        self,
+        res: Response,
+        event: RequestEvent,
+        bytes_in: int
+    ) -> None:
+        event.duration = time.monotonic() - event.started_at
+        event.status_code = res.status_code
+        event.bytes_in = bytes_in
+        request_body = getattr(res.request, "body", None)
+        event.bytes_out = len(request_body) if request_body else 0
+        self._emit(AFTER_RESPONSE, event)
+
+        if res.status_code == 429 and self.rate_limiter is not None:
+            retry_after = res.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                self.rate_limiter.pause(event.endpoint, int(retry_after))
+
+    def _fail_request(self, event: RequestEvent, error: Exception) -> None:
+        event.duration = time.monotonic() - event.started_at
+        event.error = error
+        self._emit(ON_ERROR, event)
+
+    def add_hook(self, event: str, hook: Hook) -> None:
+        """Registers a callable receiving a RequestEvent for one of
+        ``before_request``, ``after_response`` or ``on_error``."""
+        if event not in self.hooks:
+            raise ValueError(
+                f"Unknown hook event '{event}', expected one of: " +
+                ", ".join(HOOK_EVENTS)
+            )
+        with self._hooks_lock:
+            self.hooks[event] = self.hooks[event] + (hook,)
+
+    def remove_hook(self, event: str, hook: Hook) -> None:
+        with self._hooks_lock:
+            hooks = list(self.hooks[event])
+            hooks.remove(hook)
+            self.hooks[event] = tuple(hooks)
+
+    def set_default_headers(self, headers: Dict[str, Optional[str]]) -> None:
+        """Adds or replaces default headers sent with every request, a
+        None value removes the header. Requests already running keep the
+        headers they started with."""
+        with self._headers_lock:
+            merged = {**self.headers, **headers}
+            self.headers = MappingProxyType({
+                key: value for key, value in merged.items()
+                if value is not None
+            })
+
+    def _merge_headers(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        files=None
+    ) -> Mapping[str, str]:
+        if not headers and not files:
+            return self.headers
+
+        merged = {**self.headers, **(headers or {})}
+        if files:
+            # requests sets the multipart boundary itself
+            merged.pop('Content-Type', None)
+        return merged
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            # Authentication is explicit, server cookies are not replayed
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            self._local.session = session
+            self._sessions.add(session)
+        return session
+
+    def close(self) -> None:
+        """Closes the connections of every thread's session."""
+        for session in list(self._sessions):
+            session.close()
+
+        with self._compression_lock:
+            executor = self._compression_executor
+            if self._owns_compression_executor and executor is not None:
+                self._compression_executor = None
+                executor.shutdown()
+
+    def _compress(self, data: bytes) -> bytes:
+        if len(data) < self.compression_offload_threshold:
+            return compress(data, self.request_compression)
+
+        with self._compression_lock:
+            if self._compression_executor is None:
+                self._compression_executor = ThreadPoolExecutor(
+                    thread_name_prefix="linlog-compression"
+                )
+            future = self._compression_executor.submit(
+                compress, data, self.request_compression
+            )
+        return future.result()
+
+    def _emit(self, event_name: str, event: RequestEvent) -> None:
+        """Runs every hook of ``event_name``, the first exception raised
+        by a hook is re-raised once all of them have run."""
+        error = None
+        for hook in self.hooks[event_name]:
+            try:
+                hook(event)
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+
+    @staticmethod
+    def _handle_response(res: Response):
         if res.status_code not in [200, 201, 204]:
             if res.status_code == 404:
                 raise NotFound(res.text)
 
             raise Exception(res.text, res.status_code)
 
-        return res.json() if len(res.text) > 1 else None
+        # Decode straight from the (already decompressed) body bytes
+        content = res.content
+        return _json_loads(content) if len(content) > 1 else None
 
-    @staticmethod
     def _http_request(
+            self,
             method,
             url,
             headers=None,
@@ -78,35 +476,152 @@ class Controller:
             body=None,
             files=None,
             data=None,
+            stream=False,
     ) -> Response:
-        s = requests.Session()
-        s.auth = auth
-
         params = params or {}
         body = body or None
 
-        import json
-        return requests.request(
+        # Payloads that were already encoded (e.g. with
+        # linlog.encoder.TaskEncoder) are sent as-is.
+        if not files and not isinstance(data, (bytes, bytearray)):
+            data = json.dumps(data)
+
+        return self._session().request(
             method=method,
             url=url,
             params=params,
             json=body,
             files=files,
-            data=json.dumps(data) if not files else data,
+            data=data,
             headers=headers,
-            auth=auth
+            auth=auth,
+            stream=stream
         )
 
-    def get_request(self, endpoint, params=None):
+    def _coalesced(self, key, fn: Callable[[], Any], coalesce=None):
+        if coalesce is None:
+            coalesce = self.coalesce_gets
 
-        return self._perform_api_request(
-            "GET",
+        if not coalesce or key is None:
+            return fn()
+
+        return self._single_flight.do(key, fn)
+
+    def get_request(self, endpoint, params=None, coalesce: bool = None):
+        """
+        :param coalesce: overrides ``coalesce_gets`` for this request
+        """
+        return self._coalesced(
+            self.coalesce_key(endpoint, params),
+            lambda: self._perform_api_request(
+                "GET",
+                endpoint,
+                headers=self.headers,
+                auth=self.auth,
+                params=params
+            ),
+            coalesce
+        )
+
+    def conditional_get_request(
+        self,
+        endpoint,
+        etag: Optional[str] = None,
+        params=None
+    ) -> Tuple[Any, Optional[str], bool]:
+        """GET request revalidating a cached representation.
+
+        Sends ``If-None-Match`` when an ``etag`` is given and returns a
+        ``(payload, etag, modified)`` tuple. When the server answers
+        304 Not Modified the payload is None and ``modified`` is False.
+        """
+        headers = self._merge_headers(
+            {"If-None-Match": etag} if etag else None
+        )
+
+        def request():
+            res = self._send_request(
+                endpoint,
+                "GET",
+                f"{self.base_url}/{endpoint}",
+                headers,
+                self.auth,
+                params
+            )
+
+            if res.status_code == 304:
+                return None, etag, False
+
+            return self._handle_response(res), res.headers.get("ETag"), True
+
+        key = self.coalesce_key(endpoint, params)
+        return self._coalesced(
+            (key, etag) if key is not None else None,
+            request
+        )
+
+    def stream_request(
+        self,
+        method,
+        endpoint,
+        data=None,
+        params=None,
+        items_key: str = "results",
+        meta: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Any]:
+        """Yields the items of the ``items_key`` list of a JSON response
+        while the body is being downloaded, without holding the whole
+        page in memory. The request is reported to the after_response
+        hooks once the body has been read.
+
+        Incremental decoding requires the ``ijson`` package, without it
+        the body is decoded in one go once it has arrived.
+
+        :param meta: filled with the other top level fields of the
+                     response, e.g. ``count`` and ``next``, complete
+                     once every item has been consumed
+        """
+        res, event = self._start_request(
             endpoint,
-            headers=self.headers,
-            auth=self.auth,
-            params=params
+            method,
+            f"{self.base_url}/{endpoint}",
+            self.headers,
+            self.auth,
+            params,
+            None,
+            None,
+            data,
+            stream=True
         )
 
+        try:
+            if res.status_code not in [200, 201, 204] or ijson is None:
+                payload = self._handle_response(res) or {}
+                if meta is not None:
+                    meta.update(
+                        (key, value) for key, value in payload.items()
+                        if key != items_key
+                    )
+                yield from payload.get(items_key, [])
+            else:
+                res.raw.decode_content = True
+                events = ijson.parse(res.raw, use_float=True)
+                if meta is not None:
+                    events = _top_level_fields(events, items_key, meta)
+                yield from ijson.items(events, f"{items_key}.item")
+        except Exception as e:
+            res.close()
+            self._fail_request(event, e)
+            raise
+        finally:
+            # Also reached when the consumer stops early
+            if event.error is None:
+                bytes_in = _bytes_read(res)
+                res.close()
+                self._complete_request(res, event, bytes_in)
+            if method != "GET":
+                self._single_flight.forget()
+
     def post_request(
         self,
         endpoint,
@@ -115,20 +630,10 @@ class Controller:
         files=None,
         headers=None
     ):
-        if not headers:
-            headers = {}
-
-        _headers = copy.deepcopy(self.headers)
-        for key in headers.keys():
-            _headers[key] = headers[key]
-
-        if bool(files) and 'Content-Type' in _headers.keys():
-            del _headers['Content-Type']
-
         return self._perform_api_request(
             "POST",
             endpoint,
-            headers=_headers,
+            headers=self._merge_headers(headers, files),
             auth=self.auth,
             params=params,
             data=data,
@@ -143,21 +648,10 @@ class Controller:
         files=None,
         headers=None
     ):
-
-        if not headers:
-            headers = {}
-
-        _headers = copy.deepcopy(self.headers)
-        for key in headers.keys():
-            _headers[key] = headers[key]
-
-        if bool(files) and 'Content-Type' in _headers.keys():
-            del _headers['Content-Type']
-
         return self._perform_api_request(
             "PATCH",
             endpoint,
-            headers=_headers,
+            headers=self._merge_headers(headers, files),
             auth=self.auth,
             params=params,
             data=data,
@@ -1,2 +1,3 @@
 from .local_dataset import LocalDataset  # noqa
 from .remote_dataset import RemoteDataset  # noqa
+from .mapped_dataset import MappedDataset  # noqa
@@ -16,12 +16,22 @@ class BaseDataset(object):
     name: str
     dataset_type: str
     labels: List
-    tasks: List = []
+    tasks: List
+
+    def __init__(self) -> None:
+        self.tasks = []
 
     @property
     def label_mapping(self) -> Dict[str, int]:
+        # The taxonomy is only read from the server through the client's
+        # metadata cache, without a cache the loaded labels are used
+        client = getattr(self, "client", None)
+        labels = client.get_dataset_labels(self.id) \
+            if client is not None and client.cache is not None \
+            else self.labels
+
         categories: Dict[str, int] = {}
-        for obj in self.labels:
+        for obj in labels:
             if obj['label'] not in categories and bool(obj['label']):
                 categories[obj['label']] = len(categories)
         return categories
@@ -1,10 +1,15 @@
 import os
-from typing import List
+from typing import Dict, List, Optional
 from linlog import schemas
 from linlog.importer import get_importer
 from linlog.exporter import get_exporter
 from linlog.importer.importer import import_tasks
-from linlog.exporter.exporter import export_tasks
+from linlog.exporter.exporter import (
+    create_writer,
+    export_formats,
+    export_tasks
+)
+from linlog.split import Splitter
 from dataclasses import dataclass, field
 
 
@@ -21,14 +26,61 @@ class LocalDataset:
         )
         self.tasks.extend(results)
 
-    def export(self, format: str, output_directory: os.PathLike):
-        exporter = get_exporter(format)
+    def export(
+        self,
+        format: Optional[str] = None,
+        output_directory: Optional[os.PathLike] = None,
+        formats: Optional[List[str]] = None,
+        splitter: Optional[Splitter] = None,
+        **options
+    ):
+        """Exports the tasks to ``format``, or to every format of
+        ``formats`` with a single pass over the tasks.
+
+        :param splitter: writes each split to its own sub-directory
+        :param options: options of the format, e.g. ``shard_size`` for
+                        the shards format
+        """
+        if output_directory is None:
+            raise Exception("An output directory is required")
+
+        if splitter is not None:
+            writer = create_writer(
+                output_directory, format or 'linearlogic', formats,
+                splitter, **options
+            )
+            for task in self.tasks:
+                writer.write(task)
+            writer.close()
+            return writer.paths
+
+        if formats:
+            return export_formats(
+                formats, self.tasks, output_directory, **options
+            )
+
+        exporter = get_exporter(format or 'linearlogic')
         export_tasks(
             exporter,
             self.tasks,
-            output_directory
+            output_directory,
+            **options
         )
 
+    def split(
+        self,
+        ratios: Optional[Dict[str, float]] = None,
+        seed: int = 0,
+        stratify: bool = False
+    ) -> Dict[str, 'LocalDataset']:
+        """Splits the tasks into datasets, e.g. train/val/test, see
+        :class:`linlog.split.Splitter`."""
+        splitter = Splitter(ratios, seed=seed, stratify=stratify)
+        splits = {name: LocalDataset() for name in splitter.ratios}
+        for name, task in splitter.split(self.tasks):
+            splits[name].tasks.append(task)
+        return splits
+
     def __len__(self):
         return len(self.tasks)
 
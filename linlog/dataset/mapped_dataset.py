@@ -0,0 +1,421 @@
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import numpy as np
+from array import array
+from typing import Dict, Iterable, List, Union
+from linlog import schemas
+from linlog.constants import (
+    ANNOTATION_TYPE_KEY,
+    BOUNDING_BOX_HEIGHT_KEY,
+    BOUNDING_BOX_LEFT_KEY,
+    BOUNDING_BOX_ROTATION_KEY,
+    BOUNDING_BOX_TOP_KEY,
+    BOUNDING_BOX_WIDTH_KEY,
+    POLYGON_SEGMENTS_KEY,
+    POLYGON_SEGMENTS_PATH_KEY,
+    POLYGON_SEGMENTS_SUBTRACTION_KEY,
+    POLYGON_VERTEX_X_KEY,
+    POLYGON_VERTEX_Y_KEY,
+    TASK_ANNOTATIONS_KEY,
+    AnnotationType
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+STORE_VERSION = 3
+
+META_FILE = "meta.json"
+RECORDS_FILE = "records.bin"
+OFFSETS_FILE = "offsets.bin"
+BOXES_FILE = "boxes.bin"
+BOX_OFFSETS_FILE = "box_offsets.bin"
+VERTICES_FILE = "vertices.bin"
+BOX_INTS_FILE = "box_ints.bin"
+VERTEX_INTS_FILE = "vertex_ints.bin"
+BOX_NULLS_FILE = "box_nulls.bin"
+
+# RAM backed file system of Linux, mapping its files involves no disk
+SHARED_MEMORY_DIRECTORY = "/dev/shm"
+
+BOX_KEYS = [
+    BOUNDING_BOX_TOP_KEY,
+    BOUNDING_BOX_LEFT_KEY,
+    BOUNDING_BOX_WIDTH_KEY,
+    BOUNDING_BOX_HEIGHT_KEY,
+    BOUNDING_BOX_ROTATION_KEY
+]
+
+# Keys replacing the geometry in stored annotation records
+STORE_BOX_KEY = '_box'
+STORE_SEGMENTS_KEY = '_segments'
+
+
+def _dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=str)
+    return json.dumps(
+        value, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _int_mask(values: List) -> int:
+    """Bit ``i`` is set when ``values[i]`` is an integer."""
+    mask = 0
+    for bit, value in enumerate(values):
+        if type(value) is int:
+            mask |= 1 << bit
+    return mask
+
+
+def _null_mask(values: List) -> int:
+    """Bit ``i`` is set when ``values[i]`` is None."""
+    mask = 0
+    for bit, value in enumerate(values):
+        if value is None:
+            mask |= 1 << bit
+    return mask
+
+
+def _restore_ints(values: List[float], mask: int) -> List:
+    if not mask:
+        return values
+    return [
+        int(value) if mask >> bit & 1 else value
+        for bit, value in enumerate(values)
+    ]
+
+
+class MappedDataset:
+    """Read-only dataset stored in a directory of flat binary files.
+
+    Task records (everything but the geometry) are stored back to back in
+    ``records.bin`` and located through an offset index, bounding boxes
+    and polygon vertices live in float64 arrays. A bit mask per box and
+    per vertex records which of its values were integers, so that
+    payloads come back with the types they were stored with (integers
+    beyond 2**53 lose precision), a second mask per box marks its None
+    values, stored as NaN. All files are memory
+    mapped, so ``dataset[i]`` decodes a single record without loading the
+    rest, and worker processes share the pages of the OS page cache
+    instead of each holding a copy. Pickling only transfers the path, the
+    files are mapped again in the receiving process.
+
+    .. code-block:: python
+
+        MappedDataset.build("train.lld", local_dataset)
+        dataset = MappedDataset("train.lld")
+        task = dataset[42]
+        boxes = dataset.boxes(42)  # [top, left, width, height, rotation]
+    """
+
+    def __init__(self, path: os.PathLike) -> None:
+        self.path = os.fspath(path)
+        self._open()
+
+    def _open(self) -> None:
+        with open(os.path.join(self.path, META_FILE)) as f:
+            self.meta: Dict = json.load(f)
+
+        if self.meta.get("version") != STORE_VERSION:
+            raise Exception(
+                f"Unsupported dataset store version: "
+                f"{self.meta.get('version')}"
+            )
+
+        count = self.meta["tasks"]
+        self.offsets = self._map(OFFSETS_FILE, np.int64, (count + 1,))
+        self.box_offsets = self._map(
+            BOX_OFFSETS_FILE, np.int64, (count + 1,)
+        )
+        self.all_boxes = self._map(
+            BOXES_FILE, np.float64, (self.meta["boxes"], len(BOX_KEYS))
+        )
+        self.vertices = self._map(
+            VERTICES_FILE, np.float64, (self.meta["vertices"], 2)
+        )
+        self.box_ints = self._map(
+            BOX_INTS_FILE, np.uint8, (self.meta["boxes"],)
+        )
+        self.vertex_ints = self._map(
+            VERTEX_INTS_FILE, np.uint8, (self.meta["vertices"],)
+        )
+        self.box_nulls = self._map(
+            BOX_NULLS_FILE, np.uint8, (self.meta["boxes"],)
+        )
+
+        self._records_file = open(
+            os.path.join(self.path, RECORDS_FILE), "rb"
+        )
+        self._records = mmap.mmap(
+            self._records_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) if self.offsets[-1] > 0 else b""
+
+    def _map(self, filename: str, dtype, shape) -> np.ndarray:
+        if np.prod(shape) == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(
+            os.path.join(self.path, filename), dtype=dtype, mode="r",
+            shape=shape
+        )
+
+    @classmethod
+    def build(
+        cls,
+        path: os.PathLike,
+        tasks: Iterable[Union[schemas.Task, Dict]],
+        overwrite: bool = False
+    ) -> 'MappedDataset':
+        """Writes tasks to a new store at ``path`` and opens it. Tasks are
+        streamed to disk one at a time.
+
+        :param tasks: Task objects or task payloads, a LocalDataset or a
+                      RemoteDataset
+        :param overwrite: replace the contents of ``path`` if it is not
+                          empty, otherwise an exception is raised
+        """
+        if os.path.isdir(path) and os.listdir(path):
+            if not overwrite:
+                raise Exception(
+                    f"{os.fspath(path)} is not empty, pass overwrite=True "
+                    "to replace it"
+                )
+            shutil.rmtree(path)
+        os.makedirs(path, exist_ok=True)
+
+        def open_file(filename):
+            return open(os.path.join(path, filename), "wb")
+
+        count = 0
+        box_count = 0
+        vertex_count = 0
+
+        with open_file(RECORDS_FILE) as records, \
+                open_file(OFFSETS_FILE) as offsets, \
+                open_file(BOXES_FILE) as boxes, \
+                open_file(BOX_OFFSETS_FILE) as box_offsets, \
+                open_file(VERTICES_FILE) as vertices, \
+                open_file(BOX_INTS_FILE) as box_ints, \
+                open_file(BOX_NULLS_FILE) as box_nulls, \
+                open_file(VERTEX_INTS_FILE) as vertex_ints:
+            position = 0
+            array('q', [0]).tofile(offsets)
+            array('q', [0]).tofile(box_offsets)
+
+            for task in getattr(tasks, "tasks", tasks):
+                payload = task if isinstance(task, dict) else task.to_dict()
+
+                annotations = []
+                task_boxes = array('d')
+                task_vertices = array('d')
+                task_box_ints = array('B')
+                task_box_nulls = array('B')
+                task_vertex_ints = array('B')
+                for annotation in payload.get(TASK_ANNOTATIONS_KEY) or []:
+                    annotation = dict(annotation)
+                    annotation_type = annotation.get(ANNOTATION_TYPE_KEY)
+
+                    if annotation_type == AnnotationType.Polygon:
+                        segments = []
+                        for segment in annotation.pop(
+                            POLYGON_SEGMENTS_KEY, None
+                        ) or []:
+                            ranges = []
+                            for key in [
+                                POLYGON_SEGMENTS_PATH_KEY,
+                                POLYGON_SEGMENTS_SUBTRACTION_KEY
+                            ]:
+                                start = vertex_count + len(task_vertices) // 2
+                                for vertex in segment.get(key) or []:
+                                    values = [
+                                        vertex[POLYGON_VERTEX_X_KEY],
+                                        vertex[POLYGON_VERTEX_Y_KEY]
+                                    ]
+                                    task_vertices.extend(values)
+                                    task_vertex_ints.append(
+                                        _int_mask(values)
+                                    )
+                                ranges.extend([
+                                    start,
+                                    vertex_count + len(task_vertices) // 2
+                                ])
+                            segments.append(ranges)
+                        annotation[STORE_SEGMENTS_KEY] = segments
+
+                    elif annotation_type == AnnotationType.BoundingBox:
+                        annotation[STORE_BOX_KEY] = \
+                            box_count + len(task_boxes) // len(BOX_KEYS)
+                        values = [annotation.get(key) for key in BOX_KEYS]
+                        # None values stay in the record, so that they
+                        # come back as None rather than as missing keys
+                        for key, value in zip(BOX_KEYS, values):
+                            if value is not None:
+                                del annotation[key]
+                        task_boxes.extend([
+                            np.nan if value is None else value
+                            for value in values
+                        ])
+                        task_box_ints.append(_int_mask(values))
+                        task_box_nulls.append(_null_mask(values))
+
+                    annotations.append(annotation)
+
+                record = _dumps({
+                    **payload, TASK_ANNOTATIONS_KEY: annotations
+                })
+                records.write(record)
+                task_boxes.tofile(boxes)
+                task_vertices.tofile(vertices)
+                task_box_ints.tofile(box_ints)
+                task_box_nulls.tofile(box_nulls)
+                task_vertex_ints.tofile(vertex_ints)
+
+                count += 1
+                position += len(record)
+                box_count += len(task_boxes) // len(BOX_KEYS)
+                vertex_count += len(task_vertices) // 2
+                array('q', [position]).tofile(offsets)
+                array('q', [box_count]).tofile(box_offsets)
+
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump({
+                "version": STORE_VERSION,
+                "tasks": count,
+                "boxes": box_count,
+                "vertices": vertex_count
+            }, f)
+
+        return cls(path)
+
+    @classmethod
+    def build_shared(
+        cls,
+        tasks: Iterable[Union[schemas.Task, Dict]]
+    ) -> 'MappedDataset':
+        """Builds a temporary store in shared memory (``/dev/shm`` where
+        available, the temporary directory otherwise) to hand tasks to a
+        process pool: workers receive the path and map the same pages,
+        the geometry is never copied. Call :meth:`unlink` once the
+        workers are done.
+
+        .. code-block:: python
+
+            dataset = MappedDataset.build_shared(tasks)
+            with ProcessPoolExecutor() as executor:
+                areas = list(executor.map(
+                    compute_area, repeat(dataset), range(len(dataset))
+                ))
+            dataset.unlink()
+        """
+        directory = SHARED_MEMORY_DIRECTORY \
+            if os.path.isdir(SHARED_MEMORY_DIRECTORY) else None
+        return cls.build(
+            tempfile.mkdtemp(prefix="linlog-", dir=directory), tasks
+        )
+
+    def unlink(self) -> None:
+        """Closes the dataset and removes its files."""
+        self.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def get_payload(self, index: int) -> Dict:
+        """Task payload of record ``index`` with its geometry restored."""
+        index = self._index(index)
+        start, stop = self.offsets[index], self.offsets[index + 1]
+        payload = _loads(self._records[start:stop])
+
+        for annotation in payload.get(TASK_ANNOTATIONS_KEY) or []:
+            if STORE_BOX_KEY in annotation:
+                box_index = annotation.pop(STORE_BOX_KEY)
+                nulls = int(self.box_nulls[box_index])
+                annotation.update(
+                    (key, value) for bit, (key, value) in enumerate(zip(
+                        BOX_KEYS, _restore_ints(
+                            self.all_boxes[box_index].tolist(),
+                            int(self.box_ints[box_index])
+                        )
+                    ))
+                    if not nulls >> bit & 1
+                )
+
+            if STORE_SEGMENTS_KEY in annotation:
+                annotation[POLYGON_SEGMENTS_KEY] = [
+                    {
+                        POLYGON_SEGMENTS_PATH_KEY:
+                            self._vertices(path_start, path_stop),
+                        POLYGON_SEGMENTS_SUBTRACTION_KEY:
+                            self._vertices(sub_start, sub_stop)
+                    }
+                    for path_start, path_stop, sub_start, sub_stop
+                    in annotation.pop(STORE_SEGMENTS_KEY)
+                ]
+
+        return payload
+
+    def _vertices(self, start: int, stop: int) -> List[Dict]:
+        vertices = []
+        for values, mask in zip(
+            self.vertices[start:stop].tolist(),
+            self.vertex_ints[start:stop].tolist()
+        ):
+            x, y = _restore_ints(values, mask)
+            vertices.append({POLYGON_VERTEX_X_KEY: x, POLYGON_VERTEX_Y_KEY: y})
+        return vertices
+
+    def boxes(self, index: int) -> np.ndarray:
+        """Read-only ``[top, left, width, height, rotation]`` rows of the
+        bounding boxes of task ``index``, a view on the mapped file. None
+        values are NaN."""
+        index = self._index(index)
+        return self.all_boxes[
+            self.box_offsets[index]:self.box_offsets[index + 1]
+        ]
+
+    def _index(self, index: int) -> int:
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("MappedDataset index out of range")
+        return index
+
+    def close(self) -> None:
+        if isinstance(self._records, mmap.mmap):
+            self._records.close()
+        self._records_file.close()
+
+    def __enter__(self) -> 'MappedDataset':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __getstate__(self) -> Dict:
+        return {"path": self.path}
+
+    def __setstate__(self, state: Dict) -> None:
+        self.path = state["path"]
+        self._open()
+
+    def __len__(self) -> int:
+        return self.meta["tasks"]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return schemas.Task.from_json(self.get_payload(index))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __str__(self) -> str:
+        return f"MappedDataset(path={self.path}, tasks={len(self)})"
@@ -0,0 +1,186 @@
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Union
+from linlog.client import LinLogClient
+from linlog.query import TaskQuery
+from linlog.schemas.task import Task
+
+CHECKPOINT_DIRECTORY = ".linlog-pull"
+CHECKPOINT_FILE = "checkpoint.json"
+PAGES_DIRECTORY = "pages"
+
+MAX_PAGE_SIZE = 200
+
+PageCallback = Callable[[int, int], None]
+
+
+class PullCheckpoint:
+    """On-disk progress of a dataset pull.
+
+    Every fetched page is written to its own file and its offset recorded
+    in ``checkpoint.json``, the checkpoint file is replaced atomically so
+    an interrupted pull never leaves it half written. A checkpoint only
+    matches a pull with the same dataset, page size and ``since`` filter,
+    the page offsets would not line up otherwise.
+    """
+
+    def __init__(self, directory: os.PathLike, settings: Dict) -> None:
+        self.directory = os.fspath(directory)
+        self.settings = settings
+        self.count: Optional[int] = None
+        self.completed: List[int] = []
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, CHECKPOINT_FILE)
+
+    def page_path(self, offset: int) -> str:
+        return os.path.join(
+            self.directory, PAGES_DIRECTORY, f"{offset}.json"
+        )
+
+    def exists(self) -> bool:
+        return os.path.isfile(self.path)
+
+    def load(self) -> None:
+        with open(self.path) as f:
+            state = json.load(f)
+
+        if state["settings"] != self.settings:
+            raise Exception(
+                "The interrupted pull used different settings "
+                f"({state['settings']}), run it again without resume "
+                "to start over"
+            )
+
+        self.count = state["count"]
+        self.completed = state["completed"]
+
+    def reset(self) -> None:
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
+        os.makedirs(os.path.join(self.directory, PAGES_DIRECTORY))
+        self.count = None
+        self.completed = []
+
+    def save_page(self, offset: int, tasks: List[Dict]) -> None:
+        with open(self.page_path(offset), "w") as f:
+            json.dump(tasks, f, separators=(",", ":"), default=str)
+
+        with self._lock:
+            self.completed.append(offset)
+            self._write()
+
+    def set_count(self, count: int) -> None:
+        with self._lock:
+            self.count = count
+            self._write()
+
+    def load_page(self, offset: int) -> List[Dict]:
+        with open(self.page_path(offset)) as f:
+            return json.load(f)
+
+    def _write(self) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "settings": self.settings,
+                "count": self.count,
+                "completed": sorted(self.completed)
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def remove(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def pull_dataset_tasks(
+    client: LinLogClient,
+    dataset_id: str,
+    output_directory: os.PathLike,
+    workers: int = 4,
+    page_size: int = MAX_PAGE_SIZE,
+    resume: bool = False,
+    since: Optional[Union[str, datetime]] = None,
+    on_page: Optional[PageCallback] = None
+) -> List[Task]:
+    """Fetches every task of a dataset, annotations included, with
+    ``workers`` concurrent page requests.
+
+    Pages are checkpointed under ``output_directory`` while the pull runs,
+    with ``resume`` an interrupted pull only fetches the pages it is
+    missing. The checkpoint is removed once all tasks are returned.
+
+    :param since: only pull tasks created at or after this date
+    :param on_page: called with ``(tasks_done, tasks_total)`` after every
+                    page
+    """
+    page_size = min(page_size, MAX_PAGE_SIZE)
+    query = TaskQuery().created(since, 'gte') if since else None
+    checkpoint = PullCheckpoint(
+        os.path.join(output_directory, CHECKPOINT_DIRECTORY),
+        {
+            "dataset": dataset_id,
+            "page_size": page_size,
+            "since": str(since) if since else None
+        }
+    )
+
+    if resume and checkpoint.exists():
+        checkpoint.load()
+    else:
+        checkpoint.reset()
+
+    def fetch(offset: int):
+        page = client.get_dataset_tasks(
+            dataset_id,
+            query,
+            limit=page_size,
+            offset=offset,
+            exclude_annotations=False
+        )
+        checkpoint.save_page(offset, page.results)
+        return page
+
+    if checkpoint.count is None:
+        checkpoint.set_count(fetch(0).count)
+
+    count = checkpoint.count
+    done = set(checkpoint.completed)
+    offsets = [
+        offset for offset in range(0, count, page_size)
+        if offset not in done
+    ]
+
+    def report() -> None:
+        if on_page is not None:
+            on_page(
+                min(len(checkpoint.completed) * page_size, count), count
+            )
+
+    report()
+    executor = ThreadPoolExecutor(
+        max_workers=workers,
+        thread_name_prefix="linlog-pull"
+    )
+    try:
+        for _ in executor.map(fetch, offsets):
+            report()
+    except BaseException:
+        # Pages fetched so far stay checkpointed for a resumed pull
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    executor.shutdown()
+
+    tasks = [
+        Task.from_json(payload)
+        for offset in range(0, count, page_size)
+        for payload in checkpoint.load_page(offset)
+    ]
+    checkpoint.remove()
+    return tasks
@@ -1,14 +1,28 @@
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
 import os
 import shutil
-from typing import List
+from typing import Dict, Iterator, List, Optional
 from awesome_progress_bar import ProgressBar
 from linlog.client import LinLogClient
-from linlog.constants import MODULE_ROOT
+from linlog.constants import DATASET_LABEL_NAME_KEY, MODULE_ROOT
+from linlog.dataset.local_dataset import LocalDataset
 from linlog.exporter import get_exporter
-from linlog.exporter.exporter import export_tasks
+from linlog.exporter.exporter import (
+    create_writer,
+    export_formats,
+    export_tasks
+)
+from linlog.exporter.pipeline import (
+    DEFAULT_QUEUE_SIZE,
+    ExportProgress,
+    run_export_pipeline
+)
+from linlog.exporter.prepared import LabelIndex
+from linlog.query import TaskQuery
 from linlog.schemas.dataset import Dataset
 from linlog.schemas.task import Task
+from linlog.split import Splitter
 
 
 @dataclass
@@ -22,10 +36,32 @@ class RemoteDataset:
         self.ll_dataset = Dataset.get_by_id(client, id)
         self.tasks = []
 
-    def fetch_tasks(self, exclude_annotations=True) -> List[Task]:
+    @property
+    def labels(self) -> List[Dict]:
+        """Label taxonomy of the dataset. It is read again from the server
+        through the client's metadata cache when the cache is enabled,
+        otherwise the labels loaded with the dataset are returned."""
+        if self.client.cache is not None:
+            return self.client.get_dataset_labels(self.ll_dataset.id)
+        return [label.to_dict() for label in self.ll_dataset.labels]
+
+    def label_index(self) -> LabelIndex:
+        """Class ids following the order of the dataset taxonomy, labels
+        missing from it get the next ids as the export meets them."""
+        return LabelIndex(
+            label[DATASET_LABEL_NAME_KEY] for label in self.labels
+            if label.get(DATASET_LABEL_NAME_KEY)
+        )
+
+    def fetch_tasks(
+        self,
+        exclude_annotations=True,
+        query: Optional[TaskQuery] = None
+    ) -> List[Task]:
 
         response = self.ll_dataset.get_tasks(
             self.client,
+            query=query,
             offset=0,
             limit=20,
             exclude_annotations=exclude_annotations
@@ -44,6 +80,7 @@ class RemoteDataset:
             bar.iter()
             response = self.ll_dataset.get_tasks(
                 self.client,
+                query=query,
                 limit=response.limit,
                 offset=response.offset + response.limit,
                 exclude_annotations=exclude_annotations
@@ -53,16 +90,26 @@ class RemoteDataset:
         bar.stop()
         return self.tasks
 
-    def pull(self):
+    def pull(self, query: Optional[TaskQuery] = None):
         self.tasks = []
-        self.fetch_tasks(exclude_annotations=False)
+        self.fetch_tasks(exclude_annotations=False, query=query)
 
     def export(
         self,
         output_directory: os.PathLike,
         format: str = "linearlogic",
-        pull: bool = False
+        pull: bool = False,
+        formats: Optional[List[str]] = None,
+        splitter: Optional[Splitter] = None,
+        **options
     ):
+        """Exports the pulled tasks to ``format``, or to every format of
+        ``formats`` with a single pass over the tasks.
+
+        :param splitter: writes each split to its own sub-directory
+        :param options: options of the format, e.g. ``shard_size`` for
+                        the shards format
+        """
         root = MODULE_ROOT + os.sep + "datasets"
         dataset_root = root + os.sep + self.ll_dataset.name
 
@@ -77,14 +124,88 @@ class RemoteDataset:
         if os.path.isdir(dataset_root):
             shutil.rmtree(dataset_root)
 
+        if splitter is not None:
+            writer = create_writer(
+                output_directory, format or 'linearlogic', formats,
+                splitter, self.label_index(), **options
+            )
+            for task in self.tasks:
+                writer.write(task)
+            writer.close()
+            return dataset_root
+
+        if formats:
+            export_formats(
+                formats, self.tasks, output_directory, self.label_index(),
+                **options
+            )
+            return dataset_root
+
         export_tasks(
             get_exporter(format if format else 'linearlogic'),
             self.tasks,
-            output_directory
+            output_directory,
+            **options
         )
 
         return dataset_root
 
+    def export_stream(
+        self,
+        output_directory: os.PathLike,
+        format: str = "linearlogic",
+        query: Optional[TaskQuery] = None,
+        workers: int = 4,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        formats: Optional[List[str]] = None,
+        splitter: Optional[Splitter] = None,
+        decode_executor: Optional[Executor] = None,
+        **options
+    ) -> Iterator[ExportProgress]:
+        """Exports the dataset straight from the server without holding
+        all tasks in memory: pages are fetched by ``workers`` threads,
+        decoded and written while the next pages download. Progress
+        events are yielded as pages are written, the export runs while
+        they are consumed. With ``formats`` every format is written in
+        the same pass and the last event carries the output directory.
+        A ``splitter`` assigns the tasks to splits as they stream by,
+        each split is written to its own sub-directory.
+
+        Pages are decoded on the consuming thread, pass a
+        ``ProcessPoolExecutor`` as ``decode_executor`` to decode them in
+        parallel, see :func:`run_export_pipeline`.
+
+        .. code-block:: python
+
+            for event in dataset.export_stream("./out", "coco"):
+                print(f"{event.tasks_written}/{event.total}")
+        """
+        pages = self.client.iter_dataset_pages(
+            self.ll_dataset.id,
+            query,
+            max_workers=workers,
+            exclude_annotations=False
+        )
+        return run_export_pipeline(
+            pages,
+            create_writer(
+                output_directory, format, formats, splitter,
+                self.label_index(), **options
+            ),
+            queue_size=queue_size,
+            decode_executor=decode_executor
+        )
+
+    def split(
+        self,
+        ratios: Optional[Dict[str, float]] = None,
+        seed: int = 0,
+        stratify: bool = False
+    ) -> Dict[str, LocalDataset]:
+        """Splits the pulled tasks into local datasets, e.g.
+        train/val/test, see :class:`linlog.split.Splitter`."""
+        return LocalDataset(self.tasks).split(ratios, seed, stratify)
+
     def __getitem__(self, index):
         return self.tasks[index]
 
@@ -0,0 +1,356 @@
+import json
+import math
+import threading
+import uuid
+from typing import Iterable, Union
+from linlog.constants import (
+    ANNOTATION_ATTRIBUTES_KEY,
+    ANNOTATION_ID_KEY,
+    ANNOTATION_IOU_KEY,
+    ANNOTATION_IS_MODEL_RUN_KEY,
+    ANNOTATION_LABEL_KEY,
+    ANNOTATION_SOURCE_KEY,
+    ANNOTATION_TYPE_KEY,
+    BOUNDING_BOX_HEIGHT_KEY,
+    BOUNDING_BOX_LEFT_KEY,
+    BOUNDING_BOX_ROTATION_KEY,
+    BOUNDING_BOX_TOP_KEY,
+    BOUNDING_BOX_WIDTH_KEY,
+    GEOTASK_BOUNDS_KEY,
+    GEOTASK_ZOOM_KEY,
+    IMAGE_TASK_HEIGHT,
+    IMAGE_TASK_MEDIA_SPECS,
+    IMAGE_TASK_WIDTH,
+    POLYGON_SEGMENTS_KEY,
+    POLYGON_SEGMENTS_PATH_KEY,
+    POLYGON_SEGMENTS_SUBTRACTION_KEY,
+    POLYGON_VERTEX_X_KEY,
+    POLYGON_VERTEX_Y_KEY,
+    TASK_ANNOTATIONS_KEY,
+    TASK_ATTACHMENT_KEY,
+    TASK_ATTACHMENT_TYPE_KEY,
+    TASK_BATCH_KEY,
+    TASK_COMPLETE_KEY,
+    TASK_DATASET_ID_KEY,
+    TASK_ERRORS_KEY,
+    TASK_EXTERNAL_DATA_KEY,
+    TASK_FILENAME_KEY,
+    TASK_GLOBAL_KEY_KEY,
+    TASK_ID_KEY,
+    TASK_IS_ERROR_KEY,
+    TASK_METADATA_KEY,
+    TASK_PARAMS_KEY,
+    TASK_PROCESSING_KEY,
+    TASK_PROJECT_ID_KEY,
+    TASK_REJECTED_KEY,
+    TASK_TAGS_KEY,
+    TASK_TYPE_KEY,
+    TASK_UNIQUE_ID_KEY,
+    TASK_WARNINGS_KEY,
+    TASK_WORKFLOW_STAGE_KEY,
+    AnnotationType,
+    TaskType
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _stdlib_dumps(value) -> bytes:
+    return json.dumps(
+        value,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_default
+    ).encode("utf-8")
+
+
+def _orjson_dumps(value) -> bytes:
+    # orjson writes NaN and infinities as null and rejects integers out of
+    # the 64 bit range, stdlib json is used for these to raise or encode
+    # them the same way as to_dict
+    if _has_non_finite(value):
+        return _stdlib_dumps(value)
+    try:
+        return orjson.dumps(
+            value, default=_default, option=orjson.OPT_NON_STR_KEYS
+        )
+    except orjson.JSONEncodeError:
+        return _stdlib_dumps(value)
+
+
+def _has_non_finite(value) -> bool:
+    if type(value) is float:
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite(v) for v in value)
+    return False
+
+
+def _default(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(
+        f"Object of type {type(value).__name__} is not JSON serializable"
+    )
+
+
+def _key(name: str) -> bytes:
+    return b'"' + name.encode("utf-8") + b'":'
+
+
+# Pre-encoded object keys, written verbatim into the output buffer.
+_TASK_KEYS = {
+    name: _key(name) for name in (
+        TASK_ID_KEY,
+        TASK_GLOBAL_KEY_KEY,
+        TASK_FILENAME_KEY,
+        TASK_COMPLETE_KEY,
+        TASK_REJECTED_KEY,
+        TASK_WORKFLOW_STAGE_KEY,
+        TASK_ERRORS_KEY,
+        TASK_IS_ERROR_KEY,
+        TASK_PROCESSING_KEY,
+        TASK_WARNINGS_KEY,
+        TASK_PROJECT_ID_KEY,
+        TASK_DATASET_ID_KEY,
+        TASK_BATCH_KEY,
+        TASK_TYPE_KEY,
+        TASK_PARAMS_KEY,
+        TASK_ATTACHMENT_KEY,
+        TASK_ATTACHMENT_TYPE_KEY,
+        TASK_ANNOTATIONS_KEY,
+        TASK_TAGS_KEY,
+        TASK_METADATA_KEY,
+        TASK_EXTERNAL_DATA_KEY,
+        TASK_UNIQUE_ID_KEY,
+        IMAGE_TASK_MEDIA_SPECS,
+        IMAGE_TASK_WIDTH,
+        IMAGE_TASK_HEIGHT,
+        GEOTASK_ZOOM_KEY,
+        GEOTASK_BOUNDS_KEY,
+    )
+}
+
+_ANNOTATION_KEYS = {
+    name: _key(name) for name in (
+        ANNOTATION_ID_KEY,
+        ANNOTATION_LABEL_KEY,
+        ANNOTATION_TYPE_KEY,
+        ANNOTATION_SOURCE_KEY,
+        ANNOTATION_IS_MODEL_RUN_KEY,
+        ANNOTATION_IOU_KEY,
+        ANNOTATION_ATTRIBUTES_KEY,
+        BOUNDING_BOX_TOP_KEY,
+        BOUNDING_BOX_LEFT_KEY,
+        BOUNDING_BOX_WIDTH_KEY,
+        BOUNDING_BOX_HEIGHT_KEY,
+        BOUNDING_BOX_ROTATION_KEY,
+        POLYGON_SEGMENTS_KEY,
+        POLYGON_SEGMENTS_PATH_KEY,
+        POLYGON_SEGMENTS_SUBTRACTION_KEY,
+    )
+}
+
+_VERTEX_X = _key(POLYGON_VERTEX_X_KEY)
+_VERTEX_Y = _key(POLYGON_VERTEX_Y_KEY)
+
+
+class TaskEncoder:
+    """Encodes tasks and annotations straight to JSON bytes.
+
+    Produces the same document as ``json.dumps(task.to_dict())`` without
+    building the intermediate dicts. Keys are pre-encoded, vertex arrays
+    are written number by number and scalar values go through orjson when
+    it is installed (stdlib ``json`` otherwise). Like ``to_json``, NaN and
+    infinities raise a ``ValueError`` and non-string dict keys are written
+    as strings.
+
+    An encoder owns a single output buffer that is reused between calls,
+    so instances must not be shared between threads.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._dumps = _orjson_dumps if orjson is not None else _stdlib_dumps
+
+    def encode(self, task) -> bytes:
+        """Encodes a single task."""
+        buffer = self._reset()
+        self._write_task(buffer, task)
+        return bytes(buffer)
+
+    def encode_many(self, tasks: Iterable) -> bytes:
+        """Encodes an iterable of tasks as a JSON array."""
+        buffer = self._reset()
+        buffer += b"["
+        for idx, task in enumerate(tasks):
+            if idx:
+                buffer += b","
+            self._write_task(buffer, task)
+        buffer += b"]"
+        return bytes(buffer)
+
+    def encode_annotation(self, annotation) -> bytes:
+        """Encodes a single annotation."""
+        buffer = self._reset()
+        self._write_annotation(buffer, annotation)
+        return bytes(buffer)
+
+    def _reset(self) -> bytearray:
+        del self._buffer[:]
+        return self._buffer
+
+    def _value(self, value) -> bytes:
+        if value is None:
+            return b"null"
+        if value is True:
+            return b"true"
+        if value is False:
+            return b"false"
+        if isinstance(value, uuid.UUID):
+            return b'"' + str(value).encode("ascii") + b'"'
+        return self._dumps(value)
+
+    def _write_task(self, buffer: bytearray, task) -> None:
+        keys = _TASK_KEYS
+        value = self._value
+
+        buffer += b"{"
+        buffer += keys[TASK_ID_KEY] + value(task.id)
+        buffer += b"," + keys[TASK_GLOBAL_KEY_KEY] + value(task.global_key)
+        buffer += b"," + keys[TASK_FILENAME_KEY] + value(task.filename)
+        buffer += b"," + keys[TASK_COMPLETE_KEY] + value(task.complete)
+        buffer += b"," + keys[TASK_REJECTED_KEY] + value(task.rejected)
+        buffer += b"," + keys[TASK_WORKFLOW_STAGE_KEY] + \
+            value(task.workflow_stage)
+        buffer += b"," + keys[TASK_ERRORS_KEY] + value(task.errors)
+        buffer += b"," + keys[TASK_IS_ERROR_KEY] + value(task.error)
+        buffer += b"," + keys[TASK_PROCESSING_KEY] + value(task.processing)
+        buffer += b"," + keys[TASK_WARNINGS_KEY] + value(task.warnings)
+        buffer += b"," + keys[TASK_PROJECT_ID_KEY] + value(task.project_id)
+        buffer += b"," + keys[TASK_DATASET_ID_KEY] + value(task.dataset_id)
+        buffer += b"," + keys[TASK_BATCH_KEY] + value(task.batch)
+        buffer += b"," + keys[TASK_TYPE_KEY] + value(task.task_type)
+        buffer += b"," + keys[TASK_PARAMS_KEY] + b"{"
+        buffer += keys[TASK_ATTACHMENT_KEY] + value(task.attachment)
+        buffer += b"," + keys[TASK_ATTACHMENT_TYPE_KEY] + \
+            value(task.attachment_type)
+        buffer += b"}," + keys[TASK_ANNOTATIONS_KEY] + b"["
+        for idx, annotation in enumerate(task.annotations):
+            if idx:
+                buffer += b","
+            self._write_annotation(buffer, annotation)
+        buffer += b"]," + keys[TASK_TAGS_KEY] + value(task.tags)
+        buffer += b"," + keys[TASK_METADATA_KEY] + value(task.metadata)
+        buffer += b"," + keys[TASK_EXTERNAL_DATA_KEY] + \
+            value(task.external_data)
+        buffer += b"," + keys[TASK_UNIQUE_ID_KEY] + value(task.unique_id)
+
+        if task.task_type == TaskType.Geospatial:
+            buffer += b"," + keys[GEOTASK_ZOOM_KEY] + value(task.get_zoom())
+            buffer += b"," + keys[GEOTASK_BOUNDS_KEY] + \
+                value(task.get_bounds())
+        elif getattr(task, "media_specs", None) is not None:
+            buffer += b"," + keys[IMAGE_TASK_MEDIA_SPECS] + b"{"
+            buffer += keys[IMAGE_TASK_WIDTH] + \
+                _number(task.media_specs.width)
+            buffer += b"," + keys[IMAGE_TASK_HEIGHT] + \
+                _number(task.media_specs.height)
+            buffer += b"}"
+
+        buffer += b"}"
+
+    def _write_annotation(self, buffer: bytearray, annotation) -> None:
+        keys = _ANNOTATION_KEYS
+        value = self._value
+        annotation_type = annotation.annotation_type
+
+        buffer += b"{"
+        buffer += keys[ANNOTATION_ID_KEY] + value(annotation.id)
+        buffer += b"," + keys[ANNOTATION_LABEL_KEY] + value(annotation.label)
+        buffer += b"," + keys[ANNOTATION_TYPE_KEY] + value(annotation_type)
+        buffer += b"," + keys[ANNOTATION_SOURCE_KEY] + \
+            value(annotation.source)
+        buffer += b"," + keys[ANNOTATION_IS_MODEL_RUN_KEY] + \
+            value(annotation.is_model_run)
+
+        if annotation_type == AnnotationType.BoundingBox:
+            buffer += b"," + keys[BOUNDING_BOX_TOP_KEY] + \
+                _number(annotation.top)
+            buffer += b"," + keys[BOUNDING_BOX_LEFT_KEY] + \
+                _number(annotation.left)
+            buffer += b"," + keys[BOUNDING_BOX_WIDTH_KEY] + \
+                _number(annotation.width)
+            buffer += b"," + keys[BOUNDING_BOX_HEIGHT_KEY] + \
+                _number(annotation.height)
+            buffer += b"," + keys[BOUNDING_BOX_ROTATION_KEY] + \
+                _number(annotation.rotation)
+            buffer += b"," + keys[ANNOTATION_IOU_KEY] + value(annotation.iou)
+        elif annotation_type == AnnotationType.Polygon:
+            buffer += b"," + keys[ANNOTATION_IOU_KEY] + value(annotation.iou)
+            buffer += b"," + keys[POLYGON_SEGMENTS_KEY] + b"["
+            for idx, segment in enumerate(annotation.segments):
+                if idx:
+                    buffer += b","
+                buffer += b"{" + keys[POLYGON_SEGMENTS_PATH_KEY]
+                _write_vertices(buffer, segment.path)
+                buffer += b"," + keys[POLYGON_SEGMENTS_SUBTRACTION_KEY]
+                _write_vertices(buffer, segment.subtraction)
+                buffer += b"}"
+            buffer += b"]"
+        else:
+            raise NotImplementedError(
+                f"No encoder for annotation type '{annotation_type}'"
+            )
+
+        buffer += b"," + keys[ANNOTATION_ATTRIBUTES_KEY] + \
+            value(annotation.attributes)
+        buffer += b"}"
+
+
+def _number(value: Union[int, float, None]) -> bytes:
+    if value is None:
+        return b"null"
+    if type(value) is int:
+        return int.__repr__(value).encode("ascii")
+    if type(value) is float:
+        if not math.isfinite(value):
+            raise ValueError(
+                f"Out of range float values are not JSON compliant: {value}"
+            )
+        return float.__repr__(value).encode("ascii")
+    return _stdlib_dumps(value)
+
+
+def _write_vertices(buffer: bytearray, vertices) -> None:
+    buffer += b"["
+    for idx, vertex in enumerate(vertices):
+        if idx:
+            buffer += b","
+        buffer += b"{" + _VERTEX_X + _number(vertex.x) + b"," + \
+            _VERTEX_Y + _number(vertex.y) + b"}"
+    buffer += b"]"
+
+
+_local = threading.local()
+
+
+def get_encoder() -> TaskEncoder:
+    """Returns the calling thread's encoder."""
+    encoder = getattr(_local, "encoder", None)
+    if encoder is None:
+        encoder = _local.encoder = TaskEncoder()
+    return encoder
+
+
+def encode_task(task) -> bytes:
+    return get_encoder().encode(task)
+
+
+def encode_tasks(tasks: Iterable) -> bytes:
+    return get_encoder().encode_many(tasks)
@@ -0,0 +1,458 @@
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from linlog.constants import AnnotationType
+from linlog.helpers import annotation_to_box, annotation_to_polygon
+from linlog.schemas.annotation import Annotation
+from linlog.schemas.task import Task
+
+try:
+    import shapely
+except ImportError:  # pragma: no cover - optional dependency
+    shapely = None
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # pragma: no cover - optional dependency
+    linear_sum_assignment = None
+
+
+class MatchingMethod:
+    Greedy = "greedy"
+    Hungarian = "hungarian"
+
+    @classmethod
+    def get_all(self):
+        return [self.Greedy, self.Hungarian]
+
+
+class GeometryType:
+    BoundingBox = "bbox"
+    Polygon = "polygon"
+
+    @classmethod
+    def get_all(self):
+        return [self.BoundingBox, self.Polygon]
+
+
+# COCO style 101 point interpolated precision
+RECALL_THRESHOLDS = np.linspace(0.0, 1.0, 101)
+
+# Groups larger than this are not padded into the batched IoU computation
+MAX_BATCHED_GROUP_SIZE = 64
+
+
+def bbox_iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of ``(..., N, 4)`` and ``(..., M, 4)`` arrays of
+    ``[x1, y1, x2, y2]`` boxes, returns ``(..., N, M)``. Leading batch
+    dimensions are broadcast."""
+    a = boxes_a[..., :, None, :]
+    b = boxes_b[..., None, :, :]
+
+    inter_w = np.clip(
+        np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]),
+        0, None
+    )
+    inter_h = np.clip(
+        np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]),
+        0, None
+    )
+    intersection = inter_w * inter_h
+
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - intersection
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, intersection / union, 0.0)
+
+
+def rasterize_polygons(
+    polygons: Sequence[np.ndarray],
+    xs: np.ndarray,
+    ys: np.ndarray
+) -> np.ndarray:
+    """Boolean ``(len(polygons), len(ys) * len(xs))`` masks of the sample
+    points inside each polygon (even-odd rule)."""
+    px, py = np.meshgrid(xs, ys)
+    px, py = px.ravel()[:, None], py.ravel()[:, None]
+
+    masks = np.zeros((len(polygons), px.shape[0]), dtype=bool)
+    for idx, vertices in enumerate(polygons):
+        x1, y1 = vertices[:, 0], vertices[:, 1]
+        x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+
+        crosses = (y1 > py) != (y2 > py)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_at_y = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        masks[idx] = np.logical_and(crosses, px < x_at_y).sum(axis=1) % 2 == 1
+
+    return masks
+
+
+def polygon_iou_matrix(
+    polygons_a: Sequence[np.ndarray],
+    polygons_b: Sequence[np.ndarray],
+    method: str = "raster",
+    resolution: int = 256
+) -> np.ndarray:
+    """Pairwise IoU of two lists of ``(K, 2)`` vertex arrays.
+
+    ``method="raster"`` samples both sets on a shared ``resolution`` x
+    ``resolution`` grid over their joint extent, ``method="exact"`` uses
+    shapely's polygon intersection.
+    """
+    if len(polygons_a) == 0 or len(polygons_b) == 0:
+        return np.zeros((len(polygons_a), len(polygons_b)))
+
+    if method == "exact":
+        if shapely is None:
+            raise ImportError("Exact polygon IoU requires shapely>=2")
+
+        a = np.array(
+            [shapely.Polygon(p) for p in polygons_a], dtype=object
+        )[:, None]
+        b = np.array(
+            [shapely.Polygon(p) for p in polygons_b], dtype=object
+        )[None, :]
+        intersection = shapely.area(shapely.intersection(a, b))
+        union = shapely.area(a) + shapely.area(b) - intersection
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(union > 0, intersection / union, 0.0)
+
+    if method != "raster":
+        raise ValueError(f"Unknown polygon IoU method '{method}'")
+
+    vertices = np.concatenate(list(polygons_a) + list(polygons_b))
+    (min_x, min_y), (max_x, max_y) = vertices.min(0), vertices.max(0)
+    step_x = max(max_x - min_x, 1e-9) / resolution
+    step_y = max(max_y - min_y, 1e-9) / resolution
+    xs = min_x + step_x * (np.arange(resolution) + 0.5)
+    ys = min_y + step_y * (np.arange(resolution) + 0.5)
+
+    masks_a = rasterize_polygons(polygons_a, xs, ys).astype(np.float32)
+    masks_b = rasterize_polygons(polygons_b, xs, ys).astype(np.float32)
+
+    intersection = masks_a @ masks_b.T
+    union = masks_a.sum(1)[:, None] + masks_b.sum(1)[None, :] - intersection
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, intersection / union, 0.0)
+
+
+def greedy_match(
+    iou: np.ndarray,
+    scores: np.ndarray,
+    iou_threshold: float
+) -> List[Tuple[int, int]]:
+    """Matches predictions (rows) in decreasing score order to the unmatched
+    ground truth (column) they overlap most, COCO style."""
+    matches = []
+    taken = np.zeros(iou.shape[1], dtype=bool)
+
+    for row in np.argsort(-scores, kind="stable"):
+        candidates = np.where(taken, -1.0, iou[row])
+        col = int(np.argmax(candidates)) if candidates.size else -1
+        if col >= 0 and candidates[col] >= iou_threshold:
+            taken[col] = True
+            matches.append((int(row), col))
+
+    return matches
+
+
+def hungarian_match(
+    iou: np.ndarray,
+    scores: np.ndarray,
+    iou_threshold: float
+) -> List[Tuple[int, int]]:
+    """Matches predictions to ground truth maximising the total IoU."""
+    if linear_sum_assignment is None:
+        raise ImportError("Hungarian matching requires scipy")
+
+    if iou.size == 0:
+        return []
+
+    cost = np.where(iou >= iou_threshold, 1.0 - iou, 2.0)
+    rows, cols = linear_sum_assignment(cost)
+    return [
+        (int(row), int(col)) for row, col in zip(rows, cols)
+        if iou[row, col] >= iou_threshold
+    ]
+
+
+_MATCHERS: Dict[str, Callable] = {
+    MatchingMethod.Greedy: greedy_match,
+    MatchingMethod.Hungarian: hungarian_match,
+}
+
+
+@dataclass
+class LabelMetrics:
+
+    label: str
+    true_positives: int = 0
+    false_positives: int = 0
+    false_negatives: int = 0
+    average_precision: float = 0.0
+
+    @property
+    def precision(self) -> float:
+        predicted = self.true_positives + self.false_positives
+        return self.true_positives / predicted if predicted else 0.0
+
+    @property
+    def recall(self) -> float:
+        actual = self.true_positives + self.false_negatives
+        return self.true_positives / actual if actual else 0.0
+
+
+@dataclass
+class EvaluationResult:
+
+    iou_thresholds: List[float]
+    labels: Dict[str, LabelMetrics] = field(default_factory=dict)
+
+    @property
+    def mean_average_precision(self) -> float:
+        # Labels without ground truth are left out, like in COCO
+        average_precisions = [
+            metrics.average_precision for metrics in self.labels.values()
+            if metrics.true_positives + metrics.false_negatives > 0
+        ]
+        if not average_precisions:
+            return 0.0
+        return float(np.mean(average_precisions))
+
+    @property
+    def precision(self) -> float:
+        tp = sum(m.true_positives for m in self.labels.values())
+        fp = sum(m.false_positives for m in self.labels.values())
+        return tp / (tp + fp) if tp + fp else 0.0
+
+    @property
+    def recall(self) -> float:
+        tp = sum(m.true_positives for m in self.labels.values())
+        fn = sum(m.false_negatives for m in self.labels.values())
+        return tp / (tp + fn) if tp + fn else 0.0
+
+
+@dataclass
+class _Group:
+    """Predictions and ground truth of one label within one task."""
+
+    label: str
+    predictions: List[Annotation]
+    ground_truth: List[Annotation]
+    scores: np.ndarray
+    iou: Optional[np.ndarray] = None
+
+
+def _collect_groups(
+    tasks: Iterable[Task],
+    score_fn: Callable[[Annotation], Optional[float]]
+) -> List[_Group]:
+    groups = []
+    for task in tasks:
+        by_label: Dict[str, Tuple[List, List]] = {}
+        for annotation in task.annotations:
+            if annotation.annotation_type not in [
+                AnnotationType.BoundingBox, AnnotationType.Polygon
+            ]:
+                continue
+            if annotation.annotation_type == AnnotationType.BoundingBox \
+                    and annotation.rotation:
+                raise ValueError(
+                    f"Annotation {annotation.id} is a rotated bounding box, "
+                    "rotated boxes can not be evaluated"
+                )
+            predictions, ground_truth = by_label.setdefault(
+                annotation.label, ([], [])
+            )
+            if annotation.is_model_run:
+                predictions.append(annotation)
+            else:
+                ground_truth.append(annotation)
+
+        for label, (predictions, ground_truth) in by_label.items():
+            groups.append(_Group(
+                label=label,
+                predictions=predictions,
+                ground_truth=ground_truth,
+                scores=np.array(
+                    [_score(score_fn, p) for p in predictions],
+                    dtype=np.float64
+                )
+            ))
+    return groups
+
+
+def _score(
+    score_fn: Callable[[Annotation], Optional[float]],
+    annotation: Annotation
+) -> float:
+    score = score_fn(annotation)
+    if score is None:
+        raise ValueError(f"Prediction {annotation.id} has no score")
+    return float(score)
+
+
+def _compute_bbox_ious(groups: List[_Group]) -> None:
+    """Computes every group's IoU matrix, padding small groups into a
+    single ``(G, N, M)`` batch so they are handled by one NumPy call."""
+    batched = [
+        g for g in groups
+        if g.predictions and g.ground_truth
+        and len(g.predictions) <= MAX_BATCHED_GROUP_SIZE
+        and len(g.ground_truth) <= MAX_BATCHED_GROUP_SIZE
+    ]
+
+    if batched:
+        n = max(len(g.predictions) for g in batched)
+        m = max(len(g.ground_truth) for g in batched)
+        boxes_a = np.zeros((len(batched), n, 4))
+        boxes_b = np.zeros((len(batched), m, 4))
+        for idx, group in enumerate(batched):
+            boxes_a[idx, :len(group.predictions)] = [
+                annotation_to_box(a) for a in group.predictions
+            ]
+            boxes_b[idx, :len(group.ground_truth)] = [
+                annotation_to_box(a) for a in group.ground_truth
+            ]
+
+        ious = bbox_iou_matrix(boxes_a, boxes_b)
+        for idx, group in enumerate(batched):
+            group.iou = ious[
+                idx, :len(group.predictions), :len(group.ground_truth)
+            ]
+
+    for group in groups:
+        if group.iou is not None:
+            continue
+        if not group.predictions or not group.ground_truth:
+            group.iou = np.zeros(
+                (len(group.predictions), len(group.ground_truth))
+            )
+            continue
+        group.iou = bbox_iou_matrix(
+            np.stack([annotation_to_box(a) for a in group.predictions]),
+            np.stack([annotation_to_box(a) for a in group.ground_truth])
+        )
+
+
+def _compute_polygon_ious(
+    groups: List[_Group],
+    method: str,
+    resolution: int
+) -> None:
+    for group in groups:
+        group.iou = polygon_iou_matrix(
+            [annotation_to_polygon(a) for a in group.predictions],
+            [annotation_to_polygon(a) for a in group.ground_truth],
+            method=method,
+            resolution=resolution
+        )
+
+
+def average_precision(
+    scores: np.ndarray,
+    is_true_positive: np.ndarray,
+    num_ground_truth: int
+) -> float:
+    """101 point interpolated average precision (COCO)."""
+    if num_ground_truth == 0 or scores.size == 0:
+        return 0.0
+
+    order = np.argsort(-scores, kind="stable")
+    tp = np.cumsum(is_true_positive[order])
+    fp = np.cumsum(~is_true_positive[order])
+
+    recall = tp / num_ground_truth
+    precision = tp / np.maximum(tp + fp, np.finfo(np.float64).eps)
+    # Make precision monotonically decreasing
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+
+    idx = np.searchsorted(recall, RECALL_THRESHOLDS, side="left")
+    interpolated = np.zeros_like(RECALL_THRESHOLDS)
+    valid = idx < precision.size
+    interpolated[valid] = precision[idx[valid]]
+    return float(interpolated.mean())
+
+
+def evaluate(
+    dataset,
+    score_fn: Callable[[Annotation], Optional[float]],
+    iou_thresholds: Sequence[float] = (0.5,),
+    geometry: str = GeometryType.BoundingBox,
+    matching: str = MatchingMethod.Greedy,
+    polygon_method: str = "raster",
+    polygon_resolution: int = 256
+) -> EvaluationResult:
+    """Evaluates model run annotations (``is_model_run=True``) against the
+    ground truth annotations of the same tasks.
+
+    Predictions are matched per task and label. Counts (and precision /
+    recall) are reported at the first IoU threshold, average precision is
+    averaged over all thresholds, e.g. ``np.arange(0.5, 1.0, 0.05)`` for
+    COCO mAP@[.5:.95].
+
+    Annotations don't store a confidence score, ``score_fn`` has to look it
+    up for each prediction, e.g. from its attributes. Rotated bounding boxes
+    are not supported, neither geometry accounts for the rotation.
+
+    :param dataset: LocalDataset, RemoteDataset or an iterable of tasks
+    :param score_fn: confidence score of a prediction, raises
+                     ``ValueError`` when it returns ``None``
+    :param geometry: ``"bbox"`` compares boxes (polygons by their extent),
+                     ``"polygon"`` compares shapes
+    :param matching: ``"greedy"`` (COCO) or ``"hungarian"`` (needs scipy)
+    :param polygon_method: ``"raster"`` or ``"exact"`` (needs shapely)
+    """
+    if geometry not in GeometryType.get_all():
+        raise ValueError(f"Unknown geometry '{geometry}'")
+    if matching not in MatchingMethod.get_all():
+        raise ValueError(f"Unknown matching method '{matching}'")
+
+    tasks = getattr(dataset, "tasks", dataset)
+    groups = _collect_groups(tasks, score_fn)
+
+    if geometry == GeometryType.BoundingBox:
+        _compute_bbox_ious(groups)
+    else:
+        _compute_polygon_ious(groups, polygon_method, polygon_resolution)
+
+    matcher = _MATCHERS[matching]
+    result = EvaluationResult(iou_thresholds=list(iou_thresholds))
+
+    by_label: Dict[str, List[_Group]] = {}
+    for group in groups:
+        by_label.setdefault(group.label, []).append(group)
+
+    for label, label_groups in by_label.items():
+        metrics = LabelMetrics(label=label)
+        scores = np.concatenate([g.scores for g in label_groups])
+        num_ground_truth = sum(len(g.ground_truth) for g in label_groups)
+        average_precisions = []
+
+        for threshold_idx, threshold in enumerate(iou_thresholds):
+            flags = []
+            for group in label_groups:
+                is_tp = np.zeros(len(group.predictions), dtype=bool)
+                for row, _ in matcher(group.iou, group.scores, threshold):
+                    is_tp[row] = True
+                flags.append(is_tp)
+
+            is_true_positive = np.concatenate(flags)
+            average_precisions.append(average_precision(
+                scores, is_true_positive, num_ground_truth
+            ))
+
+            if threshold_idx == 0:
+                metrics.true_positives = int(is_true_positive.sum())
+                metrics.false_positives = \
+                    int(is_true_positive.size - metrics.true_positives)
+                metrics.false_negatives = \
+                    num_ground_truth - metrics.true_positives
+
+        metrics.average_precision = float(np.mean(average_precisions))
+        result.labels[label] = metrics
+
+    return result
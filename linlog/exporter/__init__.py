@@ -1,6 +1,7 @@
 from importlib import import_module
+from typing import Type
 from linlog.exceptions import ExporterNotFound
-from linlog.exporter.exporter import ExportParser
+from linlog.exporter.exporter import ExportParser, FormatWriter
 
 
 def get_exporter(format: str) -> ExportParser:
@@ -10,3 +11,12 @@ def get_exporter(format: str) -> ExportParser:
         return getattr(module, "export")
     except ModuleNotFoundError:
         raise ExporterNotFound
+
+
+def get_writer(format: str) -> Type[FormatWriter]:
+    try:
+        format = format.replace(".", "_")
+        module = import_module(f"linlog.exporter.formats.{format}")
+        return getattr(module, "Writer")
+    except (ModuleNotFoundError, AttributeError):
+        raise ExporterNotFound
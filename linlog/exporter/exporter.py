@@ -1,19 +1,283 @@
+import inspect
 from os import PathLike
-from typing import Callable, Iterator, List
+from pathlib import Path
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Type
+)
+from linlog.exporter.prepared import LabelIndex, PreparedTask, prepare_task
 from linlog.schemas import Task
+from linlog.split import Splitter
 
 
 ExportParser = Callable[[Iterator[Task]], None]
 
 
+class FormatWriter:
+    """Incremental counterpart of an export function: tasks are handed
+    over one at a time with ``write`` and the output is completed by
+    ``close``, which returns the path of the written file.
+
+    Writers convert :class:`PreparedTask` objects, ``write`` prepares the
+    task with the writer's label index. Writers sharing a label index
+    agree on the class ids, see :class:`MultiWriter`.
+
+    Each format module exposes its writer as ``Writer``, see
+    :func:`linlog.exporter.get_writer`.
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        label_index: Optional[LabelIndex] = None
+    ) -> None:
+        self.output_path = Path(output_path)
+        self.label_index = label_index if label_index is not None \
+            else LabelIndex()
+
+    def write(self, task: Task) -> None:
+        self.write_prepared(prepare_task(task, self.label_index))
+
+    def write_prepared(self, prepared: PreparedTask) -> None:
+        raise NotImplementedError
+
+    def close(self) -> Path:
+        raise NotImplementedError
+
+    def abort(self) -> None:
+        """Releases the writer's files and workers without completing the
+        output, called instead of ``close`` when an export fails."""
+        pass
+
+    @classmethod
+    def share_resources(
+        cls,
+        options: Dict
+    ) -> Tuple[Dict, List[Callable[[], None]]]:
+        """Workers or caches to share between the writers of all splits,
+        created from the writer ``options``. Returns the options handing
+        them to each writer and the callables releasing them once every
+        split is closed."""
+        return {}, []
+
+
+def writer_options(writer_class: Type[FormatWriter]) -> Set[str]:
+    """Names of the options taken by the constructor of a writer, beyond
+    the output path and label index."""
+    parameters = inspect.signature(writer_class.__init__).parameters
+    return set(parameters) - {"self", "output_path", "label_index"}
+
+
+def route_options(
+    writer_classes: Iterable[Type[FormatWriter]],
+    options: Dict
+) -> List[Dict]:
+    """Splits ``options`` into the options of each writer class, every
+    option goes to all the writers taking it. Raises when an option is
+    taken by none of them."""
+    accepted = [writer_options(cls) for cls in writer_classes]
+    unknown = set(options).difference(*accepted)
+    if unknown:
+        raise Exception(
+            f"Unknown export options: {', '.join(sorted(unknown))}"
+        )
+    return [
+        {key: value for key, value in options.items() if key in names}
+        for names in accepted
+    ]
+
+
+class MultiWriter(FormatWriter):
+    """Fans tasks out to several format writers. Each task is prepared
+    once, its label ids and geometry are shared by all the writers.
+    ``options`` are handed to the writers whose format takes them, e.g.
+    ``shard_size`` to the shards writer.
+
+    ``close`` returns the output directory, the file written by each
+    format is available in ``paths`` afterwards.
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        formats: Iterable[str],
+        label_index: Optional[LabelIndex] = None,
+        **options
+    ) -> None:
+        # Imported here, the format modules import this module
+        from linlog.exporter import get_writer
+
+        super().__init__(output_path, label_index)
+        writer_classes = {
+            format: get_writer(format) for format in dict.fromkeys(formats)
+        }
+        self.writers: Dict[str, FormatWriter] = {
+            format: cls(self.output_path, self.label_index, **cls_options)
+            for (format, cls), cls_options in zip(
+                writer_classes.items(),
+                route_options(writer_classes.values(), options)
+            )
+        }
+        self.paths: Dict[str, Path] = {}
+
+    def write_prepared(self, prepared: PreparedTask) -> None:
+        for writer in self.writers.values():
+            writer.write_prepared(prepared)
+
+    def close(self) -> Path:
+        self.paths = {
+            format: writer.close() for format, writer in self.writers.items()
+        }
+        return self.output_path
+
+    def abort(self) -> None:
+        for writer in self.writers.values():
+            writer.abort()
+
+
+WriterFactory = Callable[[Path, Optional[LabelIndex]], FormatWriter]
+
+
+class SplitWriter(FormatWriter):
+    """Routes every task to the writer of its split, the output of each
+    split goes to its own ``<output_path>/<split>`` directory. The split
+    writers share a label index, so class ids agree across splits.
+
+    ``close`` returns the output directory, the paths returned by the
+    split writers are available in ``paths`` afterwards. The ``release``
+    callables free resources shared by the split writers, they are
+    called once all of them are closed or aborted.
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        splitter: Splitter,
+        writer_factory: WriterFactory,
+        label_index: Optional[LabelIndex] = None,
+        release: Iterable[Callable[[], None]] = ()
+    ) -> None:
+        super().__init__(output_path, label_index)
+        self.splitter = splitter
+        self.writers: Dict[str, FormatWriter] = {}
+        self.paths: Dict[str, Path] = {}
+        self._release = list(release)
+
+        for name in splitter.ratios:
+            path = self.output_path / name
+            path.mkdir(parents=True, exist_ok=True)
+            self.writers[name] = writer_factory(path, self.label_index)
+
+    def write_prepared(self, prepared: PreparedTask) -> None:
+        name = self.splitter.assign(prepared.task)
+        self.writers[name].write_prepared(prepared)
+
+    def close(self) -> Path:
+        try:
+            self.paths = {
+                name: writer.close() for name, writer in self.writers.items()
+            }
+        finally:
+            self._release_resources()
+        return self.output_path
+
+    def abort(self) -> None:
+        try:
+            for writer in self.writers.values():
+                writer.abort()
+        finally:
+            self._release_resources()
+
+    def _release_resources(self) -> None:
+        while self._release:
+            self._release.pop()()
+
+
+def create_writer(
+    output_path: PathLike,
+    format: str = "linearlogic",
+    formats: Optional[Iterable[str]] = None,
+    splitter: Optional[Splitter] = None,
+    label_index: Optional[LabelIndex] = None,
+    **options
+) -> FormatWriter:
+    """Writer of ``format``, or of every format of ``formats``, with one
+    output directory per split when a ``splitter`` is given.
+
+    :param label_index: class ids of the export, e.g. seeded with the
+                        dataset taxonomy, new labels are added to it
+    :param options: options of the format writers, e.g. ``shard_size``,
+                    each goes to the writers taking it. An option that
+                    no writer takes raises an exception
+    """
+    from linlog.exporter import get_writer
+
+    # Checked up front, before any split directory is created
+    writer_classes = [get_writer(name) for name in formats or [format]]
+    route_options(writer_classes, options)
+
+    # With splits, one set of workers serves every split instead of one
+    # set per split
+    release: List[Callable[[], None]] = []
+
+    def factory(
+        path: Path,
+        label_index: Optional[LabelIndex] = None
+    ) -> FormatWriter:
+        if formats:
+            return MultiWriter(path, formats, label_index, **options)
+        return get_writer(format)(path, label_index, **options)
+
+    if splitter is None:
+        return factory(Path(output_path), label_index)
+
+    try:
+        for cls in writer_classes:
+            shared, cls_release = cls.share_resources(options)
+            options = {**options, **shared}
+            release.extend(cls_release)
+        return SplitWriter(
+            Path(output_path), splitter, factory, label_index,
+            release=release
+        )
+    except BaseException:
+        for release_resource in release:
+            release_resource()
+        raise
+
+
+def export_formats(
+    formats: Iterable[str],
+    tasks: Iterable[Task],
+    output_directory: PathLike,
+    label_index: Optional[LabelIndex] = None,
+    **options
+) -> Dict[str, Path]:
+    """Exports tasks to several formats with a single pass over the
+    tasks, returns the written path of each format. ``options`` are
+    routed as by :class:`MultiWriter`."""
+    writer = MultiWriter(
+        Path(output_directory), formats, label_index, **options
+    )
+    print(f"Converting tasks to {', '.join(writer.writers)}...")
+    for task in tasks:
+        writer.write(task)
+    writer.close()
+
+    for format, path in writer.paths.items():
+        print(f"Converted {format} annotations saved at {path}")
+    return writer.paths
+
+
 def export_tasks(
     exporter: ExportParser,
     tasks: List[Task],
     output_directory: PathLike,
+    **options
 ) -> None:
     print("Converting tasks...")
     _, save_path = exporter(
         tasks=tasks,
-        output_path=output_directory
+        output_path=output_directory,
+        **options
     )
     print(f"Converted annotations saved at {save_path}")
@@ -1,7 +1,9 @@
 import datetime
 from pathlib import Path
 import xml.etree.ElementTree as ET
-from typing import List
+from typing import List, Optional
+from linlog.exporter.exporter import FormatWriter
+from linlog.exporter.prepared import LabelIndex, PreparedTask
 from linlog.schemas import (
     ImageTask,
     Label,
@@ -12,27 +14,60 @@ from linlog.schemas import (
 
 
 def export(tasks: List[ImageTask], output_path: Path) -> ET.ElementTree:
-    labels: List[Label] = []
-    root = ET.Element("annotations")
-    _add_subelement_text(root, "version", "1.1")
-    create_meta(root, tasks, labels)
-    create_images(root, tasks, labels)
-
-    output_file_path = (output_path / "output-cvat").with_suffix(".xml")
-    tree = ET.ElementTree(root)
-    ET.indent(tree, space="\t", level=0)
-    tree.write(output_file_path, encoding="utf-8")
-    return tree, output_file_path
+    writer = Writer(output_path)
+    for task in tasks:
+        writer.write(task)
+    output_file_path = writer.close()
+
+    return writer.tree, output_file_path
+
+
+class Writer(FormatWriter):
+    """Adds an image element per written task, the meta element and the
+    XML file ``output-cvat.xml`` are written when the writer is closed."""
+
+    def __init__(
+        self,
+        output_path: Path,
+        label_index: Optional[LabelIndex] = None
+    ) -> None:
+        super().__init__(output_path, label_index)
+        self.labels: List[Label] = []
+        self.image_count = 0
+        self.tree: Optional[ET.ElementTree] = None
+        self.root = ET.Element("annotations")
+        _add_subelement_text(self.root, "version", "1.1")
+
+    def write(self, task: ImageTask) -> None:
+        # Boxes and polygons are written with their original coordinates
+        self.image_count += 1
+        create_image(self.root, task, self.image_count)
+
+    def write_prepared(self, prepared: PreparedTask) -> None:
+        self.write(prepared.task)
+
+    def close(self) -> Path:
+        meta = create_meta(self.root, self.image_count, self.labels)
+        # Meta goes right after the version, before the images
+        self.root.remove(meta)
+        self.root.insert(1, meta)
+
+        output_file_path = \
+            (self.output_path / "output-cvat").with_suffix(".xml")
+        self.tree = ET.ElementTree(self.root)
+        ET.indent(self.tree, space="\t", level=0)
+        self.tree.write(output_file_path, encoding="utf-8")
+        return output_file_path
 
 
 def create_meta(
     root: ET.Element,
-    tasks: List[ImageTask],
+    size: int,
     task_labels: List[Label]
-):
+) -> ET.Element:
     meta = ET.SubElement(root, "meta")
     task = ET.SubElement(meta, "task")
-    _add_subelement_text(task, "size", str(len(tasks)))
+    _add_subelement_text(task, "size", str(size))
     _add_subelement_text(task, "mode", "annotation")
     _add_subelement_text(task, "overlapp", str(0))
     _add_subelement_text(task, "bugtracker", str(None))
@@ -63,29 +98,27 @@ def create_meta(
             )
             _add_subelement_text(attributes, 'default_value', '')
 
+    return meta
 
-def create_images(
-    root: ET.Element,
-    tasks: List[ImageTask],
-    task_labels: List[Label]
-):
-    for idx, task in enumerate(tasks, 1):
-        image = ET.SubElement(root, "image")
-        image.attrib["id"] = str(idx)
-        image.attrib["name"] = task.filename if task.filename else \
-            task.attachment,
-        image.attrib["width"] = str(task.media_specs.width)
-        image.attrib["height"] = str(task.media_specs.height)
-
-        for z_order, task_annotation in enumerate(task.annotations, 1):
-            annotation = create_annotation(image, task_annotation, z_order)
-
-            for attribute in task_annotation.attributes.keys():
-                _add_subelement_text(
-                    annotation,
-                    'attribute',
-                    str(task_annotation.attributes[attribute])
-                )
+
+def create_image(root: ET.Element, task: ImageTask, idx: int) -> ET.Element:
+    image = ET.SubElement(root, "image")
+    image.attrib["id"] = str(idx)
+    image.attrib["name"] = task.filename if task.filename else \
+        task.attachment
+    image.attrib["width"] = str(task.media_specs.width)
+    image.attrib["height"] = str(task.media_specs.height)
+
+    for z_order, task_annotation in enumerate(task.annotations, 1):
+        annotation = create_annotation(image, task_annotation, z_order)
+
+        for attribute in task_annotation.attributes.keys():
+            _add_subelement_text(
+                annotation,
+                'attribute',
+                str(task_annotation.attributes[attribute])
+            )
+    return image
 
 
 def create_annotation(task: ET.Element, annotation: Annotation, z_order: int):
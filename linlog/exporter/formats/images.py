@@ -0,0 +1,114 @@
+import os
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from linlog.exporter.exporter import FormatWriter
+from linlog.exporter.prepared import LabelIndex, PreparedTask
+from linlog.media import (
+    DEFAULT_DOWNLOAD_WORKERS,
+    MediaCache,
+    MediaDownloader,
+    MediaResult,
+    copy_media
+)
+from linlog.schemas import Task
+
+
+def export(tasks: List[Task], output_path: Path, **options):
+    writer = Writer(output_path, **options)
+    for task in tasks:
+        writer.write(task)
+    output_file_path = writer.close()
+
+    return writer.failed, output_file_path
+
+
+class Writer(FormatWriter):
+    """Downloads the image of every written task to
+    ``images/<task id>.<ext>``, next to the labels written by the other
+    formats of the export. Images come from a :class:`MediaCache`, only
+    images missing from the cache are downloaded.
+
+    Downloads run in the background while the next tasks are written, at
+    most ``2 * max_workers`` are queued at a time. Failed downloads are
+    reported when the writer is closed and kept in ``failed``.
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        label_index: Optional[LabelIndex] = None,
+        cache: Optional[MediaCache] = None,
+        max_workers: int = DEFAULT_DOWNLOAD_WORKERS,
+        verify_size: bool = True,
+        downloader: Optional[MediaDownloader] = None
+    ) -> None:
+        super().__init__(output_path, label_index)
+        self.images_path = self.output_path / "images"
+        os.makedirs(self.images_path, exist_ok=True)
+
+        self.downloader = downloader or MediaDownloader(
+            cache, max_workers=max_workers, verify_size=verify_size
+        )
+        self._owns_downloader = downloader is None
+        self._pending: Deque[Future] = deque()
+        self.failed: List[MediaResult] = []
+
+    @classmethod
+    def share_resources(
+        cls,
+        options: Dict
+    ) -> Tuple[Dict, List[Callable[[], None]]]:
+        # One cache keeping track of its size and one connection pool for
+        # all splits
+        if options.get("downloader") is not None:
+            return {}, []
+        downloader = MediaDownloader(
+            options.get("cache"),
+            max_workers=options.get("max_workers") or DEFAULT_DOWNLOAD_WORKERS,
+            verify_size=options.get("verify_size", True)
+        )
+        return {"downloader": downloader}, [downloader.close]
+
+    def write(self, task: Task) -> None:
+        self._pending.append(self.downloader.submit(task))
+        if len(self._pending) >= 2 * self.downloader.max_workers:
+            self._place(self._pending.popleft().result())
+
+    def write_prepared(self, prepared: PreparedTask) -> None:
+        self.write(prepared.task)
+
+    def _place(self, result: MediaResult) -> None:
+        if result.success:
+            try:
+                copy_media(
+                    result.media, str(self.images_path / result.task_id)
+                )
+                return
+            except OSError as e:
+                result.error = e
+
+        self.failed.append(result)
+
+    def close(self) -> Path:
+        try:
+            while self._pending:
+                self._place(self._pending.popleft().result())
+        finally:
+            if self._owns_downloader:
+                self.downloader.close()
+
+        for result in self.failed:
+            print(
+                f"[warning] could not export the image of task "
+                f"{result.task_id}: {result.error}"
+            )
+        return self.images_path
+
+    def abort(self) -> None:
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        if self._owns_downloader:
+            self.downloader.close()
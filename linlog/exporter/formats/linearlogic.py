@@ -2,22 +2,77 @@ import datetime
 import itertools
 import json
 from pathlib import Path
-from typing import List
+from typing import List, Optional
+from linlog.encoder import get_encoder
+from linlog.exporter.exporter import FormatWriter
+from linlog.exporter.prepared import LabelIndex, PreparedTask
 from linlog.schemas import Task
 
 
 def export(tasks: List[Task], output_path: Path):
-    root = create_root()
-    root['item_count'] = len(tasks)
-    root['labels'] = list(create_labels(tasks))
-    root['items'] = [task.to_dict() for task in tasks]
+    writer = Writer(output_path)
+    for task in tasks:
+        writer.write(task)
+    output_file_path = writer.close()
 
-    output_file_path = (output_path / "output").with_suffix(".json")
+    return writer.root, output_file_path
 
-    with open(output_file_path, "w") as f:
-        json.dump(root, f, indent=2)
 
-    return root, output_file_path
+class Writer(FormatWriter):
+    """Streams items to ``output.json`` as they are written, the item
+    count and labels follow the items once the writer is closed."""
+
+    def __init__(
+        self,
+        output_path: Path,
+        label_index: Optional[LabelIndex] = None
+    ) -> None:
+        super().__init__(output_path, label_index)
+        self.root = create_root()
+        self.item_count = 0
+        self.file_path = (self.output_path / "output").with_suffix(".json")
+
+        # Items are written with the task encoder rather than through
+        # json.dump so that no intermediate dict is built per task.
+        self._encoder = get_encoder()
+        self._file = open(self.file_path, "wb")
+        self._file.write(b"{")
+        for key, value in self.root.items():
+            self._file.write(_member(key, value) + b",")
+        self._file.write(b'\n  "items": [')
+
+    def write(self, task: Task) -> None:
+        # Items are stored as they are, no geometry needs to be prepared
+        self._file.write(b"\n    " if self.item_count == 0 else b",\n    ")
+        self._file.write(self._encoder.encode(task))
+        self.item_count += 1
+
+        for annotation in task.annotations:
+            self.label_index.add(annotation.label)
+
+    def write_prepared(self, prepared: PreparedTask) -> None:
+        self.write(prepared.task)
+
+    def close(self) -> Path:
+        self.root['item_count'] = self.item_count
+        self.root['labels'] = self.label_index.categories()
+
+        self._file.write(b"\n  ],")
+        self._file.write(_member('item_count', self.item_count) + b",")
+        self._file.write(_member('labels', self.root['labels']))
+        self._file.write(b"\n}")
+        self._file.close()
+        return self.file_path
+
+    def abort(self) -> None:
+        self._file.close()
+
+
+def _member(key: str, value) -> bytes:
+    """``key: value`` member of the top level object, indented like
+    ``json.dump(root, indent=2)``."""
+    encoded = json.dumps(value, indent=2).replace("\n", "\n  ")
+    return f"\n  {json.dumps(key)}: {encoded}".encode("utf-8")
 
 
 def create_root():
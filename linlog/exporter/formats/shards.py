@@ -0,0 +1,177 @@
+import datetime
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from linlog.exporter.exporter import FormatWriter
+from linlog.exporter.prepared import LabelIndex, PreparedTask
+from linlog.schemas import Task
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+DEFAULT_SHARD_SIZE = 1000
+
+MANIFEST_FILE = "manifest.json"
+SHARD_FILE = "shard-{:05d}.jsonl"
+
+
+def export(
+    tasks: List[Task],
+    output_path: Path,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    max_workers: Optional[int] = None
+):
+    writer = Writer(output_path, shard_size=shard_size,
+                    max_workers=max_workers)
+    for task in tasks:
+        writer.write(task)
+    output_file_path = writer.close()
+
+    return writer.manifest, output_file_path
+
+
+def _dumps(payload: Dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, default=str)
+    return json.dumps(
+        payload, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+def write_shard(path: str, payloads: List[Dict]) -> Dict:
+    """Writes task payloads as JSON lines, runs in a worker process.
+    Returns the manifest entry of the shard."""
+    digest = hashlib.sha256()
+    size = 0
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "wb") as f:
+        for payload in payloads:
+            line = _dumps(payload) + b"\n"
+            digest.update(line)
+            size += len(line)
+            f.write(line)
+    os.replace(tmp_path, path)
+
+    return {
+        "file": os.path.basename(path),
+        "count": len(payloads),
+        "bytes": size,
+        "sha256": digest.hexdigest()
+    }
+
+
+class Writer(FormatWriter):
+    """Splits the tasks into JSON lines shards of ``shard_size`` tasks.
+
+    Full shards are serialized and checksummed by a process pool while
+    the next shard fills up, at most ``2 * max_workers`` shards are in
+    flight. ``manifest.json`` lists every shard with its task count, size
+    and sha256 and is written last, when the writer is closed, so a
+    directory without a manifest is an incomplete export.
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        label_index: Optional[LabelIndex] = None,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None
+    ) -> None:
+        super().__init__(output_path, label_index)
+        if shard_size < 1:
+            raise Exception("shard_size must be at least 1")
+
+        os.makedirs(self.output_path, exist_ok=True)
+        self.shard_size = shard_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.manifest: Dict = {}
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._buffer: List[Dict] = []
+        self._pending: Deque[Future] = deque()
+        self._shards: List[Dict] = []
+        self._shard_count = 0
+
+    @classmethod
+    def share_resources(
+        cls,
+        options: Dict
+    ) -> Tuple[Dict, List[Callable[[], None]]]:
+        # One process pool for all splits
+        if options.get("executor") is not None:
+            return {}, []
+        executor = ProcessPoolExecutor(
+            max_workers=options.get("max_workers") or os.cpu_count() or 1
+        )
+        return {"executor": executor}, [executor.shutdown]
+
+    def write(self, task: Task) -> None:
+        self._buffer.append(task.to_dict())
+        for annotation in task.annotations:
+            self.label_index.add(annotation.label)
+
+        if len(self._buffer) >= self.shard_size:
+            self._flush()
+
+    def write_prepared(self, prepared: PreparedTask) -> None:
+        self.write(prepared.task)
+
+    def _flush(self) -> None:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers
+            )
+
+        path = self.output_path / SHARD_FILE.format(self._shard_count)
+        self._pending.append(
+            self._executor.submit(write_shard, str(path), self._buffer)
+        )
+        self._shard_count += 1
+        self._buffer = []
+
+        if len(self._pending) >= 2 * self.max_workers:
+            self._shards.append(self._pending.popleft().result())
+
+    def close(self) -> Path:
+        try:
+            if self._buffer:
+                self._flush()
+            while self._pending:
+                self._shards.append(self._pending.popleft().result())
+        finally:
+            for future in self._pending:
+                future.cancel()
+            if self._owns_executor and self._executor is not None:
+                self._executor.shutdown()
+
+        self.manifest = {
+            "version": 1,
+            "dumped_at": str(
+                datetime.datetime.now(tz=datetime.timezone.utc)
+            ),
+            "shard_size": self.shard_size,
+            "task_count": sum(shard["count"] for shard in self._shards),
+            "labels": self.label_index.categories(),
+            "shards": self._shards
+        }
+
+        output_file_path = self.output_path / MANIFEST_FILE
+        with open(output_file_path, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        return output_file_path
+
+    def abort(self) -> None:
+        # No manifest is written, the directory stays marked incomplete
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
@@ -2,8 +2,21 @@ import os
 import glob
 import json
 import math
-import random
 import shutil
+from pathlib import Path
+from typing import List, Optional
+from linlog.constants import AnnotationType
+from linlog.exporter.exporter import FormatWriter
+from linlog.exporter.prepared import (
+    LabelIndex,
+    PreparedAnnotation,
+    PreparedTask
+)
+from linlog.split import Splitter
+
+
+# Split directories in the order of ``split_ratio``
+SPLIT_NAMES = ['train', 'test', 'val']
 
 
 def export(
@@ -12,10 +25,22 @@ def export(
     split_ratio=[.7, .2, .1],
     shuffle_seed=0
 ):
-
-    assert math.fsum(split_ratio) == 1.0, \
+    """Converts a dataset directory of ``tasks/<id>.json`` files and
+    ``images/<id>.jpg`` images into YOLO ``images`` and ``labels``
+    directories per split.
+
+    Tasks are assigned to splits by a hash of their id seeded with
+    ``shuffle_seed`` (see :class:`linlog.split.Splitter`), so a task keeps
+    its split when tasks are added to the dataset. Each image goes to the
+    split of the task with the same file name stem.
+    """
+    assert math.isclose(math.fsum(split_ratio), 1.0), \
         "Sum of split ratios must be equal to 1"
 
+    splitter = Splitter(
+        dict(zip(SPLIT_NAMES, split_ratio)), seed=shuffle_seed
+    )
+
     os.makedirs(output_path, exist_ok=True)
     os.makedirs(os.path.join(output_path, 'annotations'), exist_ok=True)
     os.makedirs(os.path.join(output_path, 'images'), exist_ok=True)
@@ -23,51 +48,83 @@ def export(
     tasks_fp = sorted(glob.glob(
         os.path.join(dataset_path, 'tasks') + os.path.sep + '*.json'
     ))
-    images_fp = sorted(glob.glob(
-        os.path.join(dataset_path, 'images') + os.path.sep + '*.jpg'
-    ))
-
-    random.Random(shuffle_seed).shuffle(tasks_fp)
-    random.Random(shuffle_seed).shuffle(images_fp)
-
-    task_count = len(tasks_fp)
-    ann_train_split = tasks_fp[:math.ceil(task_count * split_ratio[0])]
-    ann_test_split = tasks_fp[
-        math.ceil(task_count * split_ratio[0]):
-        math.ceil(task_count * (split_ratio[0] + split_ratio[1]))
-    ]
-    ann_val_split = tasks_fp[
-        math.ceil(task_count * (split_ratio[0] + split_ratio[1])):
-    ]
-
-    img_train_split = images_fp[:math.ceil(task_count * split_ratio[0])]
-    img_test_split = images_fp[
-        math.ceil(task_count * split_ratio[0]):
-        math.ceil(task_count * (split_ratio[0] + split_ratio[1]))
-    ]
-    img_val_split = images_fp[
-        math.ceil(task_count * (split_ratio[0] + split_ratio[1])):
-    ]
-
-    print("img_train_split", dataset_path)
-    write_images_to_folder(
-        img_train_split, os.path.join(output_path, 'images', 'train')
-    )
-    write_images_to_folder(
-        img_test_split, os.path.join(output_path, 'images', 'test')
-    )
-    write_images_to_folder(
-        img_val_split, os.path.join(output_path, 'images', 'val')
-    )
-
-    write_annotations_to_folder(
-        ann_train_split, os.path.join(output_path, 'labels', 'train')
-    )
-    write_annotations_to_folder(
-        ann_test_split, os.path.join(output_path, 'labels', 'test')
-    )
-    write_annotations_to_folder(
-        ann_val_split, os.path.join(output_path, 'labels', 'val')
+    images_fp = {
+        _stem(image_fp): image_fp for image_fp in glob.glob(
+            os.path.join(dataset_path, 'images') + os.path.sep + '*.jpg'
+        )
+    }
+
+    ann_splits = {name: [] for name in splitter.ratios}
+    img_splits = {name: [] for name in splitter.ratios}
+    for task_fp in tasks_fp:
+        task_id = _stem(task_fp)
+        name = splitter.assign_id(task_id)
+        ann_splits[name].append(task_fp)
+        if task_id in images_fp:
+            img_splits[name].append(images_fp[task_id])
+
+    for name in splitter.ratios:
+        write_images_to_folder(
+            img_splits[name], os.path.join(output_path, 'images', name)
+        )
+        write_annotations_to_folder(
+            ann_splits[name], os.path.join(output_path, 'labels', name)
+        )
+
+
+def _stem(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+class Writer(FormatWriter):
+    """Writes a ``labels/<task id>.txt`` file per task as it is written,
+    with one line per bounding box or polygon in normalized coordinates.
+    The class names are written to ``classes.txt``, one per line in class
+    id order, when the writer is closed."""
+
+    def __init__(
+        self,
+        output_path: Path,
+        label_index: Optional[LabelIndex] = None
+    ) -> None:
+        super().__init__(output_path, label_index)
+        self.labels_path = self.output_path / "labels"
+        os.makedirs(self.labels_path, exist_ok=True)
+
+    def write_prepared(self, prepared: PreparedTask) -> None:
+        lines = [
+            line for line in map(format_line, prepared.annotations)
+            if line is not None
+        ]
+        with open(self.labels_path / f"{prepared.task.id}.txt", "w") as f:
+            f.write("\n".join(lines))
+
+    def close(self) -> Path:
+        with open(self.output_path / "classes.txt", "w") as f:
+            f.write("\n".join(self.label_index))
+        return self.labels_path
+
+
+def format_line(annotation: PreparedAnnotation) -> Optional[str]:
+    """YOLO line of a prepared annotation, ``None`` for annotations
+    without normalized geometry and boxes outside of the image."""
+    annotation_type = annotation.annotation.annotation_type
+
+    if annotation_type == AnnotationType.BoundingBox and \
+            annotation.normalized_bbox is not None:
+        if not all(0 <= v <= 1 for v in annotation.normalized_bbox):
+            return None
+        values: List[float] = annotation.normalized_bbox
+
+    elif annotation_type == AnnotationType.Polygon and \
+            annotation.normalized_points is not None:
+        values = [v for point in annotation.normalized_points for v in point]
+
+    else:
+        return None
+
+    return " ".join(
+        [str(annotation.label_id)] + [f"{v:.6f}" for v in values]
     )
 
 
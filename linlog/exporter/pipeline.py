@@ -0,0 +1,141 @@
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+from linlog.exporter.exporter import FormatWriter
+from linlog.schemas.task import Task
+
+DEFAULT_QUEUE_SIZE = 8
+
+
+@dataclass
+class ExportProgress:
+    """Yielded by :func:`run_export_pipeline` after every written page,
+    ``output_path`` is only set on the last event, once the writer was
+    closed."""
+
+    pages_fetched: int
+    pages_written: int
+    tasks_written: int
+    total: Optional[int] = None
+    output_path: Optional[Path] = None
+
+    @property
+    def done(self) -> bool:
+        return self.output_path is not None
+
+
+class _PipelineError:
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+_END = object()
+
+
+def decode_page(page: List[Dict]) -> List[Task]:
+    return [Task.from_json(payload) for payload in page]
+
+
+def run_export_pipeline(
+    pages: Iterable[List[Dict]],
+    writer: FormatWriter,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    decode_executor: Optional[Executor] = None
+) -> Iterator[ExportProgress]:
+    """Exports task pages with fetching and writing overlapped.
+
+    A fetcher thread pulls pages from ``pages`` into a queue of at most
+    ``queue_size`` pages, the pages are decoded into tasks and handed to
+    the writer in order on the calling thread. Decoding is CPU bound and
+    holds the GIL, so it only runs in parallel when a
+    ``ProcessPoolExecutor`` is passed as ``decode_executor``, at most
+    ``queue_size`` pages are then decoding at a time. Every stage blocks
+    when the next one falls behind, so memory stays bounded by the queue
+    sizes.
+
+    The pipeline runs while the returned generator is consumed. When
+    ``pages`` are Paginators, ``total`` is taken from their count. If the
+    export fails or the generator is closed early, the writer is aborted
+    instead of closed.
+    """
+    fetched: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    progress = ExportProgress(pages_fetched=0, pages_written=0,
+                              tasks_written=0)
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                fetched.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetch() -> None:
+        iterator = iter(pages)
+        try:
+            for page in iterator:
+                if progress.total is None:
+                    progress.total = getattr(page, "count", None)
+                if not put(page):
+                    return
+                progress.pages_fetched += 1
+        except BaseException as e:
+            put(_PipelineError(e))
+            return
+        finally:
+            # Closes the streamed responses of a generator stopped early,
+            # on the thread running it
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+        put(_END)
+
+    fetcher = threading.Thread(
+        target=fetch, name="linlog-export-fetch", daemon=True
+    )
+    decoding: Deque[Future] = deque()
+
+    def write_page(tasks: List[Task]) -> ExportProgress:
+        for task in tasks:
+            writer.write(task)
+            progress.tasks_written += 1
+        progress.pages_written += 1
+        return replace(progress)
+
+    fetcher.start()
+    try:
+        while True:
+            item = fetched.get()
+            if item is _END:
+                break
+            if isinstance(item, _PipelineError):
+                raise item.error
+
+            if decode_executor is None:
+                yield write_page(decode_page(item))
+                continue
+
+            decoding.append(decode_executor.submit(decode_page, list(item)))
+            while decoding and (
+                decoding[0].done() or len(decoding) >= queue_size
+            ):
+                yield write_page(decoding.popleft().result())
+
+        while decoding:
+            yield write_page(decoding.popleft().result())
+
+        progress.output_path = writer.close()
+        yield replace(progress)
+    finally:
+        stop.set()
+        for future in decoding:
+            future.cancel()
+        if progress.output_path is None:
+            writer.abort()
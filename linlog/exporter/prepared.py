@@ -0,0 +1,137 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from linlog.constants import AnnotationType
+from linlog.helpers import compute_polygon_area
+from linlog.schemas.annotation import Annotation
+from linlog.schemas.task import Task
+
+Point = Tuple[float, float]
+
+
+class LabelIndex:
+    """Label name to class id mapping shared by the writers of an export,
+    ids are assigned in the order labels are first seen."""
+
+    def __init__(self, labels: Iterable[str] = ()) -> None:
+        self._ids: Dict[str, int] = {}
+        for label in labels:
+            self.add(label)
+
+    def add(self, label: str) -> int:
+        return self._ids.setdefault(label, len(self._ids))
+
+    def categories(self) -> List[Dict]:
+        return [{"id": idx, "name": label} for label, idx in self._ids.items()]
+
+    def __getitem__(self, label: str) -> int:
+        return self._ids[label]
+
+    def __contains__(self, label: object) -> bool:
+        return label in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+@dataclass
+class PreparedAnnotation:
+    """Geometry of an annotation derived once for every export format.
+
+    ``points`` is the outline of the annotation (the corners of a bounding
+    box, the first path of a polygon), ``bbox`` its ``[x, y, width,
+    height]`` extent. The normalized values are relative to the image size
+    and ``None`` when the task has no media specs. Annotations without an
+    outline (points, lines) only carry their label id.
+    """
+
+    annotation: Annotation
+    label_id: int
+    points: Optional[List[Point]] = None
+    bbox: Optional[List[float]] = None
+    area: Optional[float] = None
+    normalized_points: Optional[List[Point]] = None
+    normalized_bbox: Optional[List[float]] = None
+
+    @property
+    def has_geometry(self) -> bool:
+        return self.points is not None
+
+
+@dataclass
+class PreparedTask:
+    task: Task
+    width: Optional[float] = None
+    height: Optional[float] = None
+    annotations: List[PreparedAnnotation] = field(default_factory=list)
+
+
+def _outline(annotation: Annotation) -> Optional[List[Point]]:
+    if annotation.annotation_type == AnnotationType.BoundingBox:
+        left, top = annotation.left, annotation.top
+        right = left + annotation.width
+        bottom = top + annotation.height
+        return [(left, top), (right, top), (right, bottom), (left, bottom)]
+
+    if annotation.annotation_type == AnnotationType.Polygon and \
+            annotation.segments:
+        return [(v.x, v.y) for v in annotation.segments[0].path]
+
+    return None
+
+
+def prepare_annotation(
+    annotation: Annotation,
+    labels: LabelIndex,
+    width: Optional[float] = None,
+    height: Optional[float] = None
+) -> PreparedAnnotation:
+    prepared = PreparedAnnotation(
+        annotation=annotation,
+        label_id=labels.add(annotation.label)
+    )
+
+    points = _outline(annotation)
+    if not points:
+        return prepared
+
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    min_x, min_y = float(min(xs)), float(min(ys))
+    prepared.points = points
+    prepared.bbox = [min_x, min_y, max(xs) - min_x, max(ys) - min_y]
+    prepared.area = float(compute_polygon_area(xs, ys))
+
+    if width and height:
+        prepared.normalized_points = [
+            (x / width, y / height) for x, y in points
+        ]
+        x, y, w, h = prepared.bbox
+        prepared.normalized_bbox = [
+            (x + w / 2) / width,
+            (y + h / 2) / height,
+            w / width,
+            h / height
+        ]
+
+    return prepared
+
+
+def prepare_task(task: Task, labels: LabelIndex) -> PreparedTask:
+    """Derives the label ids and geometry of every annotation of a task,
+    registering new labels in ``labels``."""
+    media_specs = getattr(task, "media_specs", None)
+    width = getattr(media_specs, "width", None)
+    height = getattr(media_specs, "height", None)
+
+    return PreparedTask(
+        task=task,
+        width=width,
+        height=height,
+        annotations=[
+            prepare_annotation(annotation, labels, width, height)
+            for annotation in task.annotations or []
+        ]
+    )
@@ -1,7 +1,11 @@
 import numpy as np
 from typing import List, Union
 from linlog.constants import AnnotationType
-from linlog.schemas.annotation import BoundingBoxAnnotation, PolygonAnnotation
+from linlog.schemas.annotation import (
+    Annotation,
+    BoundingBoxAnnotation,
+    PolygonAnnotation
+)
 
 
 def convert_bbox_to_polygon(
@@ -72,3 +76,33 @@ def decode_rle(points: List[Union[int, float]]):
         x, y = points[i:i+2]
         result.append((x, y))
     return result
+
+
+def annotation_to_box(annotation: Annotation) -> np.ndarray:
+    """Axis aligned ``[x1, y1, x2, y2]`` box of a bounding box or polygon
+    annotation."""
+    if annotation.annotation_type == AnnotationType.BoundingBox:
+        return np.array([
+            annotation.left,
+            annotation.top,
+            annotation.left + annotation.width,
+            annotation.top + annotation.height
+        ], dtype=np.float64)
+
+    vertices = annotation_to_polygon(annotation)
+    return np.concatenate([vertices.min(axis=0), vertices.max(axis=0)])
+
+
+def annotation_to_polygon(annotation: Annotation) -> np.ndarray:
+    """``(K, 2)`` vertex array of an annotation's outer path. Subtraction
+    paths are ignored, like in the exporters."""
+    if annotation.annotation_type == AnnotationType.BoundingBox:
+        x1, y1 = annotation.left, annotation.top
+        x2, y2 = x1 + annotation.width, y1 + annotation.height
+        return np.array(
+            [[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.float64
+        )
+
+    return np.array(
+        [[v.x, v.y] for v in annotation.segments[0].path], dtype=np.float64
+    )
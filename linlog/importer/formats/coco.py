@@ -59,8 +59,13 @@ def create_task(payload: Dict, annotations_store, label_lookup):
                 )
             )
         if annotation.get('segmentation'):
-            if type(annotation['segmentation']) is not list:
+            segmentation = annotation['segmentation']
+            if type(segmentation) is not list:
                 continue
+            # A single polygon may also be given as a flat list, as
+            # written by the coco exporter
+            if type(segmentation[0]) is not list:
+                segmentation = [segmentation]
 
             annotations.append(
                 PolygonAnnotation(
@@ -73,9 +78,7 @@ def create_task(payload: Dict, annotations_store, label_lookup):
                                 PolygonAnnotation.PolygonSegment.Vertices(
                                     x=v[0],
                                     y=v[1]
-                                ) for v in decode_rle(
-                                    annotation['segmentation'][0]
-                                )
+                                ) for v in decode_rle(segmentation[0])
                             ],
                             subtraction=[]
                         )
@@ -0,0 +1,351 @@
+import hashlib
+import json
+import os
+import shutil
+import struct
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Deque, Iterable, Iterator, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from linlog.constants import MODULE_ROOT
+from linlog.controller import (
+    HTTP_RETRY_BACKOFF_FACTOR,
+    HTTP_STATUS_FORCE_LIST,
+    HTTP_TOTAL_RETRIES
+)
+from linlog.schemas.task import Task
+
+DEFAULT_CACHE_DIRECTORY = os.path.join(MODULE_ROOT, "media")
+DEFAULT_MAX_CACHE_BYTES = 10 * 1024 ** 3
+DEFAULT_DOWNLOAD_WORKERS = 8
+DOWNLOAD_TIMEOUT = 30
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Eviction frees space down to this fraction of the cache limit, so that
+# the cache is not scanned again on every following download
+EVICTION_TARGET = .9
+
+OBJECTS_DIRECTORY = "objects"
+URLS_DIRECTORY = "urls"
+
+ImageInfo = Tuple[str, int, int]
+
+
+def sniff_image(data: bytes) -> Optional[ImageInfo]:
+    """``(extension, width, height)`` read from the header of a PNG, GIF
+    or JPEG image, ``None`` for other formats."""
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        width, height = struct.unpack(">II", data[16:24])
+        return "png", width, height
+
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        width, height = struct.unpack("<HH", data[6:10])
+        return "gif", width, height
+
+    if data[:2] == b"\xff\xd8":
+        offset = 2
+        while offset + 9 <= len(data):
+            if data[offset] != 0xFF:
+                return None
+            marker = data[offset + 1]
+            if marker == 0xFF:
+                offset += 1
+                continue
+            length = struct.unpack(">H", data[offset + 2:offset + 4])[0]
+            # Start of frame markers, except DHT, JPG and DAC
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(
+                    ">HH", data[offset + 5:offset + 9]
+                )
+                return "jpg", width, height
+            offset += 2 + length
+
+    return None
+
+
+@dataclass
+class CachedMedia:
+    path: str
+    sha256: str
+    size: int
+    extension: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
+class MediaCache:
+    """Content addressed cache of downloaded media on the local disk.
+
+    Files are stored once under the sha256 of their content, an URL only
+    points to the content it resolved to, so media shared by several
+    tasks or datasets is kept once. Every hit refreshes the modification
+    time of the file, when the cache grows past ``max_bytes`` the least
+    recently used files are evicted. The cache has no index to keep in
+    sync, an interrupted download leaves nothing behind.
+    """
+
+    def __init__(
+        self,
+        directory: os.PathLike = DEFAULT_CACHE_DIRECTORY,
+        max_bytes: Optional[int] = DEFAULT_MAX_CACHE_BYTES
+    ) -> None:
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        os.makedirs(self._path(OBJECTS_DIRECTORY), exist_ok=True)
+        os.makedirs(self._path(URLS_DIRECTORY), exist_ok=True)
+        self.size = sum(
+            os.path.getsize(path) for path, _ in self._objects()
+        )
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.directory, *parts)
+
+    def _url_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self._path(URLS_DIRECTORY, key + ".json")
+
+    def _object_path(self, sha256: str) -> str:
+        return self._path(OBJECTS_DIRECTORY, sha256[:2], sha256)
+
+    def _objects(self) -> Iterator[Tuple[str, float]]:
+        for root, _, files in os.walk(self._path(OBJECTS_DIRECTORY)):
+            for name in files:
+                path = os.path.join(root, name)
+                yield path, os.path.getmtime(path)
+
+    def get(self, url: str) -> Optional[CachedMedia]:
+        try:
+            with open(self._url_path(url)) as f:
+                entry = json.load(f)
+            path = self._object_path(entry["sha256"])
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return CachedMedia(path=path, **entry)
+
+    def put(self, url: str, data: bytes) -> CachedMedia:
+        sha256 = hashlib.sha256(data).hexdigest()
+        info = sniff_image(data)
+        extension, width, height = info if info else (None, None, None)
+        media = CachedMedia(
+            path=self._object_path(sha256),
+            sha256=sha256,
+            size=len(data),
+            extension=extension,
+            width=width,
+            height=height
+        )
+
+        if not os.path.exists(media.path):
+            os.makedirs(os.path.dirname(media.path), exist_ok=True)
+            tmp_path = self._write_tmp(media.path, data)
+            # Checked again under the lock, another thread may have
+            # stored the same content in the meantime
+            with self._lock:
+                if os.path.exists(media.path):
+                    os.remove(tmp_path)
+                else:
+                    os.replace(tmp_path, media.path)
+                    self.size += media.size
+
+        self._write(self._url_path(url), json.dumps({
+            "sha256": sha256,
+            "size": media.size,
+            "extension": extension,
+            "width": width,
+            "height": height
+        }).encode("utf-8"))
+
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            self.evict(int(self.max_bytes * EVICTION_TARGET))
+        return media
+
+    @staticmethod
+    def _write_tmp(path: str, data: bytes) -> str:
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        return tmp_path
+
+    @classmethod
+    def _write(cls, path: str, data: bytes) -> None:
+        os.replace(cls._write_tmp(path, data), path)
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Removes the least recently used files until the cache fits in
+        ``max_bytes`` (the cache limit by default), returns the number of
+        bytes freed. URLs pointing to evicted files become misses."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        freed = 0
+        with self._lock:
+            for path, _ in sorted(self._objects(), key=lambda o: o[1]):
+                if self.size <= max_bytes:
+                    break
+                size = os.path.getsize(path)
+                os.remove(path)
+                self.size -= size
+                freed += size
+        return freed
+
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self._path(OBJECTS_DIRECTORY))
+        os.makedirs(self._path(URLS_DIRECTORY))
+        self.size = 0
+
+
+@dataclass
+class MediaResult:
+    task_id: str
+    url: str
+    media: Optional[CachedMedia] = None
+    cached: bool = False
+    error: Optional[BaseException] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+def create_session(pool_size: int) -> requests.Session:
+    """Session keeping up to ``pool_size`` connections per host open,
+    failed downloads are retried like API requests."""
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=HTTP_TOTAL_RETRIES,
+            backoff_factor=HTTP_RETRY_BACKOFF_FACTOR,
+            status_forcelist=HTTP_STATUS_FORCE_LIST,
+            allowed_methods=frozenset({"GET"})
+        )
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class MediaDownloader:
+    """Downloads task attachments into a :class:`MediaCache` from
+    ``max_workers`` threads sharing one connection pool.
+
+    Attachments already in the cache are not downloaded again. With
+    ``verify_size`` the dimensions read from an image header must match
+    the task's ``media_specs``, a mismatch fails the download of that
+    task.
+
+    .. code-block:: python
+
+        with MediaDownloader(MediaCache()) as downloader:
+            for result in downloader.fetch_all(dataset.tasks):
+                print(result.task_id, result.media.path)
+    """
+
+    def __init__(
+        self,
+        cache: Optional[MediaCache] = None,
+        max_workers: int = DEFAULT_DOWNLOAD_WORKERS,
+        verify_size: bool = True,
+        timeout: float = DOWNLOAD_TIMEOUT,
+        session: Optional[requests.Session] = None
+    ) -> None:
+        self.cache = cache if cache is not None else MediaCache()
+        self.max_workers = max_workers
+        self.verify_size = verify_size
+        self.timeout = timeout
+        self.session = session or create_session(max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="linlog-media"
+        )
+
+    def _download(self, url: str) -> bytes:
+        with self.session.get(url, timeout=self.timeout, stream=True) as res:
+            res.raise_for_status()
+            return b"".join(res.iter_content(DOWNLOAD_CHUNK_SIZE))
+
+    def fetch(self, task: Task) -> MediaResult:
+        """Downloads the attachment of a single task, errors are
+        reported in the result rather than raised."""
+        # Tasks built locally have an uuid.UUID id
+        result = MediaResult(task_id=str(task.id), url=task.attachment)
+        try:
+            result.media = self.cache.get(task.attachment)
+            result.cached = result.media is not None
+            if result.media is None:
+                result.media = self.cache.put(
+                    task.attachment, self._download(task.attachment)
+                )
+            if self.verify_size:
+                self._verify(task, result.media)
+        except Exception as e:
+            result.error = e
+        return result
+
+    @staticmethod
+    def _verify(task: Task, media: CachedMedia) -> None:
+        media_specs = getattr(task, "media_specs", None)
+        if media_specs is None or media.width is None:
+            return
+        # Tasks without media specs are loaded with a 0x0 size
+        if not media_specs.width or not media_specs.height:
+            return
+
+        expected = (media_specs.width, media_specs.height)
+        if expected != (media.width, media.height):
+            raise Exception(
+                f"Image of task {task.id} is {media.width}x{media.height}, "
+                f"expected {expected[0]}x{expected[1]}"
+            )
+
+    def submit(self, task: Task) -> 'Future[MediaResult]':
+        return self._executor.submit(self.fetch, task)
+
+    def fetch_all(self, tasks: Iterable[Task]) -> Iterator[MediaResult]:
+        """Downloads the attachments of ``tasks`` and yields the results
+        in task order, at most ``2 * max_workers`` downloads are queued
+        at a time."""
+        pending: Deque[Future] = deque()
+        try:
+            for task in tasks:
+                pending.append(self.submit(task))
+                if len(pending) >= 2 * self.max_workers:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        self.session.close()
+
+    def __enter__(self) -> 'MediaDownloader':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def copy_media(media: CachedMedia, path: str) -> str:
+    """Places a cached file at ``path``, hard linked when the file system
+    allows it, so the exported file must not be modified in place. The
+    image extension is appended when it is known."""
+    if media.extension:
+        path = f"{path}.{media.extension}"
+    if os.path.exists(path):
+        os.remove(path)
+    try:
+        os.link(media.path, path)
+    except OSError:
+        shutil.copyfile(media.path, path)
+    return path
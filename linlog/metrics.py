@@ -0,0 +1,263 @@
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+BEFORE_REQUEST = "before_request"
+AFTER_RESPONSE = "after_response"
+ON_ERROR = "on_error"
+
+HOOK_EVENTS = (BEFORE_REQUEST, AFTER_RESPONSE, ON_ERROR)
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+_ID_SEGMENT = re.compile(r"\d")
+
+
+def normalise_endpoint(endpoint: str) -> str:
+    """Collapses IDs out of an endpoint so it can be used as a metric
+    label, e.g. ``projects/12ab/tasks?limit=5`` -> ``projects/{id}/tasks``.
+    Path segments containing a digit are treated as IDs."""
+    path = endpoint.split("?", 1)[0]
+    return "/".join(
+        "{id}" if _ID_SEGMENT.search(segment) else segment
+        for segment in path.split("/")
+    )
+
+
+@dataclass
+class RequestEvent:
+    """Passed to every hook. ``duration``, ``status_code`` and
+    ``bytes_in`` are only set once a response arrived, ``error`` only
+    when the request raised."""
+
+    method: str
+    endpoint: str
+    url: str
+    started_at: float = field(default_factory=time.monotonic)
+    duration: Optional[float] = None
+    status_code: Optional[int] = None
+    bytes_out: int = 0
+    bytes_in: int = 0
+    error: Optional[BaseException] = None
+
+
+Hook = Callable[[RequestEvent], None]
+
+
+class _Histogram:
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[idx] += 1
+                break
+
+
+class MetricsCollector:
+    """In-memory request metrics fed by the Controller hooks.
+
+    Tracks per-endpoint latency histograms, bytes sent and received,
+    request and error counts by status code and the number of requests in
+    flight. Endpoints are labelled through ``endpoint_label``, which
+    defaults to :func:`normalise_endpoint`.
+    """
+
+    def __init__(
+        self,
+        buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+        endpoint_label: Callable[[str], str] = normalise_endpoint
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.endpoint_label = endpoint_label
+        self.in_flight = 0
+        self.latency: Dict[Tuple[str, str], _Histogram] = {}
+        self.bytes_out: Dict[Tuple[str, str], int] = {}
+        self.bytes_in: Dict[Tuple[str, str], int] = {}
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.errors: Dict[Tuple[str, str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def attach(self, controller) -> 'MetricsCollector':
+        controller.add_hook(BEFORE_REQUEST, self.before_request)
+        controller.add_hook(AFTER_RESPONSE, self.after_response)
+        controller.add_hook(ON_ERROR, self.on_error)
+        return self
+
+    def _key(self, event: RequestEvent) -> Tuple[str, str]:
+        return event.method, self.endpoint_label(event.endpoint)
+
+    def before_request(self, event: RequestEvent) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def after_response(self, event: RequestEvent) -> None:
+        key = self._key(event)
+        status_key = key + (str(event.status_code),)
+
+        with self._lock:
+            self.in_flight -= 1
+
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = _Histogram(self.buckets)
+            histogram.observe(event.duration)
+
+            self.bytes_out[key] = self.bytes_out.get(key, 0) + \
+                event.bytes_out
+            self.bytes_in[key] = self.bytes_in.get(key, 0) + event.bytes_in
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+
+            if event.status_code >= 400:
+                self.errors[status_key] = self.errors.get(status_key, 0) + 1
+
+    def on_error(self, event: RequestEvent) -> None:
+        status_key = self._key(event) + (type(event.error).__name__,)
+
+        with self._lock:
+            self.in_flight -= 1
+            self.errors[status_key] = self.errors.get(status_key, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.latency.clear()
+            self.bytes_out.clear()
+            self.bytes_in.clear()
+            self.requests.clear()
+            self.errors.clear()
+
+    def to_prometheus(self, prefix: str = "linlog") -> str:
+        """Renders the metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def labels(key: Tuple[str, ...], *extra: Tuple[str, str]) -> str:
+            names = ("method", "endpoint", "status")
+            pairs = list(zip(names, key)) + list(extra)
+            return "{" + ",".join(
+                f'{name}="{_escape(value)}"' for name, value in pairs
+            ) + "}"
+
+        with self._lock:
+            name = f"{prefix}_request_duration_seconds"
+            lines.append(f"# HELP {name} Request latency in seconds.")
+            lines.append(f"# TYPE {name} histogram")
+            for key, histogram in sorted(self.latency.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(
+                        f"{name}_bucket{labels(key, ('le', repr(bound)))} "
+                        f"{cumulative}"
+                    )
+                lines.append(
+                    f"{name}_bucket{labels(key, ('le', '+Inf'))} "
+                    f"{histogram.count}"
+                )
+                lines.append(f"{name}_sum{labels(key)} {histogram.sum}")
+                lines.append(f"{name}_count{labels(key)} {histogram.count}")
+
+            for metric, help_text, values in (
+                ("requests_total", "Requests by status code.",
+                    self.requests),
+                ("request_errors_total",
+                    "Failed requests by status code or exception.",
+                    self.errors),
+                ("request_bytes_sent_total", "Request body bytes sent.",
+                    self.bytes_out),
+                ("response_bytes_received_total",
+                    "Response body bytes received.", self.bytes_in),
+            ):
+                name = f"{prefix}_{metric}"
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(values.items()):
+                    lines.append(f"{name}{labels(key)} {value}")
+
+            name = f"{prefix}_requests_in_flight"
+            lines.append(f"# HELP {name} Requests currently in flight.")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {self.in_flight}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def instrument_opentelemetry(
+    controller,
+    meter_provider=None,
+    endpoint_label: Callable[[str], str] = normalise_endpoint
+) -> None:
+    """Records request metrics with OpenTelemetry, requires the
+    ``opentelemetry-api`` package."""
+    try:
+        from opentelemetry import metrics
+    except ImportError:
+        raise ImportError(
+            "OpenTelemetry instrumentation requires the "
+            "'opentelemetry-api' package"
+        )
+
+    meter = metrics.get_meter("linlog", meter_provider=meter_provider)
+    duration = meter.create_histogram(
+        "linlog.request.duration", unit="s",
+        description="Request latency in seconds."
+    )
+    bytes_out = meter.create_counter(
+        "linlog.request.bytes_sent", unit="By",
+        description="Request body bytes sent."
+    )
+    bytes_in = meter.create_counter(
+        "linlog.response.bytes_received", unit="By",
+        description="Response body bytes received."
+    )
+    errors = meter.create_counter(
+        "linlog.request.errors",
+        description="Failed requests by status code or exception."
+    )
+    in_flight = meter.create_up_down_counter(
+        "linlog.requests.in_flight",
+        description="Requests currently in flight."
+    )
+
+    def attributes(event: RequestEvent) -> Dict[str, str]:
+        return {
+            "http.method": event.method,
+            "linlog.endpoint": endpoint_label(event.endpoint)
+        }
+
+    def before_request(event: RequestEvent) -> None:
+        in_flight.add(1, attributes(event))
+
+    def after_response(event: RequestEvent) -> None:
+        attrs = attributes(event)
+        in_flight.add(-1, attrs)
+        attrs["http.status_code"] = event.status_code
+        duration.record(event.duration, attrs)
+        bytes_out.add(event.bytes_out, attrs)
+        bytes_in.add(event.bytes_in, attrs)
+        if event.status_code >= 400:
+            errors.add(1, attrs)
+
+    def on_error(event: RequestEvent) -> None:
+        attrs = attributes(event)
+        in_flight.add(-1, attrs)
+        attrs["error.type"] = type(event.error).__name__
+        errors.add(1, attrs)
+
+    controller.add_hook(BEFORE_REQUEST, before_request)
+    controller.add_hook(AFTER_RESPONSE, after_response)
+    controller.add_hook(ON_ERROR, on_error)
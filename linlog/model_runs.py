@@ -0,0 +1,206 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional, Union
+from linlog.bulk import BulkItemResult, BulkReport
+from linlog.client import LinLogClient
+from linlog.schemas.annotation import Annotation
+
+
+class ModelRunWriter:
+    """Buffers model run predictions and uploads them in the background.
+
+    Predictions are grouped into batches of at most ``batch_size`` items,
+    a batch is also sent once its oldest prediction has waited
+    ``flush_interval`` seconds. Batches are uploaded by ``max_workers``
+    background threads, one request per prediction; ``write`` blocks when
+    ``max_pending`` batches are waiting to be sent so memory stays
+    bounded. Use it as a context manager, or call ``close`` to flush the
+    remaining predictions.
+
+    Failed uploads don't stop the writer, every prediction gets a result
+    in ``report`` (keyed by task ID, in write order), which is complete
+    once the writer is closed.
+
+    .. code-block:: python
+
+        with ModelRunWriter(client, dataset_id, model_version_id) as w:
+            for task_id, prediction, score in predict(images):
+                w.write(task_id, prediction, score)
+        w.report.raise_for_errors()
+    """
+
+    def __init__(
+        self,
+        client: LinLogClient,
+        dataset_id: str,
+        model_version_id: str,
+        batch_size: int = 50,
+        flush_interval: float = 2.0,
+        max_workers: int = 4,
+        max_pending: Optional[int] = None
+    ) -> None:
+        self.client = client
+        self.dataset_id = dataset_id
+        self.model_version_id = model_version_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.written = 0
+        self.sent = 0
+        self.report = BulkReport()
+
+        self._batch: List[Dict] = []
+        self._batch_started_at: Optional[float] = None
+        self._lock = threading.Lock()
+        # Taking a batch and submitting it happen under one lock, so that
+        # batches are queued in the order their predictions were written
+        self._submit_lock = threading.Lock()
+        # Only one thread at a time moves results to the report
+        self._collect_lock = threading.Lock()
+        self._pending = threading.BoundedSemaphore(
+            max_pending or max_workers * 2
+        )
+        # Batches in submission order, so that results stay in write order
+        self._futures: Deque[Future] = deque()
+        self._closed = False
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="linlog-model-runs"
+        )
+        self._timer_stop = threading.Event()
+        self._timer = threading.Thread(
+            target=self._flush_periodically,
+            name="linlog-model-runs-timer",
+            daemon=True
+        )
+        self._timer.start()
+
+    def write(
+        self,
+        task_id: str,
+        annotation: Union[Annotation, Dict],
+        confidence_score: Optional[float] = None
+    ) -> None:
+        if self._closed:
+            raise Exception("ModelRunWriter is closed")
+
+        if bool(confidence_score):
+            assert 0 <= confidence_score <= 1, \
+                "Confidence score must be a value between 0 and 1"
+
+        model_run = {
+            "task": task_id,
+            "annotation": annotation.to_dict()
+            if isinstance(annotation, Annotation) else annotation,
+            "confidence_score": confidence_score
+        }
+
+        with self._lock:
+            if not self._batch:
+                self._batch_started_at = time.monotonic()
+            self._batch.append(model_run)
+            self.written += 1
+            full = len(self._batch) >= self.batch_size
+
+        if full:
+            self._submit_batch(
+                lambda: len(self._batch) >= self.batch_size
+            )
+
+    def flush(self) -> BulkReport:
+        """Sends the buffered predictions and waits for every batch
+        submitted so far."""
+        self._submit_batch(lambda: True)
+        self._collect(wait=True)
+        return self.report
+
+    def close(self) -> BulkReport:
+        if self._closed:
+            return self.report
+
+        self._timer_stop.set()
+        self._timer.join()
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            self._executor.shutdown(wait=True)
+        return self.report
+
+    def _take_batch(self) -> List[Dict]:
+        batch, self._batch = self._batch, []
+        self._batch_started_at = None
+        return batch
+
+    def _submit_batch(self, ready: Callable[[], bool]) -> None:
+        """Submits the buffered predictions if ``ready()`` still holds
+        once the submission lock is held."""
+        with self._submit_lock:
+            with self._lock:
+                if not self._batch or not ready():
+                    return
+                batch = self._take_batch()
+
+            # Blocks the producer while too many batches are waiting
+            self._pending.acquire()
+            self._futures.append(self._executor.submit(self._send, batch))
+
+        self._collect(wait=False)
+
+    def _collect(self, wait: bool) -> None:
+        """Moves the results of finished batches to the report, in
+        submission order. Without ``wait`` it returns straight away when
+        another thread is collecting."""
+        if not self._collect_lock.acquire(blocking=wait):
+            return
+        try:
+            while self._futures and (wait or self._futures[0].done()):
+                results = self._futures.popleft().result()
+                with self._lock:
+                    self.report.results.extend(results)
+        finally:
+            self._collect_lock.release()
+
+    def _send(self, batch: List[Dict]) -> List[BulkItemResult]:
+        results = []
+        try:
+            for model_run in batch:
+                try:
+                    response = self.client.create_model_run(
+                        self.dataset_id,
+                        self.model_version_id,
+                        model_run["task"],
+                        model_run["annotation"],
+                        model_run["confidence_score"]
+                    )
+                except Exception as e:
+                    results.append(BulkItemResult(
+                        id=model_run["task"], success=False, error=e
+                    ))
+                    continue
+
+                results.append(BulkItemResult(
+                    id=model_run["task"], success=True, response=response
+                ))
+                with self._lock:
+                    self.sent += 1
+        finally:
+            self._pending.release()
+        return results
+
+    def _flush_periodically(self) -> None:
+        while not self._timer_stop.wait(self.flush_interval / 4):
+            self._submit_batch(self._batch_expired)
+
+    def _batch_expired(self) -> bool:
+        return self._batch_started_at is not None and \
+            time.monotonic() - self._batch_started_at >= self.flush_interval
+
+    def __enter__(self) -> 'ModelRunWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -0,0 +1,149 @@
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional, Union
+from linlog.constants import (
+    TASK_COMPLETE_KEY,
+    TASK_METADATA_KEY,
+    TASK_REJECTED_KEY,
+    TASK_TAGS_KEY,
+    TASK_WORKFLOW_STAGE_KEY
+)
+
+QUERY_LABELS_KEY = 'labels'
+QUERY_CREATED_DATE_KEY = 'created_date'
+QUERY_FIELDS_KEY = 'fields'
+
+DATE_LOOKUPS = ['', 'gte', 'lte', 'gt', 'lt']
+
+DateLike = Union[str, date, datetime]
+
+
+def _date_value(value: DateLike) -> str:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _values(values: Iterable) -> list:
+    if isinstance(values, str):
+        return [values]
+    return list(values)
+
+
+class TaskQuery:
+    """Filters for the dataset task search, evaluated by the server.
+
+    Queries are immutable, every method returns a new query so that a base
+    query can be shared and refined:
+
+        completed = TaskQuery().complete()
+        cars = completed.labels("car", "truck").tags("night")
+        client.get_dataset_tasks(dataset_id, query=cars, limit=100)
+
+    Filters on different fields are combined with AND, the values given to
+    a list filter (labels, workflow stages, tags) with OR.
+    """
+
+    def __init__(self, filters: Optional[Dict[str, Any]] = None) -> None:
+        self._filters: Dict[str, Any] = dict(filters or {})
+
+    def _with(self, key: str, value: Any) -> 'TaskQuery':
+        return TaskQuery({**self._filters, key: value})
+
+    def labels(self, *labels: str) -> 'TaskQuery':
+        """Tasks with at least one annotation of one of the labels."""
+        return self._with(QUERY_LABELS_KEY, _values(labels))
+
+    def complete(self, value: bool = True) -> 'TaskQuery':
+        return self._with(TASK_COMPLETE_KEY, value)
+
+    def rejected(self, value: bool = True) -> 'TaskQuery':
+        return self._with(TASK_REJECTED_KEY, value)
+
+    def workflow_stage(self, *stages: str) -> 'TaskQuery':
+        return self._with(TASK_WORKFLOW_STAGE_KEY, _values(stages))
+
+    def tags(self, *tags: str) -> 'TaskQuery':
+        """Tasks carrying at least one of the tags."""
+        return self._with(TASK_TAGS_KEY, _values(tags))
+
+    def created(self, value: DateLike, lookup: str = '') -> 'TaskQuery':
+        """Filters on the creation date, ``lookup`` is one of '', 'gte',
+        'lte', 'gt' or 'lt'."""
+        if lookup not in DATE_LOOKUPS:
+            raise Exception(f"Invalid date lookup: {lookup}")
+
+        key = QUERY_CREATED_DATE_KEY + (f"__{lookup}" if lookup else '')
+        return self._with(key, _date_value(value))
+
+    def created_between(
+        self,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None
+    ) -> 'TaskQuery':
+        """Tasks created in the inclusive ``[start, end]`` range, either
+        bound can be omitted."""
+        query = self
+        if start is not None:
+            query = query.created(start, 'gte')
+        if end is not None:
+            query = query.created(end, 'lte')
+        return query
+
+    def metadata(self, **fields: Any) -> 'TaskQuery':
+        """Exact matches on task metadata fields, merged with the metadata
+        filters already set."""
+        return self._with(TASK_METADATA_KEY, {
+            **self._filters.get(TASK_METADATA_KEY, {}),
+            **fields
+        })
+
+    def to_dict(self) -> Dict[str, Any]:
+        filters = dict(self._filters)
+        if TASK_METADATA_KEY in filters:
+            filters[TASK_METADATA_KEY] = dict(filters[TASK_METADATA_KEY])
+        return filters
+
+    def __bool__(self) -> bool:
+        return bool(self._filters)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, TaskQuery) and \
+            self._filters == other._filters
+
+    def __repr__(self) -> str:
+        return f"TaskQuery({self._filters!r})"
+
+
+FieldTree = Dict[str, Optional['FieldTree']]
+
+
+def parse_fields(fields: Iterable[str]) -> FieldTree:
+    """Turns dotted field paths into a tree, e.g. ``["id",
+    "annotations.label"]`` -> ``{"id": None, "annotations": {"label":
+    None}}``. A field selected as a whole wins over its sub-fields."""
+    tree: FieldTree = {}
+    for path in _values(fields):
+        node = tree
+        parts = path.split('.')
+        for part in parts[:-1]:
+            if part in node and node[part] is None:
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def project(payload: Any, tree: FieldTree) -> Any:
+    """Keeps only the fields of ``tree`` in a decoded payload, lists are
+    projected item by item."""
+    if isinstance(payload, list):
+        return [project(item, tree) for item in payload]
+    if not isinstance(payload, dict):
+        return payload
+
+    return {
+        key: payload[key] if subtree is None else
+        project(payload[key], subtree)
+        for key, subtree in tree.items() if key in payload
+    }
@@ -0,0 +1,184 @@
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Token bucket refilled at ``rate`` tokens per second, holding at most
+    ``burst`` tokens."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("Rate must be a positive number")
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1)
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Blocks until ``tokens`` are available, returns the time spent
+        waiting in seconds."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+
+                delay = max(
+                    self._paused_until - now,
+                    (tokens - self._tokens) / self.rate
+                )
+
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """Stops handing out tokens for ``seconds``, e.g. after the server
+        answered with a Retry-After header."""
+        with self._lock:
+            self._paused_until = max(
+                self._paused_until, time.monotonic() + seconds
+            )
+            self._tokens = 0
+
+
+class RateLimiter:
+    """Global token bucket plus optional per-endpoint buckets.
+
+    Per-endpoint limits are keyed by endpoint prefix, the longest matching
+    prefix wins, e.g. ``{"search/tasks": 5, "tasks/image": 20}``.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        endpoint_rates: Optional[Dict[str, float]] = None,
+        burst: Optional[float] = None
+    ) -> None:
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.endpoint_buckets: Dict[str, TokenBucket] = {
+            prefix: TokenBucket(endpoint_rate)
+            for prefix, endpoint_rate in (endpoint_rates or {}).items()
+        }
+        # Longest prefixes first so that the most specific bucket matches
+        self._prefixes = sorted(self.endpoint_buckets, key=len, reverse=True)
+
+    def _endpoint_bucket(self, endpoint: str) -> Optional[TokenBucket]:
+        for prefix in self._prefixes:
+            if endpoint.startswith(prefix):
+                return self.endpoint_buckets[prefix]
+        return None
+
+    def acquire(self, endpoint: str) -> float:
+        waited = 0.0
+        endpoint_bucket = self._endpoint_bucket(endpoint)
+        if endpoint_bucket is not None:
+            waited += endpoint_bucket.acquire()
+        if self.bucket is not None:
+            waited += self.bucket.acquire()
+        return waited
+
+    def pause(self, endpoint: str, seconds: float) -> None:
+        endpoint_bucket = self._endpoint_bucket(endpoint)
+        if endpoint_bucket is not None:
+            endpoint_bucket.pause(seconds)
+        if self.bucket is not None:
+            self.bucket.pause(seconds)
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD (additive increase, multiplicative decrease) limit on the number
+    of requests in flight.
+
+    The limit grows by roughly one slot per ``limit`` healthy responses and
+    is cut by ``backoff`` when the server throttles (429), fails (5xx or
+    connection errors) or latency rises above ``latency_tolerance`` times
+    the best latency seen so far for the same endpoint, so that slow
+    endpoints are not compared with fast ones. Decreases happen at most
+    once per ``cooldown`` seconds so that one burst of errors does not
+    collapse the limit to its minimum.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff: float = 0.5,
+        latency_tolerance: float = 3.0,
+        cooldown: float = 1.0
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._min_latency: Dict[Optional[str], float] = {}
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(
+        self,
+        latency: Optional[float] = None,
+        status_code: Optional[int] = None,
+        endpoint: Optional[str] = None
+    ) -> None:
+        """Frees a slot and adjusts the limit from the request outcome. A
+        ``status_code`` of None means the request failed without a
+        response. ``latency`` is compared with the best latency of the
+        same ``endpoint``, e.g. ``"GET projects/{id}"``."""
+        with self._condition:
+            self._in_flight -= 1
+
+            if status_code is None or status_code == 429 \
+                    or status_code >= 500:
+                self._decrease()
+            elif latency is not None:
+                min_latency = self._min_latency.get(endpoint)
+                if min_latency is None or latency < min_latency:
+                    min_latency = self._min_latency[endpoint] = latency
+
+                if latency > min_latency * self.latency_tolerance:
+                    self._decrease()
+                else:
+                    self._limit = min(
+                        self.max_limit, self._limit + 1 / self._limit
+                    )
+
+            self._condition.notify_all()
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+
+        self._last_decrease = now
+        self._limit = max(self.min_limit, self._limit * self.backoff)
@@ -1,15 +1,57 @@
-from .annotation import ( # noqa
-    Annotation, PolygonAnnotation, BoundingBoxAnnotation
-)
-from .attributes import ProjectAttribute # noqa
-from .generic import ( # noqa
-    Label,
-    LabelAttribute,
-    MinMaxZoomDict,
-    LatLngDict,
-    TaskBoundsDict
-)
-from .organisation import Organisation # noqa
-from .project import ObjectToAnnotate, Project # noqa
-from .dataset import Dataset # noqa
-from .task import Task, ImageTask, GeospatialTask # noqa
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .annotation import (  # noqa
+        Annotation, PolygonAnnotation, BoundingBoxAnnotation
+    )
+    from .attributes import ProjectAttribute  # noqa
+    from .generic import (  # noqa
+        Label,
+        LabelAttribute,
+        MinMaxZoomDict,
+        LatLngDict,
+        TaskBoundsDict
+    )
+    from .organisation import Organisation  # noqa
+    from .project import ObjectToAnnotate, Project  # noqa
+    from .dataset import Dataset  # noqa
+    from .task import Task, ImageTask, GeospatialTask, PartialTask  # noqa
+
+# Schemas are imported on first access (PEP 562) so that importing one of
+# them does not load all the others.
+_SCHEMA_MODULES = {
+    'Annotation': '.annotation',
+    'PolygonAnnotation': '.annotation',
+    'BoundingBoxAnnotation': '.annotation',
+    'ProjectAttribute': '.attributes',
+    'Label': '.generic',
+    'LabelAttribute': '.generic',
+    'MinMaxZoomDict': '.generic',
+    'LatLngDict': '.generic',
+    'TaskBoundsDict': '.generic',
+    'Organisation': '.organisation',
+    'ObjectToAnnotate': '.project',
+    'Project': '.project',
+    'Dataset': '.dataset',
+    'Task': '.task',
+    'ImageTask': '.task',
+    'GeospatialTask': '.task',
+    'PartialTask': '.task',
+}
+
+__all__ = list(_SCHEMA_MODULES)
+
+
+def __getattr__(name: str):
+    module = _SCHEMA_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SCHEMA_MODULES))
@@ -1,7 +1,7 @@
-import json
 import uuid
+from array import array
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Union, Type, Optional
+from typing import Any, Dict, List, Tuple, Union, Type, Optional
 from linlog.constants import (
     ANNOTATION_ATTRIBUTES_KEY,
     ANNOTATION_ID_KEY,
@@ -18,8 +18,11 @@ from linlog.constants import (
     POLYGON_SEGMENTS_KEY,
     POLYGON_SEGMENTS_PATH_KEY,
     POLYGON_SEGMENTS_SUBTRACTION_KEY,
+    POLYGON_VERTEX_X_KEY,
+    POLYGON_VERTEX_Y_KEY,
     AnnotationType
 )
+from linlog.encoder import get_encoder
 
 
 class Annotation:
@@ -38,6 +41,21 @@ class Annotation:
             raise Exception("Annotation ids cannot be changed")
 
         self.__dict__[__name] = __value
+        self.__dict__['_changed'] = True
+
+    @property
+    def is_changed(self) -> bool:
+        """Whether the annotation was modified since it was loaded or last
+        saved with its task."""
+        return self.__dict__.get('_changed', True)
+
+    def mark_clean(self) -> None:
+        self.__dict__['_changed'] = False
+
+    def mark_changed(self) -> None:
+        """Flags in-place edits that assignments can not detect, e.g.
+        vertices appended to a polygon segment."""
+        self.__dict__['_changed'] = True
 
     @classmethod
     def from_json(cls, payload: Union[dict, List[dict]], many=False):
@@ -53,6 +71,7 @@ class Annotation:
 
         type_key_to_type: Dict[str, Type[Annotation]] = {
             AnnotationType.BoundingBox: BoundingBoxAnnotation,
+            AnnotationType.Polygon: PolygonAnnotation,
         }
         if many:
             return [
@@ -75,7 +94,7 @@ class Annotation:
 
     def to_json(self) -> str:
         """Serializes annotation object to schematized JSON string."""
-        return json.dumps(self.to_dict(), allow_nan=False)
+        return get_encoder().encode_annotation(self).decode("utf-8")
 
 
 @dataclass
@@ -176,13 +195,13 @@ class PolygonAnnotation(Annotation):
         def from_json(cls, payload: Dict):
             return cls(
                 path=[
-                    PolygonAnnotation.Vertices(
+                    PolygonAnnotation.PolygonSegment.Vertices(
                         x=v.get('x', 0),
                         y=v.get('y', 0)
                     ) for v in payload.get(POLYGON_SEGMENTS_PATH_KEY, [])
                 ],
                 subtraction=[
-                    PolygonAnnotation.Vertices(
+                    PolygonAnnotation.PolygonSegment.Vertices(
                         x=v.get('x', 0),
                         y=v.get('y', 0)
                     ) for v in payload
@@ -190,13 +209,23 @@ class PolygonAnnotation(Annotation):
                 ]
             )
 
+        def __reduce__(self):
+            # Vertices are pickled as two flat number buffers instead of
+            # one object per vertex
+            return _segment_from_buffers, (
+                _pack_vertices(self.path),
+                _pack_vertices(self.subtraction)
+            )
+
         def to_dict(self):
             return {
                 POLYGON_SEGMENTS_PATH_KEY: [
-                    {"x": v.x, "y": v.y} for v in self.path
+                    {POLYGON_VERTEX_X_KEY: v.x, POLYGON_VERTEX_Y_KEY: v.y}
+                    for v in self.path
                 ],
                 POLYGON_SEGMENTS_SUBTRACTION_KEY: [
-                    {"x": v.x, "y": v.y} for v in self.subtraction
+                    {POLYGON_VERTEX_X_KEY: v.x, POLYGON_VERTEX_Y_KEY: v.y}
+                    for v in self.subtraction
                 ]
             }
 
@@ -255,3 +284,50 @@ class PolygonAnnotation(Annotation):
 
     def __str__(self) -> str:
         return f"BoundingBoxAnnotation(id={self.id})"
+
+
+# (integers, floats, flags), flag ``i`` is set when value ``i`` is the
+# next one of the integers rather than of the floats
+VertexBuffer = Tuple[bytes, bytes, bytes]
+
+
+def _pack_vertices(
+    vertices: List[PolygonAnnotation.PolygonSegment.Vertices]
+) -> VertexBuffer:
+    ints, floats = array('q'), array('d')
+    flags = bytearray()
+    for value in (value for v in vertices for value in (v.x, v.y)):
+        is_int = type(value) is int
+        (ints if is_int else floats).append(value)
+        flags.append(is_int)
+    return ints.tobytes(), floats.tobytes(), bytes(flags)
+
+
+def _unpack_vertices(
+    buffer: VertexBuffer
+) -> List[PolygonAnnotation.PolygonSegment.Vertices]:
+    int_data, float_data, flags = buffer
+    ints, floats = array('q'), array('d')
+    ints.frombytes(int_data)
+    floats.frombytes(float_data)
+
+    int_values, float_values = iter(ints), iter(floats)
+    values = [
+        next(int_values) if is_int else next(float_values)
+        for is_int in flags
+    ]
+    Vertices = PolygonAnnotation.PolygonSegment.Vertices
+    return [
+        Vertices(x=values[i], y=values[i + 1])
+        for i in range(0, len(values), 2)
+    ]
+
+
+def _segment_from_buffers(
+    path: VertexBuffer,
+    subtraction: VertexBuffer
+) -> PolygonAnnotation.PolygonSegment:
+    return PolygonAnnotation.PolygonSegment(
+        path=_unpack_vertices(path),
+        subtraction=_unpack_vertices(subtraction)
+    )
@@ -3,7 +3,7 @@ import datetime
 from linlog.constants import TaskType
 from linlog import schemas
 from dataclasses import dataclass, field
-from linlog.client import LinLogClient
+from typing import TYPE_CHECKING, Dict, List
 from linlog.constants import (
     IN_MEMORY_PREFIX,
     DATASET_ID_KEY,
@@ -18,6 +18,9 @@ from linlog.constants import (
     DATASET_LABEL_TYPE_KEY,
 )
 
+if TYPE_CHECKING:
+    from linlog.client import LinLogClient
+
 
 @dataclass
 class DatasetLabel:
@@ -94,7 +97,7 @@ class Dataset:
     @classmethod
     def create(
         self,
-        client: LinLogClient,
+        client: 'LinLogClient',
         project_title: str,
         project_type: str
     ):
@@ -103,33 +106,35 @@ class Dataset:
         )
 
     @classmethod
-    def get_by_id(self, client: LinLogClient, id: str):
+    def get_by_id(self, client: 'LinLogClient', id: str):
         return Dataset.from_json(
             client.get_dataset(id)
         )
 
     @classmethod
-    def get_all(self, client: LinLogClient):
+    def get_all(self, client: 'LinLogClient'):
         return list(map(
             lambda dataset: Dataset.from_json(dataset), client.get_datasets()
         ))
 
-    def get_tasks(self, client: LinLogClient, **kwargs):
+    def get_tasks(self, client: 'LinLogClient', **kwargs):
 
         tasks = client.get_dataset_tasks(self.id, **kwargs)
-        tasks.transform_results(lambda task: schemas.Task.from_json(task))
+        TaskCls = schemas.PartialTask if kwargs.get('fields') \
+            else schemas.Task
+        tasks.transform_results(lambda task: TaskCls.from_json(task))
         return tasks
 
-    def save(self, client: LinLogClient):
+    def save(self, client: 'LinLogClient'):
         payload = self.to_dict()
         client.update_project(self.id, payload)
         return True
 
-    def delete(self, client: LinLogClient):
+    def delete(self, client: 'LinLogClient'):
         client.delete_project(self.id)
         return True
 
-    def create_task(self, client: LinLogClient, task: 'schemas.Task'):
+    def create_task(self, client: 'LinLogClient', task: 'schemas.Task'):
         if task.task_type != self.type:
             raise Exception(
                 "Task type does not match project" +
@@ -1,7 +1,6 @@
 from ast import Dict
-from linlog import LinLogClient
 from dataclasses import dataclass
-from typing import List
+from typing import TYPE_CHECKING, List
 from linlog.constants import (
     ORGANISATION_ID_KEY,
     ORGANISATION_MEMBERS_KEY,
@@ -9,6 +8,9 @@ from linlog.constants import (
     ORGANISATION_SUBSCRIPTION_KEY
 )
 
+if TYPE_CHECKING:
+    from linlog.client import LinLogClient
+
 
 @dataclass
 class Member:
@@ -48,7 +50,7 @@ class Organisation:
         }
 
     @classmethod
-    def get(cls, client: LinLogClient) -> 'Organisation':
+    def get(cls, client: 'LinLogClient') -> 'Organisation':
         return Organisation.from_json(
             client.get_organisation()
         )
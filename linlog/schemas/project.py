@@ -4,8 +4,7 @@ import datetime
 from linlog.constants import TaskType
 from linlog import schemas
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Union
-from linlog.client import LinLogClient
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
 from linlog.constants import (
     IN_MEMORY_PREFIX,
     PROJECT_ANNOTATION_ATTRIBUTES_KEY,
@@ -24,6 +23,9 @@ from linlog.constants import (
     OBJECT_TO_ANNOTATE_RAW_COLOUR_CODE_KEY,
 )
 
+if TYPE_CHECKING:
+    from linlog.client import LinLogClient
+
 
 @dataclass
 class ObjectToAnnotate:
@@ -163,7 +165,7 @@ class Project:
     @classmethod
     def create(
         self,
-        client: LinLogClient,
+        client: 'LinLogClient',
         project_title: str,
         project_type: str
     ):
@@ -172,48 +174,50 @@ class Project:
         )
 
     @classmethod
-    def get_by_id(self, client: LinLogClient, id: str):
+    def get_by_id(self, client: 'LinLogClient', id: str):
         return Project.from_json(
             client.get_project(id)
         )
 
     @classmethod
-    def get_all(self, client: LinLogClient):
+    def get_all(self, client: 'LinLogClient'):
         return list(map(
             lambda project: Project.from_json(project), client.get_projects()
         ))
 
-    def get_batches(self, client: LinLogClient):
+    def get_batches(self, client: 'LinLogClient'):
         return client.get_project_batches(self.id)
 
-    def get_tasks(self, client: LinLogClient, **kwargs):
+    def get_tasks(self, client: 'LinLogClient', **kwargs):
+        TaskCls = schemas.PartialTask if kwargs.get('fields') \
+            else schemas.Task
         return list(map(
-            lambda task: schemas.Task.from_json(task),
+            lambda task: TaskCls.from_json(task),
             client.get_project_tasks(self.id, **kwargs)
         ))
 
-    def save(self, client: LinLogClient) -> None:
+    def save(self, client: 'LinLogClient') -> None:
         payload = self.to_dict()
         client.update_project(self.id, payload)
 
-    def delete(self, client: LinLogClient) -> None:
+    def delete(self, client: 'LinLogClient') -> None:
         client.delete_project(self.id)
         return True
 
     def create_labels(
         self,
-        client: LinLogClient,
+        client: 'LinLogClient',
         labels: List[ObjectToAnnotate]
     ) -> None:
         for label in labels:
             self.create_label(client, label)
 
-    def create_label(self, client: LinLogClient, label: ObjectToAnnotate):
+    def create_label(self, client: 'LinLogClient', label: ObjectToAnnotate):
         label_payload = label.to_dict()
         new_label = client.create_project_label(self.id, label_payload)
         self.objects_to_annotate.append(new_label)
 
-    def create_task(self, client: LinLogClient, task: 'schemas.Task'):
+    def create_task(self, client: 'LinLogClient', task: 'schemas.Task'):
         if task.task_type != self.type:
             raise Exception(
                 "Task type does not match project" +
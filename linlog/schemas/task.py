@@ -1,9 +1,14 @@
-import json
+import copy
 import uuid
-from linlog import LinLogClient
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Type, Union
+from typing import (
+    TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple, Type,
+    Union
+)
 from linlog.constants import (
+    ANNOTATION_CHANGES_ADDED_KEY,
+    ANNOTATION_CHANGES_REMOVED_KEY,
+    ANNOTATION_CHANGES_UPDATED_KEY,
     IMAGE_TASK_HEIGHT,
     IMAGE_TASK_MEDIA_SPECS,
     IMAGE_TASK_WIDTH,
@@ -29,6 +34,7 @@ from linlog.constants import (
     TASK_METADATA_KEY,
     TASK_EXTERNAL_DATA_KEY,
     TASK_UNIQUE_ID_KEY,
+    TASK_ANNOTATION_CHANGES_KEY,
     GEOTASK_ZOOM_KEY,
     GEOTASK_ZOOM_MIN_KEY,
     GEOTASK_ZOOM_MAX_KEY,
@@ -39,10 +45,111 @@ from linlog.constants import (
     GEOTASK_BOUNDS_SW_KEY,
     TaskType
 )
+from linlog.encoder import encode_task
 from linlog.schemas.annotation import Annotation
 from linlog.schemas import LatLngDict, MinMaxZoomDict
 from linlog.validators.task import validate_task_payload
 
+if TYPE_CHECKING:
+    from linlog.client import LinLogClient
+
+
+class _TrackedContainer:
+    """Tags or metadata of a tracked task. The first call that may edit
+    the container in place, including handing out a nested list or dict,
+    makes the task snapshot it first. Containers are pickled as plain
+    lists and dicts."""
+
+    def _init_tracking(self, owner: Optional['Task'], key: str) -> None:
+        self._owner = owner
+        self._key = key
+        self._nested = any(
+            isinstance(value, (list, dict)) for value in self._values()
+        )
+
+    def _before_change(self) -> None:
+        owner = self._owner
+        if owner is not None:
+            self._owner = None
+            owner._snapshot_container(self._key)
+
+    def _before_read(self) -> None:
+        if self._nested:
+            self._before_change()
+
+    def _values(self) -> Iterable:
+        raise NotImplementedError
+
+
+class _TrackedList(_TrackedContainer, list):
+
+    def __init__(self, values: List, owner: Optional['Task'], key: str):
+        list.__init__(self, list.__iter__(values))
+        self._init_tracking(owner, key)
+
+    def _values(self) -> Iterable:
+        return list.__iter__(self)
+
+    def __reduce__(self):
+        return list, (list(list.__iter__(self)),)
+
+
+class _TrackedDict(_TrackedContainer, dict):
+
+    def __init__(self, values: Dict, owner: Optional['Task'], key: str):
+        dict.__init__(self, values)
+        self._init_tracking(owner, key)
+
+    def _values(self) -> Iterable:
+        return dict.values(self)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+def _track_method(
+    cls: type,
+    base: type,
+    name: str,
+    read: bool = False
+) -> None:
+    method = getattr(base, name)
+
+    def wrapper(self, *args, **kwargs):
+        if read:
+            self._before_read()
+        else:
+            self._before_change()
+        return method(self, *args, **kwargs)
+
+    def getter(self, *args, **kwargs):
+        # Only a nested list or dict can be edited by the caller
+        value = method(self, *args, **kwargs)
+        if isinstance(value, (list, dict)):
+            self._before_change()
+        return value
+
+    tracked = getter if name in ['__getitem__', 'get'] else wrapper
+    tracked.__name__ = name
+    setattr(cls, name, tracked)
+
+
+for _name in [
+    '__setitem__', '__delitem__', '__iadd__', '__imul__', 'append',
+    'extend', 'insert', 'pop', 'remove', 'clear', 'sort', 'reverse'
+]:
+    _track_method(_TrackedList, list, _name)
+for _name in ['__getitem__', '__iter__', '__reversed__', 'copy']:
+    _track_method(_TrackedList, list, _name, read=True)
+for _name in [
+    '__setitem__', '__delitem__', '__ior__', 'pop', 'popitem', 'clear',
+    'update', 'setdefault'
+]:
+    _track_method(_TrackedDict, dict, _name)
+for _name in ['__getitem__', 'get', 'values', 'items', 'copy']:
+    _track_method(_TrackedDict, dict, _name, read=True)
+del _name
+
 
 @dataclass
 class Task:
@@ -75,10 +182,28 @@ class Task:
     tags: List[str] = field(default_factory=list)
     metadata: Dict = field(default_factory=dict)
 
+    TRACKED_CONTAINERS = [TASK_TAGS_KEY, TASK_METADATA_KEY]
+
     def __post_init__(self) -> None:
         if self.id is None:
             self.id = uuid.uuid4()
 
+    def __getstate__(self) -> Dict:
+        """Copies and unpickled tasks track their changes separately from
+        the task they were made from."""
+        state = dict(self.__dict__)
+        if '_changed_fields' in state:
+            state['_changed_fields'] = set(state['_changed_fields'])
+        if '_saved_containers' in state:
+            state['_saved_containers'] = dict(state['_saved_containers'])
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        # Bypasses __setattr__, ids and attachments are set once more
+        self.__dict__.update(state)
+        if self.is_tracked:
+            self._track_containers()
+
     def __setattr__(self, __name: str, __value: Any) -> None:
         protected_fields = [
             TASK_ID_KEY,
@@ -96,6 +221,7 @@ class Task:
             raise Exception(f"Task {__name}s cannot be changed")
 
         self.__dict__[__name] = __value
+        self.__dict__.setdefault('_changed_fields', set()).add(__name)
 
     @classmethod
     def from_json(cls, payload: Union[dict, List[dict]], many=False) -> 'Task':
@@ -130,20 +256,129 @@ class Task:
     def to_dict(self) -> 'Task':
         pass
 
+    def to_bytes(self) -> bytes:
+        """Serializes task object to schematized JSON bytes without
+        building the intermediate dict."""
+        return encode_task(self)
+
     def assign_to_user(self):
         raise NotImplementedError
 
     def assign_to_workflow(self):
         raise NotImplementedError
 
-    def save(self, client: 'LinLogClient'):
-        payload = self.to_dict()
-        _ = validate_task_payload(payload)
+    def mark_clean(self) -> None:
+        """Records the current state as saved, :meth:`save` then only
+        sends what changes afterwards."""
+        self.__dict__['_changed_fields'] = set()
+        self.__dict__['_saved_containers'] = {}
+        self.__dict__['_saved_annotation_ids'] = [
+            annotation.id for annotation in self.annotations
+        ]
+        self._track_containers()
+        for annotation in self.annotations:
+            annotation.mark_clean()
+
+    def _track_containers(self) -> None:
+        """Wraps tags and metadata so that they are only snapshotted right
+        before their first in-place edit, instead of on every load."""
+        saved = self.__dict__.setdefault('_saved_containers', {})
+        for key in self.TRACKED_CONTAINERS:
+            value = self.__dict__.get(key)
+            owner = None if key in saved else self
+            if isinstance(value, list):
+                self.__dict__[key] = _TrackedList(value, owner, key)
+            elif isinstance(value, dict):
+                self.__dict__[key] = _TrackedDict(value, owner, key)
+
+    def _snapshot_container(self, key: str) -> None:
+        saved = self.__dict__.setdefault('_saved_containers', {})
+        if key not in saved:
+            saved[key] = copy.deepcopy(self.__dict__.get(key))
+
+    @property
+    def is_tracked(self) -> bool:
+        """Whether the task was loaded or saved, i.e. changes are tracked
+        against a known server state."""
+        return '_saved_annotation_ids' in self.__dict__
+
+    @property
+    def changed_fields(self) -> Set[str]:
+        """Fields assigned since the task was loaded or saved, plus tags
+        and metadata edited in place (compared to their snapshot, if one
+        was taken). Annotations are tracked separately, see
+        :meth:`get_annotation_changes`."""
+        changed = set(self.__dict__.get('_changed_fields', ()))
+        saved = self.__dict__.get('_saved_containers', {})
+        for key, value in saved.items():
+            if self.__dict__.get(key) != value:
+                changed.add(key)
+
+        changed.discard(TASK_ANNOTATIONS_KEY)
+        return changed
+
+    def get_annotation_changes(self) -> Dict[str, List]:
+        """Annotations added, updated or removed since the task was loaded
+        or saved."""
+        saved_ids = self.__dict__.get('_saved_annotation_ids', [])
+        saved = set(saved_ids)
+        current = set()
+        added, updated = [], []
+
+        for annotation in self.annotations:
+            current.add(annotation.id)
+            if annotation.id not in saved:
+                added.append(annotation.to_dict())
+            elif annotation.is_changed:
+                updated.append(annotation.to_dict())
+
+        return {
+            ANNOTATION_CHANGES_ADDED_KEY: added,
+            ANNOTATION_CHANGES_UPDATED_KEY: updated,
+            ANNOTATION_CHANGES_REMOVED_KEY: [
+                annotation_id for annotation_id in saved_ids
+                if annotation_id not in current
+            ]
+        }
 
-        client.update_task(self.id, payload)
+    def _field_payload(self, name: str) -> Tuple[str, Any]:
+        """Payload key and value of a changed field."""
+        if name in [TASK_ATTACHMENT_KEY, TASK_ATTACHMENT_TYPE_KEY]:
+            return TASK_PARAMS_KEY, {
+                TASK_ATTACHMENT_KEY: self.attachment,
+                TASK_ATTACHMENT_TYPE_KEY: self.attachment_type
+            }
+        return name, getattr(self, name)
+
+    def get_changes(self) -> Dict:
+        """Partial payload with the changed fields and annotation deltas,
+        empty when nothing changed."""
+        payload = dict(
+            self._field_payload(name) for name in self.changed_fields
+        )
+
+        annotation_changes = self.get_annotation_changes()
+        if any(annotation_changes.values()):
+            payload[TASK_ANNOTATION_CHANGES_KEY] = annotation_changes
+
+        return payload
+
+    def save(self, client: 'LinLogClient', partial: bool = True):
+        """Saves the task. Tasks loaded from the server only send their
+        changes, pass ``partial=False`` to send the full task."""
+        if partial and self.is_tracked:
+            payload = self.get_changes()
+            if payload:
+                client.update_task(self.id, payload)
+        else:
+            payload = self.to_dict()
+            _ = validate_task_payload(payload)
+            client.update_task(self.id, payload)
+
+        self.mark_clean()
         return True
 
-    def delete(self, client: LinLogClient):
+    def delete(self, client: 'LinLogClient'):
         client.delete_tasks([self.id])
         return True
 
@@ -226,7 +461,7 @@ class ImageTask(Task):
         if not success:
             return None
 
-        return cls(
+        task = cls(
             id=payload.get(TASK_ID_KEY, None),
             global_key=payload.get(TASK_GLOBAL_KEY_KEY, None),
             filename=payload.get(TASK_FILENAME_KEY, None),
@@ -262,6 +497,8 @@ class ImageTask(Task):
                         .get(IMAGE_TASK_HEIGHT, 0),
             )
         )
+        task.mark_clean()
+        return task
 
     def to_dict(self) -> Dict:
         return {
@@ -283,9 +520,9 @@ class ImageTask(Task):
                 TASK_ATTACHMENT_KEY: self.attachment,
                 TASK_ATTACHMENT_TYPE_KEY: self.attachment_type
             },
-            TASK_ANNOTATIONS_KEY: list(map(
-                lambda annotation: annotation.to_dict(), self.annotations
-            )),
+            TASK_ANNOTATIONS_KEY: [
+                annotation.to_dict() for annotation in self.annotations
+            ],
             TASK_TAGS_KEY: self.tags,
             TASK_METADATA_KEY: self.metadata,
             TASK_EXTERNAL_DATA_KEY: self.external_data,
@@ -296,9 +533,17 @@ class ImageTask(Task):
             }
         }
 
+    def _field_payload(self, name: str) -> Tuple[str, Any]:
+        if name == IMAGE_TASK_MEDIA_SPECS and self.media_specs:
+            return name, {
+                IMAGE_TASK_WIDTH: self.media_specs.width,
+                IMAGE_TASK_HEIGHT: self.media_specs.height
+            }
+        return super()._field_payload(name)
+
     def to_json(self) -> str:
-        """Serializes annotation object to schematized JSON string."""
-        return json.dumps(self.to_dict(), allow_nan=False)
+        """Serializes task object to schematized JSON string."""
+        return self.to_bytes().decode("utf-8")
 
     def __str__(self) -> str:
         return f"ImageTask(id={self.id})"
@@ -400,7 +645,7 @@ class GeospatialTask(Task):
         if not success:
             return None
 
-        return cls(
+        task = cls(
             id=payload.get(TASK_ID_KEY, None),
             global_key=payload.get(TASK_GLOBAL_KEY_KEY, None),
             filename=payload.get(TASK_FILENAME_KEY, None),
@@ -432,6 +677,8 @@ class GeospatialTask(Task):
             zoom=payload.get(GEOTASK_ZOOM_KEY, {}),
             bounds=payload.get(GEOTASK_BOUNDS_KEY, [])
         )
+        task.mark_clean()
+        return task
 
     def to_dict(self) -> Dict:
         return {
@@ -453,9 +700,9 @@ class GeospatialTask(Task):
                 TASK_ATTACHMENT_KEY: self.attachment,
                 TASK_ATTACHMENT_TYPE_KEY: self.attachment_type
             },
-            TASK_ANNOTATIONS_KEY: list(map(
-                lambda annotation: annotation.to_dict(), self.annotations
-            )),
+            TASK_ANNOTATIONS_KEY: [
+                annotation.to_dict() for annotation in self.annotations
+            ],
             TASK_TAGS_KEY: self.tags,
             TASK_METADATA_KEY: self.metadata,
             TASK_EXTERNAL_DATA_KEY: self.external_data,
@@ -478,9 +725,66 @@ class GeospatialTask(Task):
             GEOTASK_BOUNDS_SW_KEY: self.bounds_sw,
         }
 
+    def _field_payload(self, name: str) -> Tuple[str, Any]:
+        if name in ['zoom_min', 'zoom_max']:
+            return GEOTASK_ZOOM_KEY, self.get_zoom()
+        if name.startswith('bounds_'):
+            return GEOTASK_BOUNDS_KEY, self.get_bounds()
+        return super()._field_payload(name)
+
     def to_json(self) -> str:
-        """Serializes annotation object to schematized JSON string."""
-        return json.dumps(self.to_dict(), allow_nan=False)
+        """Serializes task object to schematized JSON string."""
+        return self.to_bytes().decode("utf-8")
 
     def __str__(self) -> str:
         return f"GeospatialTask(id={self.id})"
+
+
+class PartialTask:
+    """Lightweight task holding only the fields requested with the
+    ``fields`` option of the task fetch methods. Reading a field that was
+    not fetched raises an AttributeError. Nested values such as
+    annotations and media specs are kept as plain dicts.
+    """
+
+    __slots__ = ('_payload',)
+
+    NESTED_PARAMS = [TASK_ATTACHMENT_KEY, TASK_ATTACHMENT_TYPE_KEY]
+
+    def __init__(self, payload: Dict) -> None:
+        self._payload = payload
+
+    @classmethod
+    def from_json(
+        cls,
+        payload: Union[dict, List[dict]],
+        many=False
+    ) -> Union['PartialTask', List['PartialTask']]:
+        if many:
+            return [cls(p) for p in payload]
+        return cls(payload)
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self._payload)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        payload = self._payload
+        if name in self.NESTED_PARAMS:
+            payload = payload.get(TASK_PARAMS_KEY, {})
+
+        if name not in payload:
+            raise AttributeError(
+                f"Field '{name}' was not fetched for this task, "
+                "add it to fields to read it"
+            )
+        return payload[name]
+
+    def to_dict(self) -> Dict:
+        return dict(self._payload)
+
+    def __str__(self) -> str:
+        return f"PartialTask(id={self._payload.get(TASK_ID_KEY)})"
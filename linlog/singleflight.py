@@ -0,0 +1,80 @@
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapses concurrent calls sharing a key into a single execution.
+
+    The first caller for a key (the leader) runs the function; callers
+    arriving while it is in flight block until it finishes and receive a
+    copy of its result, or a copy of its exception chained to the
+    leader's. When a result is shared every caller gets its own copy, so
+    callers may mutate it freely. Nothing is cached once the call
+    completes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise _copy_error(call.error) from call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                shared = call.waiters > 0
+            call.done.set()
+
+        return copy.deepcopy(call.result) if shared else call.result
+
+    def forget(self) -> None:
+        """Stops new callers from joining the calls in flight, which
+        still complete for the callers already waiting on them."""
+        with self._lock:
+            self._calls.clear()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+def _copy_error(error: BaseException) -> BaseException:
+    """Copy of ``error`` with its traceback, raised in a waiter so that
+    waiters don't share and extend a single exception instance.
+    Exceptions that can't be copied are re-raised as they are."""
+    try:
+        copied = copy.copy(error)
+    except Exception:
+        return error
+    if type(copied) is not type(error):
+        return error
+    return copied.with_traceback(error.__traceback__)
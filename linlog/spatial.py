@@ -0,0 +1,312 @@
+import heapq
+import math
+import numpy as np
+from os import PathLike
+from typing import Dict, Iterable, List, Optional, Sequence
+from linlog.constants import AnnotationType, TaskType
+from linlog.helpers import annotation_to_box, annotation_to_polygon
+from linlog.schemas.annotation import Annotation
+from linlog.schemas.task import GeospatialTask, Task
+
+try:
+    import shapely
+except ImportError:  # pragma: no cover - optional dependency
+    shapely = None
+
+
+DEFAULT_NODE_CAPACITY = 16
+
+
+class SpatialIndex:
+    """Static R-tree over ``[x1, y1, x2, y2]`` boxes, bulk loaded with
+    Sort-Tile-Recursive packing.
+
+    Every level of the tree is a flat NumPy array of node boxes. Because
+    the packing keeps siblings contiguous, the children of node ``i`` are
+    nodes ``i * capacity`` to ``(i + 1) * capacity - 1`` of the level
+    below, and window queries walk the tree one level at a time with
+    vectorized box tests.
+
+    ``ids`` are returned by the queries, they default to the positions of
+    the boxes.
+    """
+
+    def __init__(
+        self,
+        boxes: np.ndarray,
+        ids: Optional[Sequence] = None,
+        node_capacity: int = DEFAULT_NODE_CAPACITY
+    ) -> None:
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if ids is not None and len(ids) != len(boxes):
+            raise ValueError("ids must have one entry per box")
+        if node_capacity < 2:
+            raise ValueError("node_capacity must be at least 2")
+
+        self.node_capacity = node_capacity
+        self.ids = np.asarray(
+            ids if ids is not None else np.arange(len(boxes))
+        )
+        self.boxes = boxes
+        self.order = _str_order(boxes, node_capacity)
+        self.levels: List[np.ndarray] = [boxes[self.order]]
+
+        while len(self.levels[-1]) > node_capacity:
+            level = self.levels[-1]
+            starts = np.arange(0, len(level), node_capacity)
+            self.levels.append(np.concatenate([
+                np.minimum.reduceat(level[:, :2], starts),
+                np.maximum.reduceat(level[:, 2:], starts)
+            ], axis=1))
+
+    @classmethod
+    def _from_arrays(cls, boxes, ids, order, levels, node_capacity):
+        index = cls.__new__(cls)
+        index.boxes = boxes
+        index.ids = ids
+        index.order = order
+        index.levels = levels
+        index.node_capacity = node_capacity
+        return index
+
+    def query_indices(self, box: Sequence[float]) -> np.ndarray:
+        """Positions of the boxes intersecting the ``[x1, y1, x2, y2]``
+        window."""
+        if len(self.boxes) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        x1, y1, x2, y2 = box
+        capacity = self.node_capacity
+        nodes = np.arange(len(self.levels[-1]))
+
+        for depth in range(len(self.levels) - 1, -1, -1):
+            level = self.levels[depth]
+            node_boxes = level[nodes]
+            hit = (node_boxes[:, 0] <= x2) & (node_boxes[:, 2] >= x1) & \
+                (node_boxes[:, 1] <= y2) & (node_boxes[:, 3] >= y1)
+            nodes = nodes[hit]
+
+            if depth == 0 or nodes.size == 0:
+                break
+
+            children = (
+                nodes[:, None] * capacity + np.arange(capacity)
+            ).ravel()
+            nodes = children[children < len(self.levels[depth - 1])]
+
+        return np.sort(self.order[nodes])
+
+    def query(self, box: Sequence[float]) -> List:
+        """IDs of the boxes intersecting the ``[x1, y1, x2, y2]`` window."""
+        return self.ids[self.query_indices(box)].tolist()
+
+    def nearest_indices(self, x: float, y: float, k: int = 1) -> List[int]:
+        """Positions of the ``k`` boxes closest to a point, closest first.
+        Points inside a box are at distance 0."""
+        if len(self.boxes) == 0 or k <= 0:
+            return []
+
+        capacity = self.node_capacity
+        top = len(self.levels) - 1
+        heap = [
+            (_box_distance(self.levels[top][node], x, y), top, int(node))
+            for node in range(len(self.levels[top]))
+        ]
+        heapq.heapify(heap)
+
+        results = []
+        while heap and len(results) < k:
+            _, depth, node = heapq.heappop(heap)
+            if depth == 0:
+                results.append(int(self.order[node]))
+                continue
+
+            below = self.levels[depth - 1]
+            start = node * capacity
+            stop = min(start + capacity, len(below))
+            distances = _box_distances(below[start:stop], x, y)
+            for offset, distance in enumerate(distances):
+                heapq.heappush(
+                    heap, (float(distance), depth - 1, start + offset)
+                )
+
+        return results
+
+    def nearest(self, x: float, y: float, k: int = 1) -> List:
+        """IDs of the ``k`` boxes closest to a point, closest first."""
+        return self.ids[self.nearest_indices(x, y, k)].tolist()
+
+    def save(self, path: PathLike) -> None:
+        """Writes the index to a ``.npz`` file."""
+        np.savez(
+            path,
+            boxes=self.boxes,
+            ids=self.ids,
+            order=self.order,
+            node_capacity=self.node_capacity,
+            **{f"level_{i}": level for i, level in enumerate(self.levels)}
+        )
+
+    @classmethod
+    def load(cls, path: PathLike) -> 'SpatialIndex':
+        with np.load(path, allow_pickle=False) as data:
+            levels = []
+            while f"level_{len(levels)}" in data:
+                levels.append(data[f"level_{len(levels)}"])
+
+            return cls._from_arrays(
+                boxes=data["boxes"],
+                ids=data["ids"],
+                order=data["order"],
+                levels=levels,
+                node_capacity=int(data["node_capacity"])
+            )
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+
+def _str_order(boxes: np.ndarray, capacity: int) -> np.ndarray:
+    """Sort-Tile-Recursive ordering: boxes are sorted into vertical slices
+    by x center, and each slice by y center."""
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    leaves = math.ceil(len(boxes) / capacity)
+    slice_size = math.ceil(math.sqrt(leaves)) * capacity
+
+    center_x = boxes[:, 0] + boxes[:, 2]
+    center_y = boxes[:, 1] + boxes[:, 3]
+
+    by_x = np.argsort(center_x, kind="stable")
+    return np.concatenate([
+        chunk[np.argsort(center_y[chunk], kind="stable")]
+        for chunk in np.split(
+            by_x, np.arange(slice_size, len(boxes), slice_size)
+        )
+    ])
+
+
+def _box_distances(boxes: np.ndarray, x: float, y: float) -> np.ndarray:
+    dx = np.maximum(np.maximum(boxes[:, 0] - x, 0), x - boxes[:, 2])
+    dy = np.maximum(np.maximum(boxes[:, 1] - y, 0), y - boxes[:, 3])
+    return np.hypot(dx, dy)
+
+
+def _box_distance(box: np.ndarray, x: float, y: float) -> float:
+    return float(_box_distances(box[None, :], x, y)[0])
+
+
+def index_task_annotations(
+    task: Task,
+    node_capacity: int = DEFAULT_NODE_CAPACITY
+) -> SpatialIndex:
+    """Indexes the bounding boxes and polygons of a task by annotation
+    ID, in image coordinates."""
+    annotations = [
+        annotation for annotation in task.annotations
+        if annotation.annotation_type in [
+            AnnotationType.BoundingBox, AnnotationType.Polygon
+        ]
+    ]
+    return SpatialIndex(
+        np.array([annotation_to_box(a) for a in annotations]),
+        ids=[a.id for a in annotations],
+        node_capacity=node_capacity
+    )
+
+
+def index_dataset_annotations(
+    dataset,
+    node_capacity: int = DEFAULT_NODE_CAPACITY
+) -> Dict[str, SpatialIndex]:
+    """One annotation index per task (image coordinates are not shared
+    between tasks), keyed by task ID.
+
+    :param dataset: LocalDataset, RemoteDataset or an iterable of tasks
+    """
+    return {
+        str(task.id): index_task_annotations(task, node_capacity)
+        for task in getattr(dataset, "tasks", dataset)
+    }
+
+
+def geospatial_task_box(task: GeospatialTask) -> np.ndarray:
+    """``[min_lng, min_lat, max_lng, max_lat]`` extent of a geospatial
+    task's bounds."""
+    corners = [
+        corner for corner in (
+            task.bounds_nw, task.bounds_ne, task.bounds_se, task.bounds_sw
+        ) if corner
+    ]
+    if not corners:
+        raise ValueError(f"Task {task.id} has no bounds")
+
+    lngs = [corner["lng"] for corner in corners]
+    lats = [corner["lat"] for corner in corners]
+    return np.array([min(lngs), min(lats), max(lngs), max(lats)])
+
+
+def index_geospatial_tasks(
+    dataset,
+    node_capacity: int = DEFAULT_NODE_CAPACITY
+) -> SpatialIndex:
+    """Indexes geospatial tasks by their bounds in lng/lat (x/y) order,
+    keyed by task ID. Distances used by nearest queries are planar, in
+    degrees.
+
+    :param dataset: LocalDataset, RemoteDataset or an iterable of tasks
+    """
+    tasks = [
+        task for task in getattr(dataset, "tasks", dataset)
+        if task.task_type == TaskType.Geospatial
+    ]
+    return SpatialIndex(
+        np.array([geospatial_task_box(task) for task in tasks]),
+        ids=[str(task.id) for task in tasks],
+        node_capacity=node_capacity
+    )
+
+
+def overlapping_annotations(
+    index: SpatialIndex,
+    task: Task,
+    annotation: Annotation,
+    exact: bool = True
+) -> List[Annotation]:
+    """Annotations of ``task`` overlapping ``annotation`` (itself
+    excluded), using an index built by :func:`index_task_annotations`.
+
+    Candidates from the index are refined with their actual shapes when
+    ``exact`` is set and shapely is installed, otherwise bounding boxes
+    are compared.
+    """
+    by_id = {a.id: a for a in task.annotations}
+    candidates = [
+        by_id[annotation_id]
+        for annotation_id in index.query(annotation_to_box(annotation))
+        if annotation_id != annotation.id and annotation_id in by_id
+    ]
+
+    if not exact or shapely is None or not candidates:
+        return candidates
+
+    shape = shapely.Polygon(annotation_to_polygon(annotation))
+    others = np.array(
+        [shapely.Polygon(annotation_to_polygon(a)) for a in candidates],
+        dtype=object
+    )
+    return [
+        candidate for candidate, hit in
+        zip(candidates, shapely.intersects(shape, others)) if hit
+    ]
+
+
+def tasks_in_region(
+    index: SpatialIndex,
+    tasks: Iterable[Task],
+    box: Sequence[float]
+) -> List[Task]:
+    """Tasks whose ID the index returns for the ``box`` window."""
+    ids = set(index.query(box))
+    return [task for task in tasks if str(task.id) in ids]
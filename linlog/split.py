@@ -0,0 +1,91 @@
+import hashlib
+import math
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+from linlog.schemas.task import Task
+
+DEFAULT_SPLITS = {"train": .7, "val": .2, "test": .1}
+
+
+def hash_fraction(key: str, seed: int = 0) -> float:
+    """Stable pseudo random number in ``[0, 1)`` derived from ``key``,
+    identical across processes, machines and Python versions."""
+    digest = hashlib.blake2b(
+        f"{seed}:{key}".encode("utf-8"), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+def primary_label(task: Task) -> str:
+    """Most frequent annotation label of a task, ``""`` without
+    annotations."""
+    counts = Counter(annotation.label for annotation in task.annotations)
+    return counts.most_common(1)[0][0] if counts else ""
+
+
+class Splitter:
+    """Assigns tasks to named splits, e.g. train/val/test, one task at a
+    time so that a dataset can be split in a single streaming pass.
+
+    By default a task's split only depends on its id and ``seed``: the id
+    is hashed into ``[0, 1)`` and compared with the cumulative ratios. A
+    task never moves when tasks are added or removed and no list has to
+    be held or shuffled, the split sizes converge to the ratios as the
+    dataset grows. Changing the ratios, their order or the seed moves
+    tasks.
+
+    With ``stratify`` every primary label (see :func:`primary_label`)
+    gets its own counters and each task goes to the split furthest below
+    its ratio for that label, which keeps rare labels in every split.
+    Stratified assignments depend on the order the tasks are seen in.
+
+    .. code-block:: python
+
+        splitter = Splitter({"train": .8, "val": .2}, seed=1)
+        splitter.assign(task)  # "train"
+    """
+
+    def __init__(
+        self,
+        ratios: Optional[Dict[str, float]] = None,
+        seed: int = 0,
+        stratify: bool = False,
+        key: Callable[[Task], str] = primary_label
+    ) -> None:
+        self.ratios = dict(ratios or DEFAULT_SPLITS)
+        if not self.ratios or any(r < 0 for r in self.ratios.values()):
+            raise Exception("Split ratios must not be negative")
+        if not math.isclose(math.fsum(self.ratios.values()), 1.0):
+            raise Exception("Sum of split ratios must be equal to 1")
+
+        self.seed = seed
+        self.stratify = stratify
+        self.key = key
+        self._counts: Dict[str, Counter] = defaultdict(Counter)
+
+    def assign_id(self, task_id: str) -> str:
+        fraction = hash_fraction(task_id, self.seed)
+        cumulative = 0.0
+        for name, ratio in self.ratios.items():
+            cumulative += ratio
+            if fraction < cumulative:
+                return name
+        return name
+
+    def assign(self, task: Task) -> str:
+        if not self.stratify:
+            return self.assign_id(task.id)
+
+        counts = self._counts[self.key(task)]
+        total = sum(counts.values()) + 1
+        name = max(
+            self.ratios,
+            key=lambda split: self.ratios[split] * total - counts[split]
+        )
+        counts[name] += 1
+        return name
+
+    def split(self, tasks: Iterable[Task]) -> Iterator[Tuple[str, Task]]:
+        """Lazily pairs every task with its split."""
+        for task in tasks:
+            yield self.assign(task), task
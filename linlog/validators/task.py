@@ -63,7 +63,7 @@ def validate_task_payload(
             f"Task attachment types must be strings, got {invalid_type}"
         )
 
-    if type(task.get(TASK_TAGS_KEY, [])) is not list:
+    if not isinstance(task.get(TASK_TAGS_KEY, []), list):
         errors.append(
             f"Task tags must be a list, got {type(task.get(TASK_TAGS_KEY))}"
         )
@@ -20,6 +20,10 @@ setuptools.setup(
         "colored==1.4.3",
         "rich==13.5.2"
     ],
+    extras_require={
+        "fast": ["orjson>=3.9", "ijson>=3.1"],
+        "bench": ["pytest>=7", "pytest-benchmark>=4"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,91 @@
+import json
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+@dataclass
+class Request:
+
+    method: str
+    path: str
+    query: Dict[str, List[str]]
+    headers: Dict[str, str]
+    body: bytes
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+# (status, body, headers), a body that isn't bytes is sent as JSON
+Response = Tuple[int, Any, Optional[Dict[str, str]]]
+
+
+class LocalServer:
+    """HTTP server on a free local port for tests, answering every
+    request with ``handler(request)`` and recording the requests."""
+
+    def __init__(self, handler: Callable[[Request], Response]) -> None:
+        self.handler = handler
+        self.requests: List[Request] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _route(self) -> None:
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length", 0))
+                request = Request(
+                    method=self.command,
+                    path=url.path.strip("/"),
+                    query=parse_qs(url.query),
+                    headers=dict(self.headers),
+                    body=self.rfile.read(length) if length else b""
+                )
+                with server._lock:
+                    server.requests.append(request)
+
+                status, body, headers = server.handler(request)
+                if body is None:
+                    body = b""
+                elif not isinstance(body, bytes):
+                    body = json.dumps(body).encode("utf-8")
+
+                self.send_response(status)
+                headers = {"Content-Type": "application/json",
+                           **(headers or {})}
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _route
+
+        return Handler
+
+    def __enter__(self) -> 'LocalServer':
+        threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        ).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,33 @@
+import unittest
+from linlog.schemas import Annotation, PolygonAnnotation
+
+
+POLYGON = {
+    "id": "polygon-1",
+    "annotation_type": "polygon",
+    "label": "car",
+    "segments": [{
+        "path": [{"x": 0, "y": 0}, {"x": 4, "y": 0}, {"x": 4, "y": 2.5}],
+        "subtraction": [{"x": 1, "y": 1}]
+    }]
+}
+
+
+class TestAnnotation(unittest.TestCase):
+
+    def test_polygon_from_json(self):
+        annotation = Annotation.from_json(POLYGON)
+        self.assertIsInstance(annotation, PolygonAnnotation)
+        segment = annotation.segments[0]
+        self.assertEqual([(v.x, v.y) for v in segment.path],
+                         [(0, 0), (4, 0), (4, 2.5)])
+        self.assertEqual([(v.x, v.y) for v in segment.subtraction],
+                         [(1, 1)])
+
+    def test_polygons_from_json_many(self):
+        annotations = Annotation.from_json([POLYGON], many=True)
+        self.assertIsInstance(annotations[0], PolygonAnnotation)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import random
+import threading
+import time
+import unittest
+from linlog import LinLogClient
+from linlog.bulk import BulkItemResult, BulkReport, chunked, run_bulk
+from tests.server import LocalServer
+
+
+class TestChunked(unittest.TestCase):
+
+    def test_chunks(self):
+        self.assertEqual(
+            list(chunked(range(7), 3)), [[0, 1, 2], [3, 4, 5], [6]]
+        )
+        self.assertEqual(list(chunked([], 3)), [])
+
+    def test_chunks_lazily(self):
+        consumed = []
+
+        def items():
+            for idx in range(10):
+                consumed.append(idx)
+                yield idx
+
+        chunks = chunked(items(), 4)
+        self.assertEqual(next(chunks), [0, 1, 2, 3])
+        self.assertEqual(consumed, [0, 1, 2, 3])
+
+
+class TestRunBulk(unittest.TestCase):
+
+    def test_results_keep_input_order(self):
+        def fn(batch):
+            time.sleep(random.uniform(0, 0.01))
+            return [item * 2 for _, item in batch]
+
+        batches = chunked(((f"item-{i}", i) for i in range(50)), 4)
+        report = run_bulk(fn, batches, max_workers=4)
+
+        self.assertEqual(len(report), 50)
+        self.assertEqual(report.succeeded, [f"item-{i}" for i in range(50)])
+        self.assertEqual(report.failed, [])
+        # Every item of a batch shares the batch response
+        self.assertEqual(report.results[5].response, [8, 10, 12, 14])
+        report.raise_for_errors()
+
+    def test_failed_batch_fails_all_of_its_items(self):
+        error = ValueError("rejected")
+
+        def fn(batch):
+            if any(item_id == "item-5" for item_id, _ in batch):
+                raise error
+            return "ok"
+
+        batches = chunked(((f"item-{i}", i) for i in range(10)), 3)
+        report = run_bulk(fn, batches, max_workers=2)
+
+        self.assertEqual(
+            [result.id for result in report.failed],
+            ["item-3", "item-4", "item-5"]
+        )
+        self.assertTrue(all(r.error is error for r in report.failed))
+        self.assertEqual(len(report.succeeded), 7)
+        with self.assertRaisesRegex(
+            Exception, r"3 of 10 items failed, first error \(item-3\)"
+        ):
+            report.raise_for_errors()
+
+    def test_batches_are_queued_lazily(self):
+        release = threading.Event()
+        produced = []
+
+        def batches():
+            for idx in range(20):
+                produced.append(idx)
+                yield [(str(idx), idx)]
+
+        def fn(batch):
+            release.wait(5)
+
+        thread = threading.Thread(
+            target=run_bulk, args=(fn, batches()), kwargs={"max_workers": 2}
+        )
+        thread.start()
+        time.sleep(0.1)
+        # At most 2 * max_workers batches are queued
+        self.assertEqual(len(produced), 4)
+        release.set()
+        thread.join(5)
+        self.assertEqual(len(produced), 20)
+
+    def test_empty_input(self):
+        self.assertEqual(len(run_bulk(lambda batch: None, [])), 0)
+
+
+class TestBulkReport(unittest.TestCase):
+
+    def test_summary(self):
+        report = BulkReport([
+            BulkItemResult(id="a", success=True, response=1),
+            BulkItemResult(id="b", success=False, error=KeyError("b")),
+        ])
+        self.assertEqual(report.succeeded, ["a"])
+        self.assertEqual([r.id for r in report.failed], ["b"])
+
+
+class TestClientBulk(unittest.TestCase):
+
+    def test_bulk_delete_tasks_is_chunked(self):
+        def handler(request):
+            if "task-7" in request.json()["task_ids"]:
+                return 400, {"detail": "task-7 is locked"}, None
+            return 200, {}, None
+
+        with LocalServer(handler) as server:
+            client = LinLogClient.init_from_token("token", server.url)
+            report = client.bulk_delete_tasks(
+                (f"task-{i}" for i in range(10)), chunk_size=4
+            )
+
+        self.assertEqual(
+            sorted(len(r.json()["task_ids"]) for r in server.requests),
+            [2, 4, 4]
+        )
+        self.assertEqual(
+            [r.id for r in report.failed],
+            ["task-4", "task-5", "task-6", "task-7"]
+        )
+        self.assertIn("task-7 is locked", str(report.failed[0].error))
+
+    def test_bulk_update_tasks_reports_each_task(self):
+        def handler(request):
+            if request.path.endswith("task-1"):
+                return 404, {"detail": "Not found"}, None
+            return 200, {"id": request.path.rsplit("/", 1)[-1]}, None
+
+        with LocalServer(handler) as server:
+            client = LinLogClient.init_from_token("token", server.url)
+            report = client.bulk_update_tasks({
+                "task-0": {"complete": True},
+                "task-1": {"complete": True},
+                "task-2": {"complete": False},
+            })
+
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(report.succeeded, ["task-0", "task-2"])
+        self.assertEqual(report.results[2].response, {"id": "task-2"})
+        self.assertEqual([r.id for r in report.failed], ["task-1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from linlog import LinLogClient
+from linlog.cache import MetadataCache
+from linlog.dataset.base_dataset import BaseDataset
+from linlog.dataset.remote_dataset import RemoteDataset
+from linlog.schemas.task import Task
+from tests.server import LocalServer
+
+PROJECT = {"id": "project-1", "objects_to_annotate": [{"label": "car"}]}
+
+DATASET = {
+    "id": "dataset-1",
+    "name": "cars",
+    "type": "image",
+    "labels": [
+        {"label": "truck", "type": "bounding-box"},
+        {"label": "car", "type": "bounding-box"},
+    ]
+}
+
+
+def project_handler(request):
+    if request.method == "PATCH":
+        PROJECT["title"] = request.json().get("title")
+        return 200, PROJECT, None
+
+    etag = f'"{PROJECT.get("title")}"'
+    if request.headers.get("If-None-Match") == etag:
+        return 304, None, {"ETag": etag}
+    return 200, PROJECT, {"ETag": etag}
+
+
+class TestMetadataCache(unittest.TestCase):
+
+    def test_entries_expire(self):
+        cache = MetadataCache(ttl=10)
+        with mock.patch("linlog.cache.time.monotonic", return_value=0):
+            cache.set("projects/1", {"id": "1"})
+            self.assertTrue(cache.get("projects/1").is_fresh)
+        with mock.patch("linlog.cache.time.monotonic", return_value=11):
+            self.assertFalse(cache.get("projects/1").is_fresh)
+
+    def test_values_are_copied(self):
+        cache = MetadataCache()
+        cache.set("projects/1", {"labels": []})
+        cache.value(cache.get("projects/1"))["labels"].append("car")
+        self.assertEqual(cache.value(cache.get("projects/1")), {"labels": []})
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = MetadataCache(max_entries=2)
+        cache.set("projects/1", 1)
+        cache.set("projects/2", 2)
+        cache.get("projects/1")
+        cache.set("projects/3", 3)
+        self.assertIsNone(cache.get("projects/2"))
+        self.assertIsNotNone(cache.get("projects/1"))
+        self.assertEqual(len(cache), 2)
+
+    def test_invalidate_prefix(self):
+        cache = MetadataCache()
+        for key in ["projects/1", "projects/1/workflows", "projects/10"]:
+            cache.set(key, {})
+        cache.invalidate("projects/1")
+        self.assertIsNone(cache.get("projects/1/workflows"))
+        self.assertIsNotNone(cache.get("projects/10"))
+
+
+class TestClientCache(unittest.TestCase):
+
+    def setUp(self):
+        PROJECT.pop("title", None)
+
+    def test_disabled_by_default(self):
+        with LocalServer(project_handler) as server:
+            client = LinLogClient.init_from_token("token", server.url)
+            client.get_project("project-1")
+            client.get_project("project-1")
+            self.assertIsNone(client.cache)
+            self.assertEqual(len(server.requests), 2)
+
+    def test_fresh_entries_are_served_locally(self):
+        with LocalServer(project_handler) as server:
+            client = LinLogClient.init_from_token(
+                "token", server.url, cache_ttl=60
+            )
+            self.assertEqual(
+                client.get_project_labels("project-1"), [{"label": "car"}]
+            )
+            client.get_project("project-1")
+            self.assertEqual(len(server.requests), 1)
+
+    def test_expired_entries_are_revalidated(self):
+        with LocalServer(project_handler) as server:
+            client = LinLogClient.init_from_token(
+                "token", server.url, cache_ttl=0
+            )
+            first = client.get_project("project-1")
+            second = client.get_project("project-1")
+            self.assertEqual(first, second)
+            self.assertEqual(
+                server.requests[1].headers.get("If-None-Match"), '"None"'
+            )
+
+    def test_updates_invalidate_the_project(self):
+        with LocalServer(project_handler) as server:
+            client = LinLogClient.init_from_token(
+                "token", server.url, cache_ttl=60
+            )
+            client.get_project("project-1")
+            client.update_project("project-1", {"title": "renamed"})
+            self.assertEqual(
+                client.get_project("project-1")["title"], "renamed"
+            )
+            self.assertEqual(len(server.requests), 3)
+
+
+class TestDatasetLabels(unittest.TestCase):
+
+    def dataset(self, server, **options) -> RemoteDataset:
+        client = LinLogClient.init_from_token("token", server.url, **options)
+        return RemoteDataset(client, "dataset-1")
+
+    def test_labels_are_not_fetched_without_a_cache(self):
+        with LocalServer(lambda request: (200, DATASET, None)) as server:
+            dataset = self.dataset(server)
+            for _ in range(5):
+                self.assertEqual(dataset.labels, DATASET["labels"])
+                self.assertEqual(list(dataset.label_index()), [
+                    "truck", "car"
+                ])
+        self.assertEqual(len(server.requests), 1)
+
+    def test_labels_are_read_through_the_cache(self):
+        with LocalServer(lambda request: (200, DATASET, None)) as server:
+            dataset = self.dataset(server, cache_ttl=60)
+            for _ in range(5):
+                self.assertEqual(dataset.labels, DATASET["labels"])
+            self.assertEqual(len(server.requests), 1)
+
+            dataset.client.invalidate_cache("datasets/dataset-1")
+            dataset.label_index()
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual(server.requests[1].path, "datasets/dataset-1")
+
+    def test_label_mapping(self):
+        with LocalServer(lambda request: (200, DATASET, None)) as server:
+            dataset = BaseDataset()
+            dataset.id = "dataset-1"
+            dataset.labels = [{"label": "bus"}]
+            dataset.client = LinLogClient.init_from_token(
+                "token", server.url
+            )
+            self.assertEqual(dataset.label_mapping, {"bus": 0})
+            self.assertEqual(server.requests, [])
+
+            dataset.client = LinLogClient.init_from_token(
+                "token", server.url, cache_ttl=60
+            )
+            for _ in range(5):
+                self.assertEqual(
+                    dataset.label_mapping, {"truck": 0, "car": 1}
+                )
+        self.assertEqual(len(server.requests), 1)
+
+    def test_exports_follow_the_taxonomy(self):
+        task = Task.from_json({
+            "id": "task-1",
+            "task_type": "image",
+            "params": {"attachment": "a.jpg", "attachment_type": "image"},
+            "annotations": [{
+                "id": "box-1", "annotation_type": "bounding-box",
+                "label": "car", "left": 0, "top": 0, "width": 1,
+                "height": 1, "rotation": 0
+            }]
+        })
+        with LocalServer(lambda request: (200, DATASET, None)) as server, \
+                tempfile.TemporaryDirectory() as directory:
+            dataset = self.dataset(server)
+            dataset.tasks = [task]
+            dataset.export(directory, formats=["linearlogic"])
+            path, = Path(directory).glob("*.json")
+            with open(path) as f:
+                labels = json.load(f)["labels"]
+
+        self.assertEqual(labels, [
+            {"id": 0, "name": "truck"}, {"id": 1, "name": "car"}
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import json
+import os
+import tempfile
+import unittest
+from linlog.importer import get_importer
+from linlog.schemas import PolygonAnnotation
+
+
+def coco_file(segmentation) -> str:
+    source = {
+        "images": [
+            {"id": "image-1", "file_name": "a.jpg", "width": 10, "height": 10}
+        ],
+        "annotations": [{
+            "id": 1,
+            "image_id": "image-1",
+            "category_id": 1,
+            "segmentation": segmentation,
+            "bbox": [],
+            "iscrowd": 0
+        }],
+        "categories": [{"id": 1, "name": "car"}]
+    }
+    fd, path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(source, f)
+    return path
+
+
+class TestCocoImporter(unittest.TestCase):
+
+    def parse(self, segmentation):
+        path = coco_file(segmentation)
+        self.addCleanup(os.remove, path)
+        tasks = get_importer("coco")(file_paths=[path])
+        polygon = tasks[0].annotations[0]
+        self.assertIsInstance(polygon, PolygonAnnotation)
+        self.assertEqual(polygon.label, "car")
+        return [(v.x, v.y) for v in polygon.segments[0].path]
+
+    def test_nested_polygon(self):
+        self.assertEqual(
+            self.parse([[0, 0, 4, 0, 4, 2.5]]), [(0, 0), (4, 0), (4, 2.5)]
+        )
+
+    def test_flat_polygon(self):
+        self.assertEqual(
+            self.parse([0, 0, 4, 0, 4, 2.5]), [(0, 0), (4, 0), (4, 2.5)]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
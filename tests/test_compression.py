@@ -0,0 +1,180 @@
+import gzip
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from linlog import compression
+from linlog.compression import check_encoding, compress
+from linlog.controller import Controller
+from tests.server import LocalServer
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+PAYLOAD = {"annotations": [{"label": "car", "top": idx}
+                           for idx in range(100)]}
+
+
+def decode(request) -> dict:
+    encoding = request.headers.get("Content-Encoding")
+    body = request.body
+    if encoding == "gzip":
+        body = gzip.decompress(body)
+    elif encoding == "zstd":
+        body = zstandard.ZstdDecompressor().decompress(body)
+    return json.loads(body)
+
+
+def echo_handler(request):
+    return 201, decode(request), None
+
+
+def gzip_rejecting_handler(request):
+    if request.headers.get("Content-Encoding"):
+        return 415, {"detail": "Unsupported media type"}, None
+    return 201, decode(request), None
+
+
+class TestCompression(unittest.TestCase):
+
+    def test_gzip_round_trip(self):
+        body = json.dumps(PAYLOAD).encode("utf-8")
+        self.assertEqual(gzip.decompress(compress(body, "gzip")), body)
+
+    @unittest.skipIf(zstandard is None, "requires zstandard")
+    def test_zstd_round_trip(self):
+        body = json.dumps(PAYLOAD).encode("utf-8")
+        self.assertEqual(
+            zstandard.ZstdDecompressor().decompress(compress(body, "zstd")),
+            body
+        )
+
+    def test_unsupported_encoding(self):
+        with self.assertRaises(ValueError):
+            check_encoding("br")
+
+
+class TestControllerCompression(unittest.TestCase):
+
+    def controller(self, url: str, encoding: str = "gzip",
+                   **options) -> Controller:
+        return Controller(
+            ("token", ""),
+            base_url=url,
+            request_compression=encoding,
+            compression_threshold=0,
+            **options
+        )
+
+    def test_gzip_bodies(self):
+        with LocalServer(echo_handler) as server:
+            controller = self.controller(server.url)
+            self.assertEqual(
+                controller.post_request("tasks", PAYLOAD), PAYLOAD
+            )
+            self.assertEqual(
+                controller.put_request("tasks/1", PAYLOAD), PAYLOAD
+            )
+
+        for request in server.requests:
+            self.assertEqual(request.headers["Content-Encoding"], "gzip")
+            self.assertLess(len(request.body), len(json.dumps(PAYLOAD)))
+
+    @unittest.skipIf(zstandard is None, "requires zstandard")
+    def test_zstd_bodies(self):
+        with LocalServer(echo_handler) as server:
+            controller = self.controller(server.url, "zstd")
+            self.assertEqual(
+                controller.post_request("tasks", PAYLOAD), PAYLOAD
+            )
+        self.assertEqual(
+            server.requests[0].headers["Content-Encoding"], "zstd"
+        )
+
+    def test_small_bodies_are_sent_uncompressed(self):
+        with LocalServer(echo_handler) as server:
+            controller = Controller(
+                ("token", ""), base_url=server.url,
+                request_compression="gzip"
+            )
+            controller.post_request("tasks", {"id": "1"})
+        self.assertNotIn("Content-Encoding", server.requests[0].headers)
+
+    def test_only_listed_endpoints_are_compressed(self):
+        with LocalServer(echo_handler) as server:
+            controller = self.controller(
+                server.url, compressed_endpoints=["tasks/image"]
+            )
+            controller.post_request("tasks/image", PAYLOAD)
+            controller.post_request("datasets/model-run", PAYLOAD)
+        self.assertIn("Content-Encoding", server.requests[0].headers)
+        self.assertNotIn("Content-Encoding", server.requests[1].headers)
+
+    def test_415_falls_back_to_uncompressed_bodies(self):
+        with LocalServer(gzip_rejecting_handler) as server:
+            controller = self.controller(server.url)
+            self.assertEqual(controller.post_request("tasks/1", PAYLOAD),
+                             PAYLOAD)
+            self.assertEqual(controller.post_request("tasks/2", PAYLOAD),
+                             PAYLOAD)
+
+        encodings = [request.headers.get("Content-Encoding")
+                     for request in server.requests]
+        # The endpoint is remembered, later bodies are not compressed
+        self.assertEqual(encodings, ["gzip", None, None])
+
+    def test_large_bodies_are_compressed_off_the_calling_thread(self):
+        threads = []
+
+        def recording_compress(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return compression.compress(*args, **kwargs)
+
+        body = json.dumps(PAYLOAD).encode("utf-8")
+        with LocalServer(echo_handler) as server, mock.patch(
+            "linlog.controller.compress", side_effect=recording_compress
+        ):
+            controller = self.controller(
+                server.url, compression_offload_threshold=len(body)
+            )
+            controller.post_request("tasks", PAYLOAD)
+            controller.post_request("tasks", {"id": "1"})
+            controller.close()
+
+        offloaded, inline = threads
+        self.assertNotEqual(offloaded, threading.current_thread())
+        self.assertTrue(offloaded.name.startswith("linlog-compression"))
+        self.assertEqual(inline, threading.current_thread())
+        self.assertEqual(
+            [request.headers["Content-Encoding"]
+             for request in server.requests], ["gzip", "gzip"]
+        )
+        self.assertEqual(
+            json.loads(gzip.decompress(server.requests[0].body)), PAYLOAD
+        )
+
+    def test_compression_executor(self):
+        executor = ThreadPoolExecutor(thread_name_prefix="custom")
+        self.addCleanup(executor.shutdown)
+        with LocalServer(echo_handler) as server, mock.patch.object(
+            executor, "submit", wraps=executor.submit
+        ) as submit:
+            controller = self.controller(
+                server.url, compression_offload_threshold=0,
+                compression_executor=executor
+            )
+            self.assertEqual(
+                controller.post_request("tasks", PAYLOAD), PAYLOAD
+            )
+            controller.close()
+
+        submit.assert_called_once()
+        # Executors passed in are left running
+        self.assertEqual(executor.submit(sum, [1, 2]).result(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from linlog.controller import Controller
+from linlog.metrics import AFTER_RESPONSE, BEFORE_REQUEST
+from tests.server import LocalServer
+
+
+def ok_handler(request):
+    return 200, {"path": request.path}, None
+
+
+class ControllerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LocalServer(ok_handler)
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__)
+
+        self.controller = Controller(
+            ("token", ""), base_url=self.server.url, coalesce_gets=False
+        )
+        self.addCleanup(self.controller.close)
+
+
+class TestSessions(ControllerTestCase):
+
+    def test_each_thread_has_its_own_session(self):
+        barrier = threading.Barrier(4)
+
+        def sessions(_):
+            # Every thread is alive at the same time, so thread idents
+            # and sessions can not be reused
+            barrier.wait()
+            first = self.controller._session()
+            self.controller.get_request("tasks")
+            barrier.wait()
+            return first, self.controller._session()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(sessions, range(4)))
+
+        for first, second in results:
+            self.assertIs(first, second)
+        self.assertEqual(len({id(first) for first, _ in results}), 4)
+        self.assertEqual(len(self.controller._sessions), 4)
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_session_is_reused_by_the_thread(self):
+        self.controller.get_request("tasks")
+        session = self.controller._session()
+        self.controller.get_request("tasks")
+        self.assertIs(self.controller._session(), session)
+
+    def test_sessions_do_not_replay_cookies(self):
+        def handler(request):
+            return 200, {}, {"Set-Cookie": "sessionid=1; Path=/"}
+
+        with LocalServer(handler) as server:
+            controller = Controller(("token", ""), base_url=server.url)
+            controller.get_request("a")
+            controller.get_request("b")
+            controller.close()
+
+        self.assertNotIn("Cookie", server.requests[1].headers)
+
+
+class TestDefaultHeaders(ControllerTestCase):
+
+    def test_headers_are_immutable(self):
+        with self.assertRaises(TypeError):
+            self.controller.headers["X-Tag"] = "a"
+
+    def test_set_default_headers(self):
+        headers = self.controller.headers
+        self.controller.set_default_headers({"X-Tag": "a"})
+        self.controller.get_request("tasks")
+        self.controller.set_default_headers({"X-Tag": None})
+        self.controller.get_request("tasks")
+
+        first, second = self.server.requests
+        self.assertEqual(first.headers["X-Tag"], "a")
+        self.assertNotIn("X-Tag", second.headers)
+        self.assertEqual(
+            second.headers["Authorization"], "Token token"
+        )
+        # Mappings handed out before are left untouched
+        self.assertNotIn("X-Tag", headers)
+
+    def test_running_requests_keep_their_headers(self):
+        started, release = threading.Event(), threading.Event()
+
+        def hook(event):
+            if event.endpoint == "slow":
+                started.set()
+                release.wait(5)
+
+        self.controller.set_default_headers({"X-Tag": "old"})
+        self.controller.add_hook(BEFORE_REQUEST, hook)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self.controller.get_request, "slow")
+            self.assertTrue(started.wait(5))
+            self.controller.set_default_headers({"X-Tag": "new"})
+            release.set()
+            future.result()
+        self.controller.get_request("fast")
+
+        tags = {
+            request.path: request.headers["X-Tag"]
+            for request in self.server.requests
+        }
+        self.assertEqual(tags, {"slow": "old", "fast": "new"})
+
+    def test_concurrent_updates_are_not_lost(self):
+        def update(idx):
+            self.controller.set_default_headers({f"X-Header-{idx}": "1"})
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(update, range(200)))
+
+        for idx in range(200):
+            self.assertEqual(self.controller.headers[f"X-Header-{idx}"], "1")
+
+
+class TestHooks(ControllerTestCase):
+
+    def test_concurrent_registrations_are_not_lost(self):
+        # The metrics collector registers its own hooks
+        registered = self.controller.hooks[AFTER_RESPONSE]
+        hooks = [lambda event: None for _ in range(200)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(
+                lambda hook: self.controller.add_hook(AFTER_RESPONSE, hook),
+                hooks
+            ))
+
+        self.assertEqual(
+            len(self.controller.hooks[AFTER_RESPONSE]),
+            len(registered) + len(hooks)
+        )
+        for hook in hooks:
+            self.assertIn(hook, self.controller.hooks[AFTER_RESPONSE])
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(
+                lambda hook: self.controller.remove_hook(
+                    AFTER_RESPONSE, hook
+                ),
+                hooks
+            ))
+        self.assertEqual(self.controller.hooks[AFTER_RESPONSE], registered)
+
+    def test_hooks_added_during_a_request_run_from_the_next_one(self):
+        calls = []
+
+        def late_hook(event):
+            calls.append(("late", event.endpoint))
+
+        def hook(event):
+            calls.append(("first", event.endpoint))
+            if event.endpoint == "a":
+                self.controller.add_hook(BEFORE_REQUEST, late_hook)
+                self.controller.remove_hook(BEFORE_REQUEST, hook)
+
+        self.controller.add_hook(BEFORE_REQUEST, hook)
+        self.controller.get_request("a")
+        self.controller.get_request("b")
+
+        self.assertEqual(calls, [("first", "a"), ("late", "b")])
+
+    def test_hooks_run_once_per_request_under_concurrency(self):
+        counts = {}
+        lock = threading.Lock()
+
+        def hook(event):
+            with lock:
+                counts[event.endpoint] = counts.get(event.endpoint, 0) + 1
+
+        def add_and_request(idx):
+            if idx == 10:
+                self.controller.add_hook(AFTER_RESPONSE, lambda event: None)
+            self.controller.get_request(f"tasks/{idx}")
+
+        self.controller.add_hook(AFTER_RESPONSE, hook)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(add_and_request, range(50)))
+
+        self.assertEqual(counts, {f"tasks/{idx}": 1 for idx in range(50)})
+
+    def test_unknown_event(self):
+        with self.assertRaisesRegex(ValueError, "Unknown hook event"):
+            self.controller.add_hook("on_retry", lambda event: None)
+
+
+if __name__ == '__main__':
+    unittest.main()
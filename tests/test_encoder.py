@@ -0,0 +1,87 @@
+import json
+import unittest
+from linlog import encoder
+from linlog.encoder import TaskEncoder
+from linlog.schemas.task import Task
+
+
+def make_task(**fields) -> Task:
+    return Task.from_json({
+        "id": "task-1",
+        "task_type": "image",
+        "params": {"attachment": "a.jpg", "attachment_type": "image"},
+        "media_specs": {"width": 640, "height": 480},
+        "tags": ["night"],
+        "metadata": {"camera": "front", "exposure": 0.25},
+        "annotations": [{
+            "id": "box-1",
+            "annotation_type": "bounding-box",
+            "label": "car",
+            "top": 1,
+            "left": 2.5,
+            "width": 30,
+            "height": 40,
+            "rotation": 0
+        }, {
+            "id": "polygon-1",
+            "annotation_type": "polygon",
+            "label": "person",
+            "segments": [{
+                "path": [
+                    {"x": 0, "y": 0}, {"x": 4, "y": 0}, {"x": 4, "y": 2.5}
+                ],
+                "subtraction": [{"x": 1, "y": 1}]
+            }]
+        }],
+        **fields
+    })
+
+
+class EncoderTestMixin:
+
+    def encode(self, task) -> bytes:
+        raise NotImplementedError
+
+    def assertSameDocument(self, task):
+        self.assertEqual(
+            json.loads(self.encode(task)),
+            json.loads(json.dumps(task.to_dict(), allow_nan=False))
+        )
+
+    def test_same_document_as_to_dict(self):
+        self.assertSameDocument(make_task())
+
+    def test_non_str_keys(self):
+        self.assertSameDocument(
+            make_task(metadata={1: "one", "nested": {2: [3]}})
+        )
+
+    def test_non_finite_floats_raise(self):
+        for value in (float("nan"), float("inf")):
+            with self.assertRaises(ValueError):
+                self.encode(make_task(metadata={"score": value}))
+
+    def test_encode_many(self):
+        tasks = [make_task(), make_task(id="task-2")]
+        self.assertEqual(
+            json.loads(TaskEncoder().encode_many(tasks)),
+            [task.to_dict() for task in tasks]
+        )
+
+
+class TestTaskEncoder(EncoderTestMixin, unittest.TestCase):
+
+    def encode(self, task) -> bytes:
+        return task.to_json().encode("utf-8")
+
+
+class TestStdlibTaskEncoder(EncoderTestMixin, unittest.TestCase):
+
+    def encode(self, task) -> bytes:
+        task_encoder = TaskEncoder()
+        task_encoder._dumps = encoder._stdlib_dumps
+        return task_encoder.encode(task)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+import numpy as np
+from linlog.evaluation import average_precision, evaluate
+from linlog.schemas.task import Task
+
+
+def box(id, left, top, score=None, rotation=0, label="car", size=10):
+    annotation = {
+        "id": id,
+        "annotation_type": "bounding-box",
+        "label": label,
+        "left": left,
+        "top": top,
+        "width": size,
+        "height": size,
+        "rotation": rotation,
+        "is_model_run": score is not None,
+    }
+    if score is not None:
+        annotation["attributes"] = {"score": score}
+    return annotation
+
+
+def make_task(annotations) -> Task:
+    return Task.from_json({
+        "id": "task-1",
+        "task_type": "image",
+        "params": {"attachment": "a.jpg", "attachment_type": "image"},
+        "annotations": annotations
+    })
+
+
+def score(annotation):
+    return annotation.attributes.get("score")
+
+
+class TestAveragePrecision(unittest.TestCase):
+
+    def test_perfect_ranking(self):
+        self.assertEqual(average_precision(
+            np.array([0.9, 0.8]), np.array([True, True]), 2
+        ), 1.0)
+
+    def test_only_false_positives(self):
+        self.assertEqual(average_precision(
+            np.array([0.9, 0.8]), np.array([False, False]), 2
+        ), 0.0)
+
+    def test_half_recall(self):
+        # Precision 1 up to recall 0.5 (51 of 101 points), 0 above
+        self.assertAlmostEqual(average_precision(
+            np.array([0.9]), np.array([True]), 2
+        ), 51 / 101)
+
+    def test_false_positive_in_between(self):
+        # Ranked TP, FP, TP: precision 1 up to recall 0.5, 2/3 up to 1
+        self.assertAlmostEqual(average_precision(
+            np.array([0.7, 0.9, 0.8]), np.array([True, True, False]), 2
+        ), (51 + 50 * 2 / 3) / 101)
+
+
+class TestEvaluate(unittest.TestCase):
+
+    def test_average_precision_of_ranked_predictions(self):
+        task = make_task([
+            box("gt-1", 0, 0),
+            box("gt-2", 100, 100),
+            box("pred-1", 0, 0, score=0.9),
+            box("pred-2", 50, 50, score=0.8),
+            box("pred-3", 100, 100, score=0.7),
+        ])
+        result = evaluate([task], score_fn=score)
+
+        metrics = result.labels["car"]
+        self.assertEqual(metrics.true_positives, 2)
+        self.assertEqual(metrics.false_positives, 1)
+        self.assertEqual(metrics.false_negatives, 0)
+        self.assertAlmostEqual(
+            metrics.average_precision, (51 + 50 * 2 / 3) / 101
+        )
+        self.assertAlmostEqual(
+            result.mean_average_precision, (51 + 50 * 2 / 3) / 101
+        )
+
+    def test_scores_decide_the_ranking(self):
+        # Same boxes as above, but the false positive is ranked first
+        task = make_task([
+            box("gt-1", 0, 0),
+            box("gt-2", 100, 100),
+            box("pred-1", 0, 0, score=0.8),
+            box("pred-2", 50, 50, score=0.9),
+            box("pred-3", 100, 100, score=0.7),
+        ])
+        result = evaluate([task], score_fn=score)
+
+        # Ranked FP, TP, TP: precision 1/2 at recall 0.5 and 2/3 at 1
+        self.assertAlmostEqual(
+            result.labels["car"].average_precision, 2 / 3
+        )
+
+    def test_average_precision_over_iou_thresholds(self):
+        # IoU of the two boxes is 50 / 150
+        task = make_task([
+            box("gt-1", 5, 0),
+            box("pred-1", 0, 0, score=0.9),
+        ])
+        result = evaluate([task], score_fn=score, iou_thresholds=(0.3, 0.5))
+
+        metrics = result.labels["car"]
+        self.assertEqual(metrics.true_positives, 1)
+        self.assertAlmostEqual(metrics.average_precision, 0.5)
+
+    def test_labels_are_matched_separately(self):
+        task = make_task([
+            box("gt-1", 0, 0, label="car"),
+            box("pred-1", 0, 0, score=0.9, label="bus"),
+        ])
+        result = evaluate([task], score_fn=score)
+
+        self.assertEqual(result.labels["car"].false_negatives, 1)
+        self.assertEqual(result.labels["bus"].false_positives, 1)
+        self.assertEqual(result.mean_average_precision, 0.0)
+
+    def test_missing_score_raises(self):
+        task = make_task([box("gt-1", 0, 0), box("pred-1", 0, 0, score=1)])
+        with self.assertRaisesRegex(ValueError, "pred-1 has no score"):
+            evaluate([task], score_fn=lambda annotation: None)
+
+    def test_rotated_boxes_are_rejected(self):
+        task = make_task([
+            box("gt-1", 0, 0, rotation=30),
+            box("pred-1", 0, 0, score=0.9),
+        ])
+        for geometry in ("bbox", "polygon"):
+            with self.assertRaisesRegex(ValueError, "gt-1 is a rotated"):
+                evaluate([task], score_fn=score, geometry=geometry)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,378 @@
+import hashlib
+import json
+import tempfile
+import threading
+import unittest
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import mock
+from linlog.exporter import get_exporter, get_writer
+from linlog.exporter.exporter import MultiWriter, create_writer
+from linlog.exporter.pipeline import run_export_pipeline
+from linlog.media import MediaCache
+from linlog.schemas.task import ImageTask, Task
+from linlog.split import Splitter
+from tests.server import LocalServer
+from tests.test_media import image_handler, make_task as make_image_task
+
+
+def make_task(idx: int, label: str = "car") -> Task:
+    return Task.from_json({
+        "id": f"task-{idx}",
+        "task_type": "image",
+        "params": {"attachment": f"{idx}.jpg", "attachment_type": "image"},
+        "media_specs": {"width": 100, "height": 100},
+        "annotations": [{
+            "id": f"box-{idx}",
+            "annotation_type": "bounding-box",
+            "label": label,
+            "top": 10,
+            "left": 20,
+            "width": 30,
+            "height": 40,
+            "rotation": 0
+        }]
+    })
+
+
+class ExporterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output_path = Path(directory.name)
+
+
+class TestLinearLogicWriter(ExporterTestCase):
+
+    def export(self, tasks):
+        writer = get_writer("linearlogic")(self.output_path)
+        for task in tasks:
+            writer.write(task)
+        with open(writer.close()) as f:
+            return json.load(f)
+
+    def test_items_and_trailer(self):
+        tasks = [make_task(0), make_task(1, "truck")]
+        root = self.export(tasks)
+        self.assertEqual(root["version"], "2.0")
+        self.assertEqual(root["item_count"], 2)
+        self.assertEqual(root["items"], [task.to_dict() for task in tasks])
+        self.assertEqual(
+            [label["name"] for label in root["labels"]], ["car", "truck"]
+        )
+
+    def test_empty_export(self):
+        root = self.export([])
+        self.assertEqual(root["items"], [])
+        self.assertEqual(root["item_count"], 0)
+
+
+class TestExportFunctions(ExporterTestCase):
+
+    def test_coco_export_uses_the_writer(self):
+        tasks = [make_task(0), make_task(1, "truck")]
+        output, path = get_exporter("coco")(tasks, self.output_path)
+
+        with open(path) as f:
+            self.assertEqual(json.load(f), output)
+        self.assertEqual(
+            [image["id"] for image in output["images"]],
+            ["task-0", "task-1"]
+        )
+        self.assertEqual(
+            [a["category_id"] for a in output["annotations"]], [0, 1]
+        )
+        self.assertEqual(output["annotations"][0]["bbox"], [20, 10, 30, 40])
+
+    def test_cvat_export_uses_the_writer(self):
+        tasks = [make_task(0), make_task(1)]
+        tree, path = get_exporter("cvat")(tasks, self.output_path)
+
+        root = ET.parse(path).getroot()
+        self.assertEqual(ET.tostring(root), ET.tostring(tree.getroot()))
+        self.assertEqual(root.find("meta/task/size").text, "2")
+        self.assertEqual(
+            [image.get("name") for image in root.iter("image")],
+            ["0.jpg", "1.jpg"]
+        )
+
+
+class TestShardsWriter(ExporterTestCase):
+
+    def export(self, tasks, **options):
+        writer = get_writer("shards")(
+            self.output_path, shard_size=3, max_workers=2, **options
+        )
+        for task in tasks:
+            writer.write(task)
+        with open(writer.close()) as f:
+            return json.load(f)
+
+    def assert_manifest_matches_files(self, manifest, path, tasks):
+        lines = []
+        for shard in manifest["shards"]:
+            with open(path / shard["file"], "rb") as f:
+                data = f.read()
+            self.assertEqual(shard["bytes"], len(data))
+            self.assertEqual(
+                shard["sha256"], hashlib.sha256(data).hexdigest()
+            )
+            shard_lines = data.splitlines()
+            self.assertEqual(shard["count"], len(shard_lines))
+            lines.extend(shard_lines)
+
+        self.assertEqual(manifest["task_count"], len(tasks))
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            json.loads(json.dumps([task.to_dict() for task in tasks]))
+        )
+
+    def test_manifest_matches_the_written_shards(self):
+        tasks = [make_task(idx, ["car", "bus"][idx % 2]) for idx in range(8)]
+        manifest = self.export(tasks)
+
+        self.assertEqual(
+            [shard["file"] for shard in manifest["shards"]],
+            ["shard-00000.jsonl", "shard-00001.jsonl", "shard-00002.jsonl"]
+        )
+        self.assertEqual(
+            [shard["count"] for shard in manifest["shards"]], [3, 3, 2]
+        )
+        self.assertEqual(
+            [label["name"] for label in manifest["labels"]], ["car", "bus"]
+        )
+        self.assert_manifest_matches_files(manifest, self.output_path, tasks)
+        self.assertEqual(
+            sorted(p.name for p in self.output_path.iterdir()),
+            ["manifest.json"] + [s["file"] for s in manifest["shards"]]
+        )
+
+    def test_empty_export(self):
+        manifest = self.export([])
+        self.assertEqual(manifest["shards"], [])
+        self.assertEqual(manifest["task_count"], 0)
+
+    def test_split_writers_share_one_process_pool(self):
+        splitter = Splitter({"train": .5, "val": .5})
+        writer = create_writer(
+            self.output_path, "shards", splitter=splitter, shard_size=2,
+            max_workers=2
+        )
+        executors = {
+            id(split._executor) for split in writer.writers.values()
+        }
+        self.assertEqual(len(executors), 1)
+        executor = writer.writers["train"]._executor
+
+        tasks = [make_task(idx) for idx in range(10)]
+        for task in tasks:
+            writer.write(task)
+        writer.close()
+
+        with self.assertRaises(RuntimeError):
+            executor.submit(print)
+        for name in ["train", "val"]:
+            with open(self.output_path / name / "manifest.json") as f:
+                manifest = json.load(f)
+            self.assert_manifest_matches_files(
+                manifest, self.output_path / name,
+                [task for task in tasks if splitter.assign(task) == name]
+            )
+
+
+class TestImagesWriter(ExporterTestCase):
+
+    def test_split_writers_share_one_downloader(self):
+        cache = MediaCache(self.output_path / "cache")
+        splitter = Splitter({"train": .5, "val": .5})
+        names = ["a.png", "b.png", "c.png", "small.png", "missing.png"]
+
+        with LocalServer(image_handler) as server:
+            writer = create_writer(
+                self.output_path / "export", formats=["images"],
+                splitter=splitter, cache=cache, max_workers=2
+            )
+            downloaders = {
+                id(split.writers["images"].downloader)
+                for split in writer.writers.values()
+            }
+            self.assertEqual(len(downloaders), 1)
+            downloader = writer.writers["train"].writers["images"].downloader
+            self.assertIs(downloader.cache, cache)
+
+            tasks = [
+                make_image_task(f"{server.url}/{name}") for name in names
+            ]
+            for task in tasks:
+                writer.write(task)
+            writer.close()
+
+        with self.assertRaises(RuntimeError):
+            downloader.submit(tasks[0])
+        # Every split counted its downloads in the same cache
+        self.assertEqual(cache.size, 100 + 110 + 120 + 100)
+
+        exported = []
+        for task in tasks:
+            path = self.output_path / "export" / splitter.assign(task)
+            if (path / "images" / f"{task.id}.png").exists():
+                exported.append(task.id)
+        # small.png is 50x40 instead of 100x100
+        self.assertEqual(exported, ["a.png", "b.png", "c.png"])
+
+    def test_locally_built_tasks(self):
+        cache = MediaCache(self.output_path / "cache")
+        with LocalServer(image_handler) as server:
+            task = ImageTask(
+                attachment=f"{server.url}/a.png", attachment_type="image"
+            )
+            writer = get_writer("images")(
+                self.output_path / "export", cache=cache
+            )
+            writer.write(task)
+            images_path = writer.close()
+
+        self.assertEqual(writer.failed, [])
+        self.assertTrue((images_path / f"{task.id}.png").exists())
+
+
+class TestWriterOptions(ExporterTestCase):
+
+    def test_options_go_to_the_writers_taking_them(self):
+        cache = MediaCache(self.output_path / "cache")
+        writer = MultiWriter(
+            self.output_path, ["linearlogic", "shards", "images"],
+            shard_size=2, max_workers=3, cache=cache
+        )
+        self.addCleanup(writer.close)
+
+        shards, images = writer.writers["shards"], writer.writers["images"]
+        self.assertEqual(shards.shard_size, 2)
+        self.assertEqual(shards.max_workers, 3)
+        self.assertEqual(images.downloader.max_workers, 3)
+        self.assertIs(images.downloader.cache, cache)
+
+    def test_split_writers_get_the_options(self):
+        writer = create_writer(
+            self.output_path, formats=["linearlogic", "shards"],
+            splitter=Splitter({"train": .5, "val": .5}), shard_size=4
+        )
+        self.addCleanup(writer.close)
+        for split in writer.writers.values():
+            self.assertEqual(split.writers["shards"].shard_size, 4)
+
+    def test_single_format_options(self):
+        writer = create_writer(self.output_path, "shards", shard_size=4)
+        self.addCleanup(writer.close)
+        self.assertEqual(writer.shard_size, 4)
+
+    def test_unknown_options_raise(self):
+        with self.assertRaisesRegex(
+            Exception, "Unknown export options: shard_size"
+        ):
+            create_writer(
+                self.output_path, formats=["coco", "yolo"], shard_size=4
+            )
+        with self.assertRaisesRegex(
+            Exception, "Unknown export options: cache, workers"
+        ):
+            create_writer(
+                self.output_path, "shards", cache=None, workers=2
+            )
+        with self.assertRaisesRegex(Exception, "Unknown export options"):
+            create_writer(
+                self.output_path, "coco", splitter=Splitter(), shard_size=4
+            )
+
+
+def make_page(start: int, count: int):
+    return [make_task(idx).to_dict() for idx in range(start, start + count)]
+
+
+class TestExportPipeline(ExporterTestCase):
+
+    def test_pages_are_written_in_order(self):
+        writer = get_writer("linearlogic")(self.output_path)
+        pages = [make_page(0, 3), make_page(3, 2)]
+        events = list(run_export_pipeline(pages, writer))
+
+        self.assertEqual([e.tasks_written for e in events], [3, 5, 5])
+        self.assertTrue(events[-1].done)
+        with open(events[-1].output_path) as f:
+            items = json.load(f)["items"]
+        self.assertEqual(
+            [item["id"] for item in items], [f"task-{i}" for i in range(5)]
+        )
+
+    def test_decode_executor(self):
+        writer = get_writer("linearlogic")(self.output_path)
+        pages = [make_page(start, 2) for start in range(0, 10, 2)]
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            events = list(run_export_pipeline(
+                pages, writer, queue_size=2, decode_executor=executor
+            ))
+
+        with open(events[-1].output_path) as f:
+            items = json.load(f)["items"]
+        self.assertEqual(
+            [item["id"] for item in items], [f"task-{i}" for i in range(10)]
+        )
+
+    def test_writer_is_aborted_when_fetching_fails(self):
+        writer = mock.Mock()
+
+        def pages():
+            yield make_page(0, 2)
+            raise ConnectionError("connection reset")
+
+        with self.assertRaisesRegex(ConnectionError, "connection reset"):
+            list(run_export_pipeline(pages(), writer))
+        self.assertEqual(writer.write.call_count, 2)
+        writer.abort.assert_called_once_with()
+        writer.close.assert_not_called()
+
+    def test_writer_is_aborted_when_the_consumer_stops(self):
+        writer = get_writer("linearlogic")(self.output_path)
+        events = run_export_pipeline(
+            [make_page(0, 2), make_page(2, 2)], writer
+        )
+        next(events)
+        events.close()
+        self.assertTrue(writer._file.closed)
+
+    def test_pages_are_closed_when_the_consumer_stops(self):
+        closed = threading.Event()
+
+        def pages():
+            try:
+                for start in range(0, 100, 2):
+                    yield make_page(start, 2)
+            finally:
+                closed.set()
+
+        # Kept alive, so that only closing it runs its finally block
+        page_iterator = pages()
+        events = run_export_pipeline(
+            page_iterator, get_writer("linearlogic")(self.output_path),
+            queue_size=1
+        )
+        next(events)
+        events.close()
+        self.assertTrue(closed.wait(5))
+
+    def test_shards_are_not_completed_when_aborted(self):
+        writer = get_writer("shards")(self.output_path, shard_size=1)
+
+        def pages():
+            yield make_page(0, 3)
+            raise ConnectionError("connection reset")
+
+        with self.assertRaises(ConnectionError):
+            list(run_export_pipeline(pages(), writer))
+        self.assertFalse((self.output_path / "manifest.json").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
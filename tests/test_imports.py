@@ -0,0 +1,62 @@
+import json
+import subprocess
+import sys
+import unittest
+
+HEAVY_MODULES = [
+    "requests",
+    "numpy",
+    "rich",
+    "colored",
+    "awesome_progress_bar",
+]
+
+# Modules of the client, only loaded once LinLogClient is used
+CLIENT_MODULES = [
+    "linlog.client",
+    "linlog.controller",
+]
+
+
+def run_python(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout
+
+
+def loaded_modules(statement: str):
+    return json.loads(run_python(
+        f"import sys\n{statement}\n"
+        f"print(__import__('json').dumps(sorted(sys.modules)))"
+    ))
+
+
+class TestImports(unittest.TestCase):
+
+    def assert_lightweight(self, statement: str):
+        modules = loaded_modules(statement)
+        for name in HEAVY_MODULES:
+            self.assertNotIn(name, modules, f"'{statement}' loads {name}")
+
+    def test_import_linlog_is_lightweight(self):
+        self.assert_lightweight("import linlog")
+
+    def test_import_cli_is_lightweight(self):
+        self.assert_lightweight("import linlog.cli")
+
+    def test_import_schemas_is_lightweight(self):
+        self.assert_lightweight(
+            "from linlog.schemas import Task, Dataset, Project"
+        )
+
+    def test_client_is_loaded_on_first_use(self):
+        modules = loaded_modules("import linlog.cli")
+        for name in CLIENT_MODULES:
+            self.assertNotIn(name, modules)
+
+        modules = loaded_modules("import linlog\nlinlog.LinLogClient")
+        for name in CLIENT_MODULES + ["requests"]:
+            self.assertIn(name, modules)
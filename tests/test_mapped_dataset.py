@@ -0,0 +1,157 @@
+import os
+import pickle
+import tempfile
+import unittest
+import numpy as np
+from linlog.dataset import MappedDataset
+from linlog.schemas.task import Task
+
+TASKS = [
+    {
+        "id": "task-1",
+        "task_type": "image",
+        "params": {"attachment": "a.jpg", "attachment_type": "image"},
+        "tags": ["night"],
+        "metadata": {"camera": "front"},
+        "annotations": [
+            {
+                "id": "box-1", "annotation_type": "bounding-box",
+                "label": "car", "top": 1, "left": 2.5, "width": 10,
+                "height": 4.0, "rotation": 0
+            },
+            {
+                "id": "polygon-1", "annotation_type": "polygon",
+                "label": "road",
+                "segments": [{
+                    "path": [
+                        {"x": 0, "y": 0}, {"x": 4, "y": 0.5},
+                        {"x": 4.25, "y": 3}
+                    ],
+                    "subtraction": [{"x": 1, "y": 1}]
+                }]
+            }
+        ]
+    },
+    {
+        "id": "task-2",
+        "task_type": "image",
+        "params": {"attachment": "b.jpg", "attachment_type": "image"},
+        "annotations": []
+    },
+    {
+        "id": "task-3",
+        "task_type": "image",
+        "params": {"attachment": "c.jpg", "attachment_type": "image"},
+        "annotations": [{
+            "id": "box-2", "annotation_type": "bounding-box",
+            "label": "bus", "top": 0.0, "left": 3, "width": 1,
+            "height": 2, "rotation": 0.0
+        }]
+    }
+]
+
+
+def exact(value):
+    """Value with the type of every number, so that 1 != 1.0."""
+    if isinstance(value, dict):
+        return {key: exact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [exact(item) for item in value]
+    return type(value).__name__, value
+
+
+class TestMappedDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "store")
+
+    def build(self, tasks=TASKS, **kwargs):
+        dataset = MappedDataset.build(self.path, tasks, **kwargs)
+        self.addCleanup(dataset.close)
+        return dataset
+
+    def test_payload_round_trip(self):
+        dataset = self.build()
+        self.assertEqual(len(dataset), 3)
+        for index, task in enumerate(TASKS):
+            self.assertEqual(
+                exact(dataset.get_payload(index)), exact(task)
+            )
+
+    def test_task_round_trip(self):
+        tasks = [Task.from_json(task) for task in TASKS]
+        dataset = self.build(tasks)
+        for task, restored in zip(tasks, dataset):
+            self.assertEqual(
+                exact(restored.to_dict()), exact(task.to_dict())
+            )
+
+    def test_boxes(self):
+        dataset = self.build()
+        self.assertEqual(
+            dataset.boxes(0).tolist(), [[1.0, 2.5, 10.0, 4.0, 0.0]]
+        )
+        self.assertEqual(dataset.boxes(1).shape, (0, 5))
+        self.assertEqual(
+            dataset.boxes(-1).tolist(), [[0.0, 3.0, 1.0, 2.0, 0.0]]
+        )
+        with self.assertRaises(IndexError):
+            dataset.boxes(3)
+
+    def test_missing_box_values_round_trip(self):
+        task = {
+            "id": "task-4",
+            "task_type": "image",
+            "params": {"attachment": "d.jpg", "attachment_type": "image"},
+            "annotations": [
+                {
+                    "id": "box-3", "annotation_type": "bounding-box",
+                    "label": "car", "top": None, "left": 1, "width": None,
+                    "height": 2.5, "rotation": None
+                },
+                {
+                    "id": "box-4", "annotation_type": "bounding-box",
+                    "label": "car", "top": 5, "left": 6
+                }
+            ]
+        }
+        dataset = self.build([task])
+
+        self.assertEqual(exact(dataset.get_payload(0)), exact(task))
+        boxes = dataset.boxes(0)
+        np.testing.assert_array_equal(boxes, [
+            [np.nan, 1, np.nan, 2.5, np.nan],
+            [5, 6, np.nan, np.nan, np.nan]
+        ])
+
+    def test_pickling_reopens_the_store(self):
+        dataset = self.build()
+        restored = pickle.loads(pickle.dumps(dataset))
+        self.addCleanup(restored.close)
+        self.assertEqual(
+            exact(restored.get_payload(2)), exact(TASKS[2])
+        )
+
+    def test_empty_store(self):
+        dataset = self.build([])
+        self.assertEqual(len(dataset), 0)
+        self.assertEqual(list(dataset), [])
+
+    def test_refuses_to_overwrite(self):
+        self.build(TASKS[:1]).close()
+        with self.assertRaisesRegex(Exception, "not empty"):
+            MappedDataset.build(self.path, TASKS)
+
+        dataset = self.build(TASKS[1:], overwrite=True)
+        self.assertEqual(len(dataset), 2)
+        self.assertEqual(dataset.get_payload(0)["id"], "task-2")
+
+    def test_builds_into_an_empty_directory(self):
+        os.makedirs(self.path)
+        self.assertEqual(len(self.build()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,216 @@
+import os
+import struct
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from linlog.media import MediaCache, MediaDownloader, sniff_image
+from linlog.schemas.task import ImageTask, Task
+from tests.server import LocalServer
+
+
+def png(width: int, height: int, size: int = 100) -> bytes:
+    header = b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR"
+    header += struct.pack(">II", width, height)
+    return header + b"\x00" * (size - len(header))
+
+
+IMAGES = {
+    "a.png": png(100, 100, size=100),
+    "b.png": png(100, 100, size=110),
+    "c.png": png(100, 100, size=120),
+    "small.png": png(50, 40),
+}
+
+
+def image_handler(request):
+    data = IMAGES.get(request.path)
+    if data is None:
+        return 404, {"detail": "Not found"}, None
+    return 200, data, {"Content-Type": "image/png"}
+
+
+def make_task(url: str, width: int = 100, height: int = 100) -> Task:
+    return Task.from_json({
+        "id": url.rsplit("/", 1)[-1],
+        "task_type": "image",
+        "params": {"attachment": url, "attachment_type": "image"},
+        "media_specs": {"width": width, "height": height},
+        "annotations": []
+    })
+
+
+def objects_size(cache: MediaCache) -> int:
+    return sum(os.path.getsize(path) for path, _ in cache._objects())
+
+
+class MediaTestCase(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_path = Path(directory.name)
+
+        self.server = LocalServer(image_handler)
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__)
+
+    def fetch(self, downloader, name, **specs):
+        task = make_task(f"{self.server.url}/{name}", **specs)
+        return downloader.fetch(task)
+
+
+class TestSniffImage(unittest.TestCase):
+
+    def test_png(self):
+        self.assertEqual(sniff_image(png(50, 40)), ("png", 50, 40))
+
+    def test_unknown_format(self):
+        self.assertIsNone(sniff_image(b"not an image"))
+
+
+class TestMediaCache(MediaTestCase):
+
+    def test_hits_are_not_downloaded_again(self):
+        cache = MediaCache(self.cache_path)
+        with MediaDownloader(cache, max_workers=2) as downloader:
+            first = self.fetch(downloader, "a.png")
+            second = self.fetch(downloader, "a.png")
+
+        self.assertTrue(first.success)
+        self.assertFalse(first.cached)
+        self.assertTrue(second.cached)
+        self.assertEqual(second.media, first.media)
+        self.assertEqual(len(self.server.requests), 1)
+        with open(first.media.path, "rb") as f:
+            self.assertEqual(f.read(), IMAGES["a.png"])
+
+        # A new cache on the same directory sees the stored file
+        self.assertEqual(MediaCache(self.cache_path).size, 100)
+
+    def test_shared_content_is_stored_once(self):
+        cache = MediaCache(self.cache_path)
+        data = IMAGES["a.png"]
+        first = cache.put("http://one/a.png", data)
+        second = cache.put("http://two/a.png", data)
+
+        self.assertEqual(first.path, second.path)
+        self.assertEqual(cache.size, len(data))
+        self.assertEqual(cache.get("http://two/a.png").path, first.path)
+
+    def test_concurrent_puts_count_the_content_once(self):
+        cache = MediaCache(self.cache_path)
+        data = IMAGES["a.png"]
+        barrier = threading.Barrier(8)
+
+        def put(idx):
+            barrier.wait()
+            cache.put(f"http://host/{idx}.png", data)
+
+        threads = [
+            threading.Thread(target=put, args=(idx,)) for idx in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(cache.size, len(data))
+        self.assertEqual(objects_size(cache), len(data))
+
+    def test_least_recently_used_files_are_evicted(self):
+        # Eviction frees space down to 234 bytes
+        cache = MediaCache(self.cache_path, max_bytes=260)
+        with MediaDownloader(cache, max_workers=2) as downloader:
+            a = self.fetch(downloader, "a.png")
+            b = self.fetch(downloader, "b.png")
+            os.utime(a.media.path, (1, 1))
+            os.utime(b.media.path, (2, 2))
+
+            self.fetch(downloader, "c.png")
+            self.assertEqual(cache.size, 230)
+            self.assertEqual(cache.size, objects_size(cache))
+            self.assertFalse(os.path.exists(a.media.path))
+            self.assertIsNone(cache.get(a.url))
+
+            self.assertTrue(self.fetch(downloader, "b.png").cached)
+            refetched = self.fetch(downloader, "a.png")
+
+        self.assertFalse(refetched.cached)
+        self.assertEqual(
+            [request.path for request in self.server.requests],
+            ["a.png", "b.png", "c.png", "a.png"]
+        )
+        self.assertLessEqual(cache.size, 260)
+        self.assertEqual(cache.size, objects_size(cache))
+
+
+class TestMediaDownloader(MediaTestCase):
+
+    def test_size_mismatch_fails_the_task(self):
+        cache = MediaCache(self.cache_path)
+        with MediaDownloader(cache, max_workers=2) as downloader:
+            result = self.fetch(downloader, "small.png")
+
+        self.assertFalse(result.success)
+        self.assertIn("is 50x40, expected 100x100", str(result.error))
+        # The download itself is kept
+        self.assertTrue(cache.get(result.url))
+
+    def test_size_is_not_verified_when_disabled(self):
+        cache = MediaCache(self.cache_path)
+        with MediaDownloader(cache, verify_size=False) as downloader:
+            result = self.fetch(downloader, "small.png")
+
+        self.assertTrue(result.success)
+        self.assertEqual((result.media.width, result.media.height), (50, 40))
+
+    def test_tasks_without_media_specs_are_not_verified(self):
+        task = Task.from_json({
+            "id": "task-1",
+            "task_type": "image",
+            "params": {
+                "attachment": f"{self.server.url}/small.png",
+                "attachment_type": "image"
+            },
+            "annotations": []
+        })
+        with MediaDownloader(MediaCache(self.cache_path)) as downloader:
+            result = downloader.fetch(task)
+        self.assertTrue(result.success)
+
+    def test_locally_built_tasks(self):
+        task = ImageTask(
+            attachment=f"{self.server.url}/a.png", attachment_type="image"
+        )
+        with MediaDownloader(MediaCache(self.cache_path)) as downloader:
+            result = downloader.fetch(task)
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.task_id, str(task.id))
+
+    def test_http_errors_are_reported(self):
+        cache = MediaCache(self.cache_path)
+        with MediaDownloader(cache) as downloader:
+            result = self.fetch(downloader, "missing.png")
+        self.assertFalse(result.success)
+        self.assertIsNone(cache.get(result.url))
+
+    def test_fetch_all_keeps_task_order(self):
+        names = ["c.png", "a.png", "missing.png", "b.png"]
+        with MediaDownloader(
+            MediaCache(self.cache_path), max_workers=2
+        ) as downloader:
+            results = list(downloader.fetch_all(
+                make_task(f"{self.server.url}/{name}") for name in names
+            ))
+
+        self.assertEqual([result.task_id for result in results], names)
+        self.assertEqual(
+            [result.success for result in results],
+            [True, True, False, True]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import unittest
+from linlog.controller import Controller
+from linlog.metrics import (
+    MetricsCollector,
+    RequestEvent,
+    instrument_opentelemetry,
+    normalise_endpoint
+)
+from tests.server import LocalServer
+
+try:
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+except ImportError:  # pragma: no cover - optional dependency
+    MeterProvider = None
+
+
+def handler(request):
+    if request.path == "projects/missing":
+        return 404, {"detail": "Not found."}, None
+    return 200, {"id": "project-1"}, None
+
+
+def response(endpoint: str, duration: float, status_code: int = 200,
+             bytes_in: int = 0) -> RequestEvent:
+    return RequestEvent(
+        method="GET",
+        endpoint=endpoint,
+        url=endpoint,
+        duration=duration,
+        status_code=status_code,
+        bytes_in=bytes_in
+    )
+
+
+class TestMetricsCollector(unittest.TestCase):
+
+    def test_normalise_endpoint(self):
+        self.assertEqual(
+            normalise_endpoint("projects/12ab/tasks?limit=5"),
+            "projects/{id}/tasks"
+        )
+
+    def test_histogram_and_counters(self):
+        metrics = MetricsCollector(buckets=(.1, 1))
+        for duration in (.05, .5, 5):
+            metrics.before_request(response("projects/1", duration))
+            metrics.after_response(
+                response("projects/1", duration, bytes_in=10)
+            )
+        metrics.before_request(response("projects/2", .05))
+        metrics.after_response(response("projects/2", .05, 500))
+
+        key = ("GET", "projects/{id}")
+        histogram = metrics.latency[key]
+        self.assertEqual(histogram.counts, [2, 1])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 5.6)
+        self.assertEqual(metrics.bytes_in[key], 30)
+        self.assertEqual(metrics.requests[key + ("200",)], 3)
+        self.assertEqual(metrics.errors, {key + ("500",): 1})
+        self.assertEqual(metrics.in_flight, 0)
+
+    def test_prometheus_output(self):
+        metrics = MetricsCollector(buckets=(.1, 1))
+        metrics.after_response(response("projects/1", .05))
+        metrics.after_response(response("projects/1", .5))
+        lines = metrics.to_prometheus().splitlines()
+
+        labels = 'method="GET",endpoint="projects/{id}"'
+        for line in [
+            "# TYPE linlog_request_duration_seconds histogram",
+            f'linlog_request_duration_seconds_bucket{{{labels},le="0.1"}} 1',
+            f'linlog_request_duration_seconds_bucket{{{labels},le="1"}} 2',
+            f'linlog_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2',
+            f"linlog_request_duration_seconds_count{{{labels}}} 2",
+            f'linlog_requests_total{{{labels},status="200"}} 2',
+            "# TYPE linlog_requests_in_flight gauge",
+        ]:
+            self.assertIn(line, lines)
+
+    def test_label_values_are_escaped(self):
+        metrics = MetricsCollector(endpoint_label=lambda endpoint: 'a"b')
+        metrics.after_response(response("projects", .05))
+        self.assertIn('endpoint="a\\"b"', metrics.to_prometheus())
+
+
+class TestControllerHooks(unittest.TestCase):
+
+    def test_hooks_receive_every_request(self):
+        events = []
+        with LocalServer(handler) as server:
+            controller = Controller(("token", ""), base_url=server.url)
+            for name in ("before_request", "after_response", "on_error"):
+                controller.add_hook(
+                    name, lambda event, name=name: events.append(
+                        (name, event.status_code)
+                    )
+                )
+            controller.get_request("projects/project-1")
+            with self.assertRaises(Exception):
+                controller.get_request("projects/missing")
+
+        self.assertEqual(events, [
+            ("before_request", None), ("after_response", 200),
+            ("before_request", None), ("after_response", 404),
+        ])
+        metrics = controller.metrics
+        self.assertEqual(metrics.requests, {
+            ("GET", "projects/{id}", "200"): 1,
+            ("GET", "projects/missing", "404"): 1
+        })
+        self.assertEqual(
+            metrics.errors, {("GET", "projects/missing", "404"): 1}
+        )
+        self.assertEqual(metrics.in_flight, 0)
+
+    def test_unknown_hook_event(self):
+        controller = Controller(("token", ""))
+        with self.assertRaises(ValueError):
+            controller.add_hook("after_request", print)
+
+    def test_connection_errors_are_reported(self):
+        with LocalServer(handler) as server:
+            url = server.url
+        controller = Controller(("token", ""), base_url=url)
+        errors = []
+        controller.add_hook("on_error", errors.append)
+        with self.assertRaises(Exception):
+            controller.get_request("projects")
+        self.assertEqual(len(errors), 1)
+        self.assertIsNotNone(errors[0].error)
+        self.assertEqual(controller.metrics.in_flight, 0)
+
+
+@unittest.skipIf(MeterProvider is None, "requires opentelemetry-sdk")
+class TestOpenTelemetry(unittest.TestCase):
+
+    def test_request_metrics(self):
+        reader = InMemoryMetricReader()
+        provider = MeterProvider(metric_readers=[reader])
+        with LocalServer(handler) as server:
+            controller = Controller(
+                ("token", ""), base_url=server.url, collect_metrics=False
+            )
+            instrument_opentelemetry(controller, meter_provider=provider)
+            controller.get_request("projects/project-1")
+
+        metrics = {
+            metric.name: metric
+            for resource in reader.get_metrics_data().resource_metrics
+            for scope in resource.scope_metrics
+            for metric in scope.metrics
+        }
+        duration = metrics["linlog.request.duration"].data.data_points[0]
+        self.assertEqual(duration.count, 1)
+        self.assertEqual(duration.attributes["http.status_code"], 200)
+        self.assertEqual(
+            duration.attributes["linlog.endpoint"], "projects/{id}"
+        )
+        in_flight = metrics["linlog.requests.in_flight"].data.data_points
+        self.assertEqual(sum(point.value for point in in_flight), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import random
+import time
+import unittest
+from unittest import mock
+from linlog import LinLogClient
+from linlog.model_runs import ModelRunWriter
+from linlog.schemas.annotation import BoundingBoxAnnotation
+from tests.server import LocalServer
+
+ANNOTATION = {"annotation_type": "bounding-box", "label": "car", "top": 0,
+              "left": 0, "width": 1, "height": 1}
+
+
+def model_run_handler(request):
+    if request.path != "datasets/model-run":
+        return 404, {"detail": "Not found."}, None
+
+    model_run = request.json()
+    if model_run["task"] == "task-bad":
+        return 400, {"detail": "Invalid annotation"}, None
+    return 201, {"id": f"run-{model_run['task']}"}, None
+
+
+class TestModelRuns(unittest.TestCase):
+
+    def test_create_model_runs_reports_every_item(self):
+        task_ids = ["task-0", "task-bad", "task-2"]
+        with LocalServer(model_run_handler) as server:
+            client = LinLogClient.init_from_token("token", server.url)
+            report = client.create_model_runs(
+                "dataset-1", "version-1",
+                [{"task": task_id, "annotation": ANNOTATION}
+                 for task_id in task_ids]
+            )
+
+        self.assertEqual([r.id for r in report.results], task_ids)
+        self.assertEqual(report.succeeded, ["task-0", "task-2"])
+        self.assertEqual([r.id for r in report.failed], ["task-bad"])
+        self.assertEqual(report.results[0].response, {"id": "run-task-0"})
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(server.requests[0].json()["dataset"], "dataset-1")
+
+    def test_writer_keeps_going_after_failures(self):
+        task_ids = [f"task-{idx}" for idx in range(7)]
+        task_ids[3] = "task-bad"
+        with LocalServer(model_run_handler) as server:
+            client = LinLogClient.init_from_token("token", server.url)
+            with ModelRunWriter(
+                client, "dataset-1", "version-1", batch_size=2
+            ) as writer:
+                for task_id in task_ids:
+                    writer.write(task_id, ANNOTATION, .5)
+
+        report = writer.report
+        self.assertEqual([r.id for r in report.results], task_ids)
+        self.assertEqual([r.id for r in report.failed], ["task-bad"])
+        self.assertEqual(writer.sent, 6)
+        self.assertEqual(len(server.requests), 7)
+        with self.assertRaises(Exception):
+            report.raise_for_errors()
+
+    def test_flush_interval(self):
+        with LocalServer(model_run_handler) as server:
+            client = LinLogClient.init_from_token("token", server.url)
+            writer = ModelRunWriter(
+                client, "dataset-1", "version-1", flush_interval=.05
+            )
+            writer.write("task-0", ANNOTATION)
+            for _ in range(100):
+                if server.requests:
+                    break
+                writer._timer_stop.wait(.02)
+            self.assertEqual(len(server.requests), 1)
+            writer.close()
+        self.assertEqual(writer.report.succeeded, ["task-0"])
+
+    def test_results_keep_write_order_with_the_timer_flushing(self):
+        def create_model_run(dataset_id, version_id, task_id, *args):
+            time.sleep(random.uniform(0, .002))
+            return {"id": task_id}
+
+        client = mock.Mock(create_model_run=create_model_run)
+        task_ids = [f"task-{idx}" for idx in range(300)]
+        # The timer flushes partial batches while the producer fills them
+        with ModelRunWriter(
+            client, "dataset-1", "version-1", batch_size=3,
+            flush_interval=.0005, max_workers=4
+        ) as writer:
+            for task_id in task_ids:
+                writer.write(task_id, ANNOTATION)
+                if random.random() < .1:
+                    time.sleep(.001)
+
+        self.assertEqual([r.id for r in writer.report.results], task_ids)
+        self.assertEqual(
+            [r.response["id"] for r in writer.report.results], task_ids
+        )
+
+    def test_annotations_are_sent_as_dicts(self):
+        annotation = BoundingBoxAnnotation(
+            id="box-1", label="car", top=0, left=0, width=1, height=1,
+            rotation=0, is_model_run=True
+        )
+        with LocalServer(model_run_handler) as server:
+            client = LinLogClient.init_from_token("token", server.url)
+            client.create_model_runs("dataset-1", "version-1", [
+                {"task": "task-0", "annotation": annotation}
+            ])
+            with ModelRunWriter(client, "dataset-1", "version-1") as writer:
+                writer.write("task-1", annotation)
+
+        self.assertEqual(writer.report.succeeded, ["task-1"])
+        bulk, written = [request.json() for request in server.requests]
+        self.assertEqual(bulk["annotation"], annotation.to_dict())
+        self.assertEqual(written["annotation"], bulk["annotation"])
+
+    def test_closed_writer(self):
+        client = LinLogClient.init_from_token("token")
+        writer = ModelRunWriter(client, "dataset-1", "version-1")
+        writer.close()
+        with self.assertRaises(Exception):
+            writer.write("task-0", ANNOTATION)
+
+
+if __name__ == '__main__':
+    unittest.main()
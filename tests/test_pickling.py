@@ -0,0 +1,82 @@
+import copy
+import json
+import pickle
+import unittest
+from linlog.schemas.task import Task
+
+
+def make_task() -> Task:
+    return Task.from_json({
+        "id": "task-1",
+        "task_type": "image",
+        "params": {"attachment": "a.jpg", "attachment_type": "image"},
+        "media_specs": {"width": 10, "height": 10},
+        "tags": ["night"],
+        "annotations": [{
+            "id": "polygon-1",
+            "annotation_type": "polygon",
+            "label": "car",
+            "segments": [{
+                "path": [
+                    {"x": 0, "y": 0}, {"x": 4, "y": 0}, {"x": 4, "y": 2.5}
+                ],
+                "subtraction": []
+            }]
+        }]
+    })
+
+
+class TestPickling(unittest.TestCase):
+
+    def test_task_round_trip(self):
+        task = make_task()
+        restored = pickle.loads(pickle.dumps(task))
+        self.assertEqual(restored.to_dict(), task.to_dict())
+        self.assertEqual(
+            restored.annotations[0].segments[0].path[2].y, 2.5
+        )
+
+    def test_change_tracking_survives_pickling(self):
+        task = make_task()
+        task.tags = ["day"]
+        restored = pickle.loads(pickle.dumps(task))
+        self.assertEqual(restored.changed_fields, {"tags"})
+        self.assertTrue(restored.is_tracked)
+
+    def test_copies_track_changes_separately(self):
+        task = make_task()
+        copied = copy.copy(task)
+        copied.tags = ["day"]
+        self.assertEqual(copied.changed_fields, {"tags"})
+        self.assertEqual(task.changed_fields, set())
+
+    def test_vertices_are_pickled_as_buffers(self):
+        segment = make_task().annotations[0].segments[0]
+        self.assertNotIn(b"Vertices", pickle.dumps(segment))
+
+    def test_vertices_keep_their_numeric_types(self):
+        segment = make_task().annotations[0].segments[0]
+        segment.subtraction = [
+            type(segment.path[0])(x=2 ** 60 + 1, y=-3),
+            type(segment.path[0])(x=1.0, y=float("inf")),
+        ]
+        restored = pickle.loads(pickle.dumps(segment))
+
+        for vertices, restored_vertices in (
+            (segment.path, restored.path),
+            (segment.subtraction, restored.subtraction),
+        ):
+            values = [(v.x, v.y) for v in vertices]
+            restored_values = [(v.x, v.y) for v in restored_vertices]
+            self.assertEqual(restored_values, values)
+            self.assertEqual(
+                [tuple(map(type, v)) for v in restored_values],
+                [tuple(map(type, v)) for v in values]
+            )
+        self.assertEqual(
+            json.dumps(restored.to_dict()), json.dumps(segment.to_dict())
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
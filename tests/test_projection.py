@@ -0,0 +1,117 @@
+import unittest
+from linlog import LinLogClient
+from linlog.query import parse_fields, project
+from linlog.schemas.task import PartialTask
+from tests.server import LocalServer
+
+TASK = {
+    "id": "task-1",
+    "complete": True,
+    "tags": ["night"],
+    "params": {"attachment": "a.jpg", "attachment_type": "image"},
+    "annotations": [
+        {"id": "a-1", "label": "car", "left": 1, "top": 2},
+        {"id": "a-2", "label": "bus", "left": 3, "top": 4},
+    ]
+}
+
+
+class TestParseFields(unittest.TestCase):
+
+    def test_dotted_paths(self):
+        self.assertEqual(
+            parse_fields(["id", "annotations.label", "annotations.id"]),
+            {"id": None, "annotations": {"label": None, "id": None}}
+        )
+
+    def test_whole_field_wins_over_sub_fields(self):
+        expected = {"annotations": None}
+        self.assertEqual(
+            parse_fields(["annotations.label", "annotations"]), expected
+        )
+        self.assertEqual(
+            parse_fields(["annotations", "annotations.label"]), expected
+        )
+
+    def test_single_field(self):
+        self.assertEqual(parse_fields("id"), {"id": None})
+
+
+class TestProject(unittest.TestCase):
+
+    def test_keeps_selected_fields(self):
+        tree = parse_fields(["id", "params.attachment", "annotations.label"])
+        self.assertEqual(project(TASK, tree), {
+            "id": "task-1",
+            "params": {"attachment": "a.jpg"},
+            "annotations": [{"label": "car"}, {"label": "bus"}]
+        })
+
+    def test_lists_are_projected_item_by_item(self):
+        self.assertEqual(
+            project([TASK, {"id": "task-2"}], parse_fields(["id", "tags"])),
+            [{"id": "task-1", "tags": ["night"]}, {"id": "task-2"}]
+        )
+
+    def test_missing_fields_are_skipped(self):
+        tree = parse_fields(["id", "metadata.camera"])
+        self.assertEqual(project(TASK, tree), {"id": "task-1"})
+
+    def test_scalars_are_kept_when_sub_fields_are_selected(self):
+        self.assertEqual(
+            project({"tags": None}, parse_fields(["tags.name"])),
+            {"tags": None}
+        )
+
+
+class TestPartialTask(unittest.TestCase):
+
+    def test_reads_fetched_fields(self):
+        task = PartialTask.from_json(
+            project(TASK, parse_fields(["id", "complete", "params"]))
+        )
+        self.assertEqual(task.id, "task-1")
+        self.assertTrue(task.complete)
+        self.assertEqual(task.attachment, "a.jpg")
+        self.assertEqual(task.attachment_type, "image")
+        self.assertEqual(task.fields, ["id", "complete", "params"])
+
+    def test_missing_field_raises(self):
+        task = PartialTask.from_json({"id": "task-1"})
+        with self.assertRaisesRegex(AttributeError, "'tags' was not fetched"):
+            task.tags
+        with self.assertRaises(AttributeError):
+            task.attachment
+        self.assertFalse(hasattr(task, "_private"))
+
+    def test_many(self):
+        tasks = PartialTask.from_json([{"id": "a"}, {"id": "b"}], many=True)
+        self.assertEqual([task.id for task in tasks], ["a", "b"])
+        self.assertEqual(tasks[0].to_dict(), {"id": "a"})
+
+
+class TestFetchedFields(unittest.TestCase):
+
+    def test_project_tasks_are_projected(self):
+        def handler(request):
+            # The server sends more than was asked for
+            return 200, {
+                "count": 1, "next": None, "previous": None, "results": [TASK]
+            }, None
+
+        with LocalServer(handler) as server:
+            client = LinLogClient.init_from_token("token", server.url)
+            page = client.get_project_tasks(
+                "project-1", fields=["id", "annotations.id"]
+            )
+
+        request, = server.requests
+        self.assertEqual(request.query["fields"], ["id,annotations.id"])
+        self.assertEqual(list(page), [{
+            "id": "task-1",
+            "annotations": [{"id": "a-1"}, {"id": "a-2"}]
+        }])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import tempfile
+import unittest
+from unittest import mock
+from linlog.exceptions import NoAccess, NotFound
+
+try:
+    from linlog.commands import pull_dataset
+except ImportError:  # pragma: no cover - optional dependency
+    pull_dataset = None
+
+
+@unittest.skipIf(pull_dataset is None, "requires the CLI dependencies")
+class TestPullDataset(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output = directory.name
+
+        for name in ["pull_dataset_tasks", "export_tasks", "log_error"]:
+            patch = mock.patch.object(pull_dataset, name)
+            setattr(self, name, patch.start())
+            self.addCleanup(patch.stop)
+
+    def run_command(self):
+        pull_dataset.run("dataset-1", mock.Mock(), output=self.output)
+
+    def test_missing_dataset_is_not_exported(self):
+        self.pull_dataset_tasks.side_effect = NotFound("dataset-1")
+        self.run_command()
+        self.log_error.assert_called_once_with(
+            "Unable to find dataset with id dataset-1"
+        )
+        self.export_tasks.assert_not_called()
+
+    def test_forbidden_dataset_is_not_exported(self):
+        self.pull_dataset_tasks.side_effect = NoAccess()
+        self.run_command()
+        self.log_error.assert_called_once()
+        self.export_tasks.assert_not_called()
+
+    def test_pulled_tasks_are_exported(self):
+        self.pull_dataset_tasks.return_value = ["task"]
+        self.run_command()
+        self.log_error.assert_not_called()
+        _, tasks, output = self.export_tasks.call_args.args
+        self.assertEqual(tasks, ["task"])
+        self.assertEqual(str(output), self.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+from datetime import date
+from linlog import LinLogClient
+from linlog.query import TaskQuery
+from tests.server import LocalServer
+
+
+def search_handler(request):
+    return 200, {
+        "count": 0, "next": None, "previous": None, "results": []
+    }, None
+
+
+class TestTaskQuery(unittest.TestCase):
+
+    def test_filters(self):
+        query = TaskQuery() \
+            .labels("car", "truck") \
+            .complete() \
+            .rejected(False) \
+            .workflow_stage("review") \
+            .tags("night") \
+            .created_between(date(2024, 1, 1), "2024-02-01") \
+            .metadata(camera="front")
+
+        self.assertEqual(query.to_dict(), {
+            "labels": ["car", "truck"],
+            "complete": True,
+            "rejected": False,
+            "workflow_stage": ["review"],
+            "tags": ["night"],
+            "created_date__gte": "2024-01-01",
+            "created_date__lte": "2024-02-01",
+            "metadata": {"camera": "front"}
+        })
+
+    def test_queries_are_immutable(self):
+        base = TaskQuery().complete()
+        cars = base.labels("car")
+        self.assertEqual(base.to_dict(), {"complete": True})
+        self.assertEqual(cars.to_dict(), {"complete": True, "labels": ["car"]})
+
+    def test_metadata_filters_are_merged(self):
+        query = TaskQuery().metadata(camera="front").metadata(weather="rain")
+        self.assertEqual(
+            query.to_dict()["metadata"], {"camera": "front", "weather": "rain"}
+        )
+
+    def test_to_dict_returns_a_copy(self):
+        query = TaskQuery().metadata(camera="front")
+        query.to_dict()["metadata"]["camera"] = "rear"
+        self.assertEqual(query.to_dict()["metadata"], {"camera": "front"})
+
+    def test_invalid_date_lookup(self):
+        with self.assertRaises(Exception):
+            TaskQuery().created("2024-01-01", "after")
+
+    def test_empty_query(self):
+        self.assertFalse(TaskQuery())
+        self.assertEqual(TaskQuery(), TaskQuery({}))
+        self.assertTrue(TaskQuery().tags("night"))
+
+
+class TestSearchRequests(unittest.TestCase):
+
+    def search(self, *args, **kwargs):
+        with LocalServer(search_handler) as server:
+            client = LinLogClient.init_from_token("token", server.url)
+            client.get_dataset_tasks("dataset-1", *args, **kwargs)
+        request, = server.requests
+        self.assertEqual(request.method, "POST")
+        self.assertEqual(request.path, "search/tasks")
+        self.assertEqual(request.query["dataset"], ["dataset-1"])
+        return request
+
+    def test_query_filters_are_sent(self):
+        query = TaskQuery().labels("car").complete().metadata(camera="front")
+        request = self.search(query, limit=10, offset=20)
+
+        self.assertEqual(request.query["limit"], ["10"])
+        self.assertEqual(request.query["offset"], ["20"])
+        self.assertEqual(request.json(), {
+            "labels": ["car"],
+            "complete": True,
+            "metadata": {"camera": "front"},
+            "exclude_annotations": True
+        })
+
+    def test_created_date_kwargs_become_filters(self):
+        request = self.search(
+            TaskQuery().tags("night"),
+            created_date__gte="2024-01-01",
+            created_date="2024-03-01"
+        )
+        self.assertEqual(request.json(), {
+            "tags": ["night"],
+            "created_date__gte": "2024-01-01",
+            "created_date": "2024-03-01",
+            "exclude_annotations": True
+        })
+
+    def test_selected_annotations_are_included(self):
+        request = self.search(fields=["id", "annotations.label"])
+        self.assertEqual(request.json(), {
+            "fields": ["id", "annotations.label"],
+            "exclude_annotations": False
+        })
+
+    def test_page_size_is_capped(self):
+        request = self.search(limit=1000)
+        self.assertEqual(request.query["limit"], ["200"])
+
+    def test_invalid_kwarg(self):
+        client = LinLogClient.init_from_token("token", "http://127.0.0.1:1")
+        with self.assertRaisesRegex(Exception, "Invalid kwarg key: label"):
+            client.get_dataset_tasks("dataset-1", label="car")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,235 @@
+import threading
+import unittest
+from unittest import mock
+from linlog.controller import Controller
+from linlog.ratelimit import (
+    AdaptiveConcurrencyLimiter,
+    RateLimiter,
+    TokenBucket
+)
+from tests.server import LocalServer
+
+
+class FakeClock:
+    """Replaces time.monotonic and time.sleep in linlog.ratelimit, sleeping
+    advances the clock."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.slept = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+        self.slept += seconds
+
+    def __enter__(self) -> 'FakeClock':
+        self._patch = mock.patch.multiple(
+            "linlog.ratelimit.time", monotonic=self.monotonic, sleep=self.sleep
+        )
+        self._patch.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._patch.stop()
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_then_rate(self):
+        with FakeClock() as clock:
+            bucket = TokenBucket(rate=4, burst=5)
+            for _ in range(5):
+                self.assertEqual(bucket.acquire(), 0)
+            self.assertEqual(bucket.acquire(), .25)
+            self.assertEqual(clock.slept, .25)
+
+    def test_refill_is_capped_at_burst(self):
+        with FakeClock() as clock:
+            bucket = TokenBucket(rate=4, burst=2)
+            bucket.acquire(2)
+            clock.now += 60
+            bucket.acquire(2)
+            self.assertEqual(bucket.acquire(), .25)
+
+    def test_pause(self):
+        with FakeClock() as clock:
+            bucket = TokenBucket(rate=4, burst=4)
+            bucket.pause(3)
+            bucket.acquire()
+            self.assertGreaterEqual(clock.slept, 3)
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+    def test_longest_endpoint_prefix_wins(self):
+        limiter = RateLimiter(endpoint_rates={"tasks": 1, "tasks/image": 2})
+        self.assertEqual(limiter._endpoint_bucket("tasks/image").rate, 2)
+        self.assertEqual(limiter._endpoint_bucket("tasks/1").rate, 1)
+        self.assertIsNone(limiter._endpoint_bucket("projects"))
+
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+
+    def test_additive_increase(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release(latency=.1, status_code=200)
+        self.assertEqual(limiter.limit, 3)
+
+    def test_multiplicative_decrease(self):
+        with FakeClock() as clock:
+            limiter = AdaptiveConcurrencyLimiter(initial_limit=16)
+            for status_code in (429, 503, None):
+                limiter.acquire()
+                limiter.release(latency=.1, status_code=status_code)
+                clock.now += 2
+            self.assertEqual(limiter.limit, 2)
+
+    def test_decreases_wait_for_the_cooldown(self):
+        with FakeClock():
+            limiter = AdaptiveConcurrencyLimiter(initial_limit=16)
+            for _ in range(3):
+                limiter.acquire()
+                limiter.release(status_code=503)
+            self.assertEqual(limiter.limit, 8)
+
+    def test_latency_increase_decreases_the_limit(self):
+        with FakeClock():
+            limiter = AdaptiveConcurrencyLimiter(
+                initial_limit=8, latency_tolerance=3
+            )
+            limiter.acquire()
+            limiter.release(latency=.1, status_code=200)
+            limiter.acquire()
+            limiter.release(latency=1, status_code=200)
+            self.assertEqual(limiter.limit, 4)
+
+    def test_latency_is_compared_per_endpoint(self):
+        with FakeClock() as clock:
+            limiter = AdaptiveConcurrencyLimiter(
+                initial_limit=4, latency_tolerance=3
+            )
+            for _ in range(10):
+                limiter.acquire()
+                limiter.release(
+                    latency=.01, status_code=200, endpoint="GET projects/{id}"
+                )
+                limiter.acquire()
+                limiter.release(
+                    latency=.5, status_code=200,
+                    endpoint="POST datasets/{id}/tasks"
+                )
+                clock.now += 2
+            self.assertGreater(limiter.limit, 4)
+
+            # Slower than usual for the fast endpoint
+            limiter.acquire()
+            limiter.release(
+                latency=.1, status_code=200, endpoint="GET projects/{id}"
+            )
+            self.assertLess(limiter.limit, 4)
+
+    def test_recovers_after_decrease(self):
+        with FakeClock():
+            limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+            limiter.acquire()
+            limiter.release(status_code=503)
+            self.assertEqual(limiter.limit, 2)
+            for _ in range(6):
+                limiter.acquire()
+                limiter.release(latency=.1, status_code=200)
+            self.assertEqual(limiter.limit, 4)
+
+    def test_limit_bounds(self):
+        with FakeClock() as clock:
+            limiter = AdaptiveConcurrencyLimiter(
+                initial_limit=2, min_limit=2, max_limit=3
+            )
+            limiter.acquire()
+            limiter.release(status_code=503)
+            self.assertEqual(limiter.limit, 2)
+            for _ in range(20):
+                clock.now += 2
+                limiter.acquire()
+                limiter.release(latency=.1, status_code=200)
+            self.assertEqual(limiter.limit, 3)
+
+    def test_acquire_blocks_at_the_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+        limiter.acquire()
+        acquired = threading.Event()
+
+        def acquire():
+            limiter.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        self.assertFalse(acquired.wait(.05))
+        limiter.release(latency=.1, status_code=200)
+        self.assertTrue(acquired.wait(5))
+        thread.join()
+
+
+class TestControllerLimits(unittest.TestCase):
+
+    def controller(self, url: str) -> Controller:
+        return Controller(
+            ("token", ""),
+            base_url=url,
+            adaptive_concurrency=AdaptiveConcurrencyLimiter(initial_limit=1)
+        )
+
+    def test_failing_hook_releases_the_slot(self):
+        with LocalServer(lambda request: (200, {}, None)) as server:
+            controller = self.controller(server.url)
+
+            def fail(event):
+                raise RuntimeError("hook failed")
+
+            controller.add_hook("before_request", fail)
+            for _ in range(3):
+                with self.assertRaises(RuntimeError):
+                    controller.get_request("projects")
+
+            controller.remove_hook("before_request", fail)
+            self.assertEqual(controller.get_request("projects"), {})
+            self.assertEqual(controller.concurrency_limiter.in_flight, 0)
+            self.assertEqual(controller.metrics.in_flight, 0)
+            self.assertEqual(len(server.requests), 1)
+
+    def test_connection_error_releases_the_slot(self):
+        with LocalServer(lambda request: (200, {}, None)) as server:
+            url = server.url
+        controller = self.controller(url)
+        with mock.patch.object(
+            controller, "_http_request", side_effect=ConnectionError
+        ):
+            with self.assertRaises(ConnectionError):
+                controller.get_request("projects")
+        self.assertEqual(controller.concurrency_limiter.in_flight, 0)
+        self.assertEqual(controller.metrics.in_flight, 0)
+
+    def test_latency_is_reported_per_endpoint(self):
+        with LocalServer(lambda request: (200, {}, None)) as server:
+            controller = self.controller(server.url)
+            with mock.patch.object(
+                controller.concurrency_limiter, "release",
+                wraps=controller.concurrency_limiter.release
+            ) as release:
+                controller.get_request("projects/12ab")
+                controller.post_request("datasets/34cd/tasks", {})
+
+        self.assertEqual(
+            [call.kwargs["endpoint"] for call in release.call_args_list],
+            ["GET projects/{id}", "POST datasets/{id}/tasks"]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
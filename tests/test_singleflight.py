@@ -0,0 +1,172 @@
+import threading
+import time
+import unittest
+from linlog.controller import Controller
+from linlog.singleflight import SingleFlight
+from tests.server import LocalServer
+
+
+def wait_for_waiters(single_flight: SingleFlight, key, count: int) -> None:
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        call = single_flight._calls.get(key)
+        if call is not None and call.waiters >= count:
+            return
+        time.sleep(.001)
+    raise AssertionError("waiters did not join the call")
+
+
+def run_threads(count: int, target) -> list:
+    results = [None] * count
+
+    def run(idx):
+        try:
+            results[idx] = target()
+        except Exception as e:
+            results[idx] = e
+
+    threads = [threading.Thread(target=run, args=(idx,))
+               for idx in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_calls_share_one_execution(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            release.wait(5)
+            return {"items": []}
+
+        threads, results = run_threads(
+            5, lambda: single_flight.do("key", fn)
+        )
+        wait_for_waiters(single_flight, "key", 4)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"items": []}] * 5)
+        # Every caller gets its own copy
+        self.assertEqual(len({id(result) for result in results}), 5)
+        self.assertEqual(single_flight.in_flight, 0)
+
+    def test_waiters_raise_their_own_exception(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+
+        def fn():
+            release.wait(5)
+            raise ValueError("failed")
+
+        threads, results = run_threads(
+            3, lambda: single_flight.do("key", fn)
+        )
+        wait_for_waiters(single_flight, "key", 2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        for error in results:
+            self.assertIsInstance(error, ValueError)
+            self.assertEqual(error.args, ("failed",))
+        self.assertEqual(len({id(error) for error in results}), 3)
+        self.assertEqual(single_flight.in_flight, 0)
+
+    def test_calls_are_not_cached(self):
+        single_flight = SingleFlight()
+        calls = []
+        single_flight.do("key", lambda: calls.append(1))
+        single_flight.do("key", lambda: calls.append(1))
+        self.assertEqual(len(calls), 2)
+
+    def test_forgotten_calls_are_not_joined(self):
+        single_flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+
+        def first():
+            started.set()
+            release.wait(5)
+            return "old"
+
+        threads, results = run_threads(
+            1, lambda: single_flight.do("key", first)
+        )
+        self.assertTrue(started.wait(5))
+        single_flight.forget()
+        self.assertEqual(single_flight.do("key", lambda: "new"), "new")
+        release.set()
+        threads[0].join()
+
+        self.assertEqual(results, ["old"])
+        self.assertEqual(single_flight.in_flight, 0)
+
+
+class TestControllerCoalescing(unittest.TestCase):
+
+    def test_identical_gets_send_one_request(self):
+        release = threading.Event()
+
+        def handler(request):
+            release.wait(5)
+            return 200, {"id": "project-1"}, None
+
+        with LocalServer(handler) as server:
+            controller = Controller(("token", ""), base_url=server.url)
+            threads, results = run_threads(
+                4, lambda: controller.get_request("projects/project-1")
+            )
+            wait_for_waiters(
+                controller._single_flight, "projects/project-1", 3
+            )
+            release.set()
+            for thread in threads:
+                thread.join()
+            controller.close()
+
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(results, [{"id": "project-1"}] * 4)
+
+    def test_gets_after_a_write_do_not_join_earlier_requests(self):
+        state = {"name": "old"}
+        started, release = threading.Event(), threading.Event()
+
+        def handler(request):
+            if request.method == "PATCH":
+                state.update(request.json())
+                return 200, state, None
+            name = state["name"]
+            if name == "old":
+                started.set()
+                release.wait(5)
+            return 200, {"name": name}, None
+
+        with LocalServer(handler) as server:
+            controller = Controller(("token", ""), base_url=server.url)
+            threads, results = run_threads(
+                1, lambda: controller.get_request("projects/project-1")
+            )
+            self.assertTrue(started.wait(5))
+            controller.put_request("projects/project-1", {"name": "new"})
+            fresh = controller.get_request("projects/project-1")
+            release.set()
+            threads[0].join()
+            controller.close()
+
+        self.assertEqual(results, [{"name": "old"}])
+        self.assertEqual(fresh, {"name": "new"})
+        self.assertEqual(
+            [request.method for request in server.requests],
+            ["GET", "PATCH", "GET"]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
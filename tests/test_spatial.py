@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from linlog.schemas.task import Task
+from linlog.spatial import (
+    SpatialIndex,
+    index_task_annotations,
+    overlapping_annotations
+)
+
+
+def random_boxes(count: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    corners = rng.uniform(0, 1000, size=(count, 2))
+    sizes = rng.uniform(0, 50, size=(count, 2))
+    return np.concatenate([corners, corners + sizes], axis=1)
+
+
+def brute_force_window(boxes: np.ndarray, window) -> np.ndarray:
+    x1, y1, x2, y2 = window
+    hit = (boxes[:, 0] <= x2) & (boxes[:, 2] >= x1) & \
+        (boxes[:, 1] <= y2) & (boxes[:, 3] >= y1)
+    return np.flatnonzero(hit)
+
+
+def brute_force_distances(boxes: np.ndarray, x, y) -> np.ndarray:
+    dx = np.maximum(np.maximum(boxes[:, 0] - x, 0), x - boxes[:, 2])
+    dy = np.maximum(np.maximum(boxes[:, 1] - y, 0), y - boxes[:, 3])
+    return np.hypot(dx, dy)
+
+
+class TestSpatialIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.boxes = random_boxes(1000)
+        rng = np.random.default_rng(1)
+        self.windows = [
+            np.concatenate([corner, corner + size])
+            for corner, size in zip(
+                rng.uniform(-50, 1000, size=(50, 2)),
+                rng.uniform(0, 200, size=(50, 2))
+            )
+        ]
+        self.points = rng.uniform(-100, 1100, size=(50, 2))
+
+    def test_window_queries_match_brute_force(self):
+        for capacity in (2, 7, 16):
+            index = SpatialIndex(self.boxes, node_capacity=capacity)
+            for window in self.windows:
+                np.testing.assert_array_equal(
+                    index.query_indices(window),
+                    brute_force_window(self.boxes, window)
+                )
+
+    def test_window_query_includes_touching_boxes(self):
+        index = SpatialIndex([[0, 0, 10, 10], [20, 20, 30, 30]])
+        self.assertEqual(index.query([10, 10, 20, 20]), [0, 1])
+        self.assertEqual(index.query([11, 11, 19, 19]), [])
+
+    def test_nearest_queries_match_brute_force(self):
+        for capacity in (2, 7, 16):
+            index = SpatialIndex(self.boxes, node_capacity=capacity)
+            for x, y in self.points:
+                distances = brute_force_distances(self.boxes, x, y)
+                found = index.nearest_indices(x, y, k=10)
+
+                self.assertEqual(len(set(found)), 10)
+                # Ties may come back in any order, so distances are
+                # compared instead of positions
+                np.testing.assert_allclose(
+                    distances[found], np.sort(distances)[:10]
+                )
+
+    def test_nearest_returns_every_box_when_k_is_large(self):
+        index = SpatialIndex(self.boxes[:20], node_capacity=4)
+        self.assertEqual(sorted(index.nearest_indices(0, 0, k=50)),
+                         list(range(20)))
+
+    def test_queries_return_ids(self):
+        index = SpatialIndex(
+            [[0, 0, 1, 1], [5, 5, 6, 6]], ids=["a", "b"]
+        )
+        self.assertEqual(index.query([4, 4, 10, 10]), ["b"])
+        self.assertEqual(index.nearest(0.5, 0.5), ["a"])
+
+    def test_empty_index(self):
+        index = SpatialIndex(np.empty((0, 4)))
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.query([0, 0, 1, 1]), [])
+        self.assertEqual(index.nearest(0, 0, k=3), [])
+
+    def test_save_and_load(self):
+        index = SpatialIndex(
+            self.boxes, ids=[f"box-{i}" for i in range(len(self.boxes))],
+            node_capacity=5
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.npz")
+            index.save(path)
+            loaded = SpatialIndex.load(path)
+
+        self.assertEqual(loaded.node_capacity, 5)
+        for window in self.windows:
+            self.assertEqual(loaded.query(window), index.query(window))
+        x, y = self.points[0]
+        self.assertEqual(loaded.nearest(x, y, 5), index.nearest(x, y, 5))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            SpatialIndex(self.boxes, ids=[1, 2])
+        with self.assertRaises(ValueError):
+            SpatialIndex(self.boxes, node_capacity=1)
+
+
+class TestTaskAnnotations(unittest.TestCase):
+
+    def test_overlapping_annotations(self):
+        def box(id, left, top):
+            return {
+                "id": id, "annotation_type": "bounding-box", "label": "car",
+                "left": left, "top": top, "width": 10, "height": 10
+            }
+
+        task = Task.from_json({
+            "id": "task-1",
+            "task_type": "image",
+            "params": {"attachment": "a.jpg", "attachment_type": "image"},
+            "annotations": [box("a", 0, 0), box("b", 5, 5), box("c", 50, 50)]
+        })
+        index = index_task_annotations(task)
+
+        self.assertEqual(index.query([0, 0, 7, 7]), ["a", "b"])
+        overlapping = overlapping_annotations(
+            index, task, task.annotations[0], exact=False
+        )
+        self.assertEqual([a.id for a in overlapping], ["b"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from collections import Counter
+from linlog.split import Splitter, hash_fraction
+from linlog.schemas.task import Task
+
+
+def make_task(idx: int, label: str) -> Task:
+    return Task.from_json({
+        "id": f"task-{idx}",
+        "task_type": "image",
+        "params": {"attachment": "a.jpg", "attachment_type": "image"},
+        "annotations": [{
+            "annotation_type": "bounding-box",
+            "label": label,
+            "top": 0,
+            "left": 0,
+            "width": 1,
+            "height": 1
+        }]
+    })
+
+
+class TestSplitter(unittest.TestCase):
+
+    def test_hash_fraction_is_stable(self):
+        self.assertEqual(
+            hash_fraction("task-1", 7), hash_fraction("task-1", 7)
+        )
+        self.assertNotEqual(
+            hash_fraction("task-1", 7), hash_fraction("task-1", 8)
+        )
+        self.assertTrue(0 <= hash_fraction("task-1") < 1)
+
+    def test_splits_follow_ratios(self):
+        splitter = Splitter({"train": .8, "val": .2})
+        counts = Counter(
+            splitter.assign_id(f"task-{idx}") for idx in range(20000)
+        )
+        self.assertAlmostEqual(counts["train"] / 20000, .8, delta=.02)
+
+    def test_splits_do_not_move_when_the_dataset_grows(self):
+        ids = [f"task-{idx}" for idx in range(1000)]
+        before = {id: Splitter(seed=1).assign_id(id) for id in ids}
+        after = {
+            id: Splitter(seed=1).assign_id(id)
+            for id in [f"task-{idx}" for idx in range(5000)]
+        }
+        for id, split in before.items():
+            self.assertEqual(after[id], split)
+
+    def test_stratified_splits_every_label(self):
+        splitter = Splitter({"train": .5, "val": .5}, stratify=True)
+        tasks = [make_task(idx, "rare" if idx < 4 else "common")
+                 for idx in range(100)]
+        splits = Counter(
+            (split, task.annotations[0].label)
+            for split, task in splitter.split(tasks)
+        )
+        self.assertEqual(splits["train", "rare"], 2)
+        self.assertEqual(splits["val", "rare"], 2)
+
+    def test_invalid_ratios(self):
+        with self.assertRaises(Exception):
+            Splitter({"train": .5, "val": .2})
+
+
+if __name__ == '__main__':
+    unittest.main()
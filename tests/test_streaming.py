@@ -0,0 +1,72 @@
+import json
+import unittest
+from unittest import mock
+from linlog import LinLogClient
+from tests.server import LocalServer
+
+TASKS = [{"id": f"task-{idx}", "task_type": "image"} for idx in range(10)]
+PAGE_SIZE = 3
+
+
+def search_handler(request):
+    # The server caps the page size below the requested limit
+    offset = int(request.query["offset"][0])
+    limit = min(int(request.query["limit"][0]), PAGE_SIZE)
+    results = TASKS[offset:offset + limit]
+    return 200, {
+        "count": len(TASKS),
+        "next": "next" if offset + limit < len(TASKS) else None,
+        "previous": None,
+        "results": results
+    }, None
+
+
+class StreamingTestMixin:
+
+    def iter_tasks(self, server, **kwargs):
+        client = LinLogClient.init_from_token("token", server.url)
+        return client, client.iter_dataset_tasks("dataset-1", **kwargs)
+
+    def test_pages_follow_the_count(self):
+        with LocalServer(search_handler) as server:
+            _, tasks = self.iter_tasks(server, limit=5)
+            self.assertEqual(list(tasks), TASKS)
+            self.assertEqual(
+                [request.query["offset"][0] for request in server.requests],
+                ["0", "3", "6", "9"]
+            )
+
+    def test_response_is_reported_once_read(self):
+        with LocalServer(search_handler) as server:
+            client, tasks = self.iter_tasks(server)
+            events = []
+            client.controller.add_hook(
+                "after_response", lambda event: events.append(event)
+            )
+            next(tasks)
+            self.assertEqual(events, [])
+            for _ in range(PAGE_SIZE - 1):
+                next(tasks)
+            next(tasks)
+            self.assertEqual(len(events), 1)
+            body = json.dumps(search_handler(server.requests[0])[1])
+            self.assertEqual(events[0].bytes_in, len(body))
+            tasks.close()
+            self.assertEqual(len(events), 2)
+            self.assertEqual(client.controller.metrics.in_flight, 0)
+
+
+class TestIncrementalStreaming(StreamingTestMixin, unittest.TestCase):
+    pass
+
+
+class TestBufferedStreaming(StreamingTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        patch = mock.patch("linlog.controller.ijson", None)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+import copy
+import pickle
+import unittest
+from linlog import LinLogClient
+from linlog.schemas.annotation import BoundingBoxAnnotation
+from linlog.schemas.task import Task
+from linlog.validators.task import validate_task_payload
+from tests.server import LocalServer
+
+
+def box(id, label="car"):
+    return {
+        "id": id, "annotation_type": "bounding-box", "label": label,
+        "left": 0, "top": 0, "width": 10, "height": 10, "rotation": 0
+    }
+
+
+def make_task() -> Task:
+    return Task.from_json({
+        "id": "task-1",
+        "task_type": "image",
+        "params": {"attachment": "a.jpg", "attachment_type": "image"},
+        "tags": ["night"],
+        "metadata": {"camera": {"side": "front"}, "weather": "rain"},
+        "annotations": [box("a-1"), box("a-2"), box("a-3")]
+    })
+
+
+class TestChangeTracking(unittest.TestCase):
+
+    def test_loading_takes_no_snapshot(self):
+        task = make_task()
+        self.assertTrue(task.is_tracked)
+        self.assertEqual(task.__dict__["_saved_containers"], {})
+        self.assertEqual(task.tags, ["night"])
+        self.assertEqual(task.changed_fields, set())
+        self.assertEqual(task.get_changes(), {})
+
+    def test_in_place_tag_edits(self):
+        task = make_task()
+        task.tags.append("rain")
+        self.assertEqual(task.changed_fields, {"tags"})
+        self.assertEqual(task.get_changes(), {"tags": ["night", "rain"]})
+
+    def test_nested_metadata_edits(self):
+        task = make_task()
+        task.metadata["camera"]["side"] = "rear"
+        self.assertEqual(task.changed_fields, {"metadata"})
+
+    def test_reverted_edits_are_not_changes(self):
+        task = make_task()
+        task.tags.append("rain")
+        task.tags.pop()
+        self.assertEqual(task.changed_fields, set())
+
+    def test_reading_plain_values_takes_no_snapshot(self):
+        task = make_task()
+        self.assertEqual(list(task.tags), ["night"])
+        self.assertEqual(task.metadata.get("weather"), "rain")
+        self.assertEqual(task.__dict__["_saved_containers"], {})
+
+    def test_assigned_fields(self):
+        task = make_task()
+        task.complete = True
+        task.metadata = {"weather": "sun"}
+        self.assertEqual(task.get_changes(), {
+            "complete": True, "metadata": {"weather": "sun"}
+        })
+
+    def test_annotation_changes(self):
+        task = make_task()
+        task.annotations[0].label = "bus"
+        del task.annotations[1]
+        added = BoundingBoxAnnotation(
+            id="a-4", label="car", top=1, left=1, width=2, height=2,
+            rotation=0, is_model_run=False
+        )
+        task.annotations.append(added)
+
+        changes = task.get_annotation_changes()
+        self.assertEqual(
+            [a["id"] for a in changes["added"]], ["a-4"]
+        )
+        self.assertEqual(
+            [(a["id"], a["label"]) for a in changes["updated"]],
+            [("a-1", "bus")]
+        )
+        self.assertEqual(changes["removed"], ["a-2"])
+        self.assertEqual(task.changed_fields, set())
+
+    def test_copies_track_in_place_edits_separately(self):
+        task = make_task()
+        copied = copy.copy(task)
+        copied.tags.append("rain")
+        self.assertEqual(copied.changed_fields, {"tags"})
+        self.assertEqual(task.changed_fields, set())
+        self.assertEqual(task.tags, ["night"])
+
+    def test_payloads_of_tracked_tasks_are_valid(self):
+        task = make_task()
+        validate_task_payload(task.to_dict())
+        restored = Task.from_json(task.to_dict())
+        self.assertEqual(restored.tags, ["night"])
+
+    def test_pickled_tasks_keep_tracking(self):
+        task = make_task()
+        task.tags.append("rain")
+        restored = pickle.loads(pickle.dumps(task))
+        self.assertEqual(restored.changed_fields, {"tags"})
+        self.assertIs(type(pickle.loads(pickle.dumps(task.tags))), list)
+
+        restored = pickle.loads(pickle.dumps(make_task()))
+        restored.metadata["camera"]["side"] = "rear"
+        self.assertEqual(restored.changed_fields, {"metadata"})
+
+
+class TestSave(unittest.TestCase):
+
+    def save(self, task, **kwargs):
+        with LocalServer(lambda request: (200, {}, None)) as server:
+            client = LinLogClient.init_from_token("token", server.url)
+            task.save(client, **kwargs)
+        return server.requests
+
+    def test_save_sends_only_changes(self):
+        task = make_task()
+        task.complete = True
+        task.tags.append("rain")
+        task.annotations[2].label = "bus"
+        task.annotations.pop(0)
+
+        request, = self.save(task)
+        self.assertEqual(request.path, "tasks/task-1")
+        payload = request.json()["task"]
+        self.assertEqual(set(payload), {
+            "complete", "tags", "annotation_changes"
+        })
+        self.assertEqual(payload["complete"], True)
+        self.assertEqual(payload["tags"], ["night", "rain"])
+        self.assertEqual(payload["annotation_changes"]["added"], [])
+        self.assertEqual(
+            [a["id"] for a in payload["annotation_changes"]["updated"]],
+            ["a-3"]
+        )
+        self.assertEqual(
+            payload["annotation_changes"]["removed"], ["a-1"]
+        )
+
+    def test_unchanged_task_is_not_sent(self):
+        self.assertEqual(self.save(make_task()), [])
+
+    def test_save_resets_the_tracked_state(self):
+        task = make_task()
+        task.tags.append("rain")
+        task.annotations[0].label = "bus"
+        self.save(task)
+
+        self.assertEqual(task.changed_fields, set())
+        self.assertEqual(task.get_changes(), {})
+
+        task.metadata["camera"]["side"] = "rear"
+        request, = self.save(task)
+        self.assertEqual(request.json()["task"], {
+            "metadata": {"camera": {"side": "rear"}, "weather": "rain"}
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()